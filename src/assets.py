@@ -0,0 +1,177 @@
+import hashlib
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+# Handle imports differently based on how the script is being run
+try:
+    from .buildstate import load_state, save_state
+    from .imagesize import IMAGE_EXTENSIONS, read_image_size
+    from .walker import walk_manifest
+except ImportError:
+    from buildstate import load_state, save_state
+    from imagesize import IMAGE_EXTENSIONS, read_image_size
+    from walker import walk_manifest
+
+# Number of hex digits of the content hash used in fingerprinted names
+FINGERPRINT_LENGTH = 10
+
+_ASSET_REFERENCE_RE = re.compile(r'\b(href|src)="(/[^"]*)"')
+
+def build_asset_index(static_dir, cache_dir=None, workers=None, manifest=None):
+    """
+    Hash every file in the static directory, reusing hashes of files whose stat info is unchanged.
+
+    Image dimensions are read from the file headers at the same time and cached alongside the hash.
+
+    Args:
+        static_dir (str): Path to the static directory (e.g., 'static')
+        cache_dir (str, optional): Directory where the stat/hash cache is kept. No caching if None
+        workers (int, optional): Number of hashing threads. Defaults to the executor default
+        manifest (list, optional): The static directory's walk_manifest, if already built
+
+    Returns:
+        dict: Maps public URLs (e.g., '/images/tom.png') to entries with 'path', 'size',
+            'mtime_ns', 'hash', 'width' and 'height' keys (dimensions are None for non-images)
+    """
+    cache_path = os.path.join(cache_dir, "assets.json") if cache_dir else None
+    cached = load_state(cache_path) if cache_path else {}
+
+    index = {}
+    to_hash = []
+    if manifest is None:
+        manifest = walk_manifest(static_dir) if os.path.isdir(static_dir) else []
+    for manifest_entry in manifest:
+        if manifest_entry.is_dir:
+            continue
+        rel_path = manifest_entry.rel_path
+        stat = manifest_entry.stat()
+        entry = {"path": manifest_entry.path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                 "hash": None, "width": None, "height": None}
+
+        # Reuse the previous hash and dimensions if size and mtime are unchanged
+        previous = cached.get(rel_path)
+        if (previous and "width" in previous and previous["size"] == stat.st_size
+                and previous["mtime_ns"] == stat.st_mtime_ns):
+            entry["hash"] = previous["hash"]
+            entry["width"] = previous.get("width")
+            entry["height"] = previous.get("height")
+        else:
+            to_hash.append(entry)
+        index["/" + rel_path] = entry
+
+    # Hash the new or modified files in parallel (hashlib releases the GIL)
+    if to_hash:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for entry, (digest, dimensions) in zip(to_hash, executor.map(_index_file, [entry["path"] for entry in to_hash])):
+                entry["hash"] = digest
+                if dimensions:
+                    entry["width"], entry["height"] = dimensions
+
+    print(f"Indexed {len(index)} static assets ({len(to_hash)} hashed, {len(index) - len(to_hash)} cached)")
+
+    if cache_path:
+        cached_keys = ("size", "mtime_ns", "hash", "width", "height")
+        save_state(cache_path, {url[1:]: {key: entry[key] for key in cached_keys} for url, entry in index.items()})
+    return index
+
+def _index_file(path):
+    """
+    Internal helper that hashes a file and reads its image dimensions if it is an image.
+
+    Args:
+        path (str): Path of the file to index
+
+    Returns:
+        tuple: (hex digest, (width, height) or None)
+    """
+    dimensions = None
+    if path.lower().endswith(IMAGE_EXTENSIONS):
+        dimensions = read_image_size(path)
+    return _hash_file(path), dimensions
+
+def _hash_file(path):
+    """
+    Internal helper that returns the SHA-256 hex digest of a file.
+
+    Args:
+        path (str): Path of the file to hash
+
+    Returns:
+        str: The hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def fingerprint_url(url, digest):
+    """
+    Insert a content hash before the extension of a URL.
+
+    Args:
+        url (str): The original URL (e.g., '/images/tom.png')
+        digest (str): The hex digest of the file content
+
+    Returns:
+        str: The fingerprinted URL (e.g., '/images/tom.1a2b3c4d5e.png')
+    """
+    directory, _, filename = url.rpartition("/")
+    stem, dot, extension = filename.rpartition(".")
+    if not stem:
+        # No extension (or a dotfile): append the hash
+        return f"{url}.{digest[:FINGERPRINT_LENGTH]}"
+    return f"{directory}/{stem}.{digest[:FINGERPRINT_LENGTH]}{dot}{extension}"
+
+def build_fingerprint_map(asset_index):
+    """
+    Precompute the rewrite map from original asset URLs to fingerprinted URLs.
+
+    Args:
+        asset_index (dict): The index returned by build_asset_index
+
+    Returns:
+        dict: Maps original URLs to fingerprinted URLs
+    """
+    return {url: fingerprint_url(url, entry["hash"]) for url, entry in asset_index.items()}
+
+def publish_fingerprinted_assets(asset_map, dest_dir):
+    """
+    Publish copies of already-copied static files under their fingerprinted names.
+
+    The original names are kept so references the build does not rewrite keep working.
+    Hard links are used where the filesystem supports them to avoid duplicating data.
+
+    Args:
+        asset_map (dict): Maps original URLs to fingerprinted URLs
+        dest_dir (str): The output directory the static files were copied to
+    """
+    for url, fingerprinted in asset_map.items():
+        source_path = os.path.join(dest_dir, url.lstrip("/"))
+        target_path = os.path.join(dest_dir, fingerprinted.lstrip("/"))
+        if os.path.exists(target_path):
+            os.remove(target_path)
+        try:
+            os.link(source_path, target_path)
+        except OSError:
+            shutil.copyfile(source_path, target_path)
+
+    print(f"Published {len(asset_map)} fingerprinted assets")
+
+def rewrite_asset_urls(html, asset_map):
+    """
+    Rewrite root-relative href/src attribute values using the fingerprint map.
+
+    Args:
+        html (str): The HTML to rewrite (e.g., the page template)
+        asset_map (dict): Maps original URLs to fingerprinted URLs
+
+    Returns:
+        str: The HTML with known asset URLs replaced
+    """
+    if not asset_map:
+        return html
+    return _ASSET_REFERENCE_RE.sub(
+        lambda match: f'{match.group(1)}="{asset_map.get(match.group(2), match.group(2))}"', html)
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+
+# Default upper bound for the rendered-page cache
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+_renderer_version = None
+
+def renderer_version():
+    """
+    Return a version string that changes whenever the renderer's code changes.
+
+    It is the hash of the generator's own source files, so a cache shared between
+    machines never serves pages rendered by a different version of the code.
+
+    Returns:
+        str: The renderer version
+    """
+    global _renderer_version
+    if _renderer_version is None:
+        digest = hashlib.sha256()
+        for filename in sorted(os.listdir(_SOURCE_DIR)):
+            if filename.endswith(".py"):
+                digest.update(filename.encode("utf-8"))
+                with open(os.path.join(_SOURCE_DIR, filename), "rb") as f:
+                    digest.update(f.read())
+        _renderer_version = digest.hexdigest()[:16]
+    return _renderer_version
+
+class BuildCache:
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize a BuildCache, a content-addressed store of rendered pages.
+
+        The directory can live on a shared mount or be restored between CI runs;
+        entries are written atomically, so several builders can use it at once.
+
+        Args:
+            cache_dir (str): Directory holding the cached pages
+            max_bytes (int, optional): Size above which least recently used pages are evicted
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, markdown_content, template_content, basepath, options=""):
+        """
+        Compute the cache key of a page.
+
+        Args:
+            markdown_content (str): The page's markdown source
+            template_content (str): The prepared HTML template
+            basepath (str): The base path for all URLs
+            options (str, optional): Any other setting that affects the output
+
+        Returns:
+            str: The hex key
+        """
+        parts = [
+            hashlib.sha256(markdown_content.encode("utf-8")).hexdigest(),
+            hashlib.sha256(template_content.encode("utf-8")).hexdigest(),
+            basepath,
+            renderer_version(),
+            options,
+        ]
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".page")
+
+    def get(self, key):
+        """
+        Look up a rendered page.
+
+        Args:
+            key (str): The key returned by key()
+
+        Returns:
+            tuple: (html, metadata dict), or None on a cache miss
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                metadata = json.loads(f.readline())
+                html = f.read().decode("utf-8")
+            # Refresh the modification time so eviction is least-recently-used
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return html, metadata
+
+    def put(self, key, html, metadata):
+        """
+        Store a rendered page.
+
+        Args:
+            key (str): The key returned by key()
+            html (str): The rendered page
+            metadata (dict): JSON-serializable data needed to rebuild the page result
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Metadata goes on the first line so a single file holds the whole entry
+        tmp_path = f"{path}.{os.getpid()}.{id(html)}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(metadata).encode("utf-8") + b"\n")
+            f.write(html.encode("utf-8"))
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        """
+        Delete the least recently used pages until the cache fits within max_bytes.
+
+        Returns:
+            int: Number of pages evicted
+        """
+        entries = []
+        total = 0
+        for dir_path, _, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                if filename.endswith(".page"):
+                    path = os.path.join(dir_path, filename)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # Another builder sharing the cache may have removed it already
+                pass
+            total -= size
+            evicted += 1
+
+        return evicted
@@ -0,0 +1,40 @@
+import json
+import os
+
+def load_state(state_path):
+    """
+    Load a JSON build-state file written by a previous build.
+    
+    Args:
+        state_path (str): Path to the state file
+        
+    Returns:
+        dict: The stored state, or an empty dict if the file is missing or unreadable
+    """
+    try:
+        with open(state_path, "r") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    
+    return state if isinstance(state, dict) else {}
+
+def save_state(state_path, state):
+    """
+    Atomically write a build-state dictionary to a JSON file.
+    
+    The state is written to a temporary file first and then moved into place,
+    so an interrupted build never leaves a half-written state file behind.
+    
+    Args:
+        state_path (str): Path to the state file
+        state (dict): The state to store
+    """
+    state_dir = os.path.dirname(state_path)
+    if state_dir:
+        os.makedirs(state_dir, exist_ok=True)
+    
+    tmp_path = f"{state_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, sort_keys=True)
+    os.replace(tmp_path, state_path)
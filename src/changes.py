@@ -0,0 +1,155 @@
+import hashlib
+import os
+import subprocess
+
+# Handle imports differently based on how the script is being run
+try:
+    from .walker import walk_manifest
+except ImportError:
+    from walker import walk_manifest
+
+def _git(repo_root, *args):
+    """
+    Run a git command in a repository and return its output, or None if git fails.
+
+    Args:
+        repo_root (str): Directory inside the repository
+        *args (str): Arguments passed to git
+
+    Returns:
+        str: The command's standard output, or None if git is missing or the command failed
+    """
+    try:
+        completed = subprocess.run(["git", "-C", repo_root, *args], capture_output=True, text=True)
+    except OSError:
+        return None
+    if completed.returncode != 0:
+        return None
+    return completed.stdout
+
+def git_head(repo_root):
+    """
+    Return the commit currently checked out in a git repository.
+
+    Args:
+        repo_root (str): Directory inside the repository
+
+    Returns:
+        str: The full commit hash, or None if the directory is not a git checkout
+    """
+    output = _git(repo_root, "rev-parse", "--verify", "HEAD")
+    return output.strip() if output else None
+
+def git_changed_files(repo_root, since_commit, paths=()):
+    """
+    Ask git which files differ from a commit: committed, staged, modified, deleted and untracked.
+
+    Args:
+        repo_root (str): Directory inside the repository
+        since_commit (str): The commit to compare the working tree with
+        paths (list, optional): Limit the answer to these files and directories
+
+    Returns:
+        set: Absolute paths of the changed files, or None if git cannot describe the changes
+            (git missing, unknown commit, unresolved merge conflicts, or ignored files
+            inside paths)
+    """
+    top_level = _git(repo_root, "rev-parse", "--show-toplevel")
+    if top_level is None:
+        return None
+    top_level = top_level.strip()
+    pathspecs = ["--", *(os.path.realpath(path) for path in paths)]
+
+    # Conflicted files have no single working-tree state that git diff can report,
+    # and ignored files are invisible to git altogether
+    unmerged = _git(repo_root, "ls-files", "--unmerged", *pathspecs)
+    ignored = _git(repo_root, "ls-files", "--others", "--ignored", "--exclude-standard", *pathspecs)
+    if unmerged is None or unmerged or ignored is None or ignored:
+        return None
+
+    changed = _git(repo_root, "diff", "--name-only", "--no-renames", "-z", since_commit, *pathspecs)
+    untracked = _git(repo_root, "ls-files", "--others", "--exclude-standard", "--full-name", "-z", *pathspecs)
+    if changed is None or untracked is None:
+        return None
+
+    changed_paths = [path for path in (changed + untracked).split("\0") if path]
+    return {os.path.normpath(os.path.join(top_level, path)) for path in changed_paths}
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def snapshot_files(paths, previous=None):
+    """
+    Record the size, modification time and content hash of every file under the given paths.
+
+    Files whose size and modification time match the previous snapshot keep their
+    stored hash instead of being read again.
+
+    Args:
+        paths (list): Files and directories to include
+        previous (dict, optional): A snapshot returned by an earlier call
+
+    Returns:
+        dict: Maps absolute file paths to [size, mtime_ns, sha256]
+    """
+    previous = previous or {}
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend((os.path.abspath(entry.path), entry.stat())
+                         for entry in walk_manifest(path) if not entry.is_dir)
+        elif os.path.isfile(path):
+            files.append((os.path.abspath(path), os.stat(path)))
+
+    snapshot = {}
+    for path, stat in files:
+        entry = previous.get(path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            snapshot[path] = entry
+        else:
+            snapshot[path] = [stat.st_size, stat.st_mtime_ns, _hash_file(path)]
+    return snapshot
+
+def detect_changes(repo_root, paths, state):
+    """
+    Work out which source files changed since the build recorded in state.
+
+    In a git checkout this asks git for the files changed since the last successful
+    build's commit, which costs time proportional to the change rather than to the
+    site. Otherwise it falls back to comparing a stat/hash snapshot of every source.
+
+    Args:
+        repo_root (str): The project root
+        paths (list): Source files and directories that affect the build
+        state (dict): The state saved after the previous successful build
+
+    Returns:
+        tuple: (changed, new_state) where changed is a set of real (symlink-free) paths below
+            paths, or None if there is no usable previous build and everything must
+            be rebuilt; new_state is what to save once this build succeeds
+    """
+    roots = [os.path.realpath(path) for path in paths]
+
+    head = git_head(repo_root)
+    dirty = git_changed_files(repo_root, head, roots) if head is not None else None
+    if dirty is not None:
+        # Files that are dirty now may be reverted before the next build, which git
+        # would no longer report, so they are remembered and treated as changed then
+        new_state = {"commit": head, "dirty": sorted(dirty)}
+        changed = git_changed_files(repo_root, state["commit"], roots) if state.get("commit") else None
+        if changed is None:
+            return None, new_state
+        return changed | set(state.get("dirty", [])), new_state
+
+    # Fall back to scanning every source file
+    print("Git cannot describe the changes, scanning source files instead")
+    previous = state.get("files")
+    snapshot = snapshot_files(roots, previous)
+    if previous is None:
+        return None, {"files": snapshot}
+    changed = {path for path in snapshot.keys() | previous.keys() if snapshot.get(path) != previous.get(path)}
+    return changed, {"files": snapshot}
@@ -0,0 +1,331 @@
+import hashlib
+import json
+import os
+import sqlite3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    source TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    output TEXT NOT NULL,
+    title TEXT,
+    date TEXT,
+    draft INTEGER NOT NULL DEFAULT 0,
+    metadata TEXT NOT NULL,
+    hash TEXT,
+    mtime_ns INTEGER,
+    word_count INTEGER,
+    fingerprint TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_url ON pages (url);
+CREATE INDEX IF NOT EXISTS pages_date ON pages (date);
+CREATE TABLE IF NOT EXISTS tags (
+    source TEXT NOT NULL,
+    tag TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tags_tag ON tags (tag);
+CREATE INDEX IF NOT EXISTS tags_source ON tags (source);
+CREATE TABLE IF NOT EXISTS links (
+    source TEXT NOT NULL,
+    url TEXT NOT NULL,
+    line INTEGER
+);
+CREATE INDEX IF NOT EXISTS links_url ON links (url);
+CREATE INDEX IF NOT EXISTS links_source ON links (source);
+CREATE TABLE IF NOT EXISTS search_ids (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS terms (
+    source TEXT NOT NULL,
+    term TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS terms_term ON terms (term);
+CREATE INDEX IF NOT EXISTS terms_source ON terms (source);
+CREATE TABLE IF NOT EXISTS related (
+    source TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    related TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+class ContentIndex:
+    def __init__(self, db_path):
+        """
+        Open (or create) the content index, a SQLite database of page metadata and build state.
+
+        The database runs in WAL mode, so readers never block the build and several
+        shards can share one index, and every update happens in a single transaction.
+
+        Args:
+            db_path (str): Path to the database file
+        """
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.db_path = db_path
+        self._db = sqlite3.connect(db_path, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.executescript(_SCHEMA)
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        self._db.close()
+
+    def get_state(self, key, default=None):
+        """
+        Read a build-state value stored by an earlier build.
+
+        Args:
+            key (str): Name of the state entry
+            default (optional): Value returned if the entry does not exist
+
+        Returns:
+            The stored JSON value, or default
+        """
+        row = self._db.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row["value"]) if row else default
+
+    def set_state(self, key, value):
+        """
+        Store a build-state value for later builds.
+
+        Args:
+            key (str): Name of the state entry
+            value: A JSON-serializable value
+        """
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                             (key, json.dumps(value, sort_keys=True)))
+
+    def update_pages(self, results, routes):
+        """
+        Record the metadata of generated pages, writing only the rows that changed.
+
+        Args:
+            results (list): PageResult objects of the pages generated by this build
+            routes (RouteTable): The site's pages
+
+        Returns:
+            int: Number of pages inserted or updated
+        """
+        existing = {row["source"]: row["fingerprint"]
+                    for row in self._db.execute("SELECT source, fingerprint FROM pages")}
+
+        rows = []
+        for result in results:
+            route = routes.for_source(result.source_path)
+            if route is None:
+                continue
+            source = os.path.relpath(route.source_path, routes.content_root).replace(os.sep, "/")
+            output = os.path.relpath(route.output_path, routes.dest_dir).replace(os.sep, "/")
+            metadata = json.dumps(route.metadata, sort_keys=True, default=str)
+            links = [list(link) for link in result.links]
+            terms = sorted((result.terms or {}).items())
+            row = (source, route.url, output, result.title, _sort_key(route.metadata.get("date")),
+                   int(route.metadata.get("draft") is True), metadata, result.source_hash,
+                   result.mtime_ns, result.word_count)
+
+            fingerprint = hashlib.sha256(json.dumps([row, links, terms]).encode("utf-8")).hexdigest()
+            if existing.get(source) != fingerprint:
+                rows.append((row, fingerprint, links, terms))
+
+        # One transaction for the whole batch
+        with self._db:
+            for row, fingerprint, links, terms in rows:
+                source = row[0]
+                self._db.execute("INSERT OR REPLACE INTO pages (source, url, output, title, date, draft, metadata, "
+                                 "hash, mtime_ns, word_count, fingerprint) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 row + (fingerprint,))
+                self._db.execute("DELETE FROM tags WHERE source = ?", (source,))
+                self._db.execute("DELETE FROM links WHERE source = ?", (source,))
+                self._db.execute("DELETE FROM terms WHERE source = ?", (source,))
+                tags = _tags(json.loads(row[6]).get("tags"))
+                self._db.executemany("INSERT INTO tags (source, tag) VALUES (?, ?)", [(source, tag) for tag in tags])
+                self._db.executemany("INSERT INTO links (source, url, line) VALUES (?, ?, ?)",
+                                     [(source, url, line) for url, line in links])
+                self._db.executemany("INSERT INTO terms (source, term, count) VALUES (?, ?, ?)",
+                                     [(source, term, count) for term, count in terms])
+                # A page keeps its search id for as long as it exists
+                self._db.execute("INSERT OR IGNORE INTO search_ids (source) VALUES (?)", (source,))
+
+        return len(rows)
+
+    def prune(self, routes):
+        """
+        Delete the rows of pages that no longer exist.
+
+        Args:
+            routes (RouteTable): The site's current pages
+
+        Returns:
+            int: Number of pages removed
+        """
+        current = set(routes.rel_paths())
+        stale = [(row["source"],) for row in self._db.execute("SELECT source FROM pages")
+                 if row["source"] not in current]
+        with self._db:
+            for table in ("pages", "tags", "links", "terms", "search_ids", "related"):
+                self._db.executemany(f"DELETE FROM {table} WHERE source = ?", stale)
+        return len(stale)
+
+    def pages(self, url_prefix="/", include_drafts=False, limit=None):
+        """
+        List indexed pages below a URL, newest first.
+
+        Args:
+            url_prefix (str, optional): Only pages whose URL starts with this. Defaults to all pages
+            include_drafts (bool, optional): Whether to include drafts. Defaults to False
+            limit (int, optional): Return at most this many pages. Defaults to no limit
+
+        Returns:
+            list: sqlite3.Row objects with the page columns, ordered by date (undated last), then URL
+        """
+        # A range on the indexed url column instead of LIKE, which SQLite can't always index
+        upper = url_prefix[:-1] + chr(ord(url_prefix[-1]) + 1)
+        query = "SELECT * FROM pages WHERE url >= ? AND url < ?"
+        if not include_drafts:
+            query += " AND draft = 0"
+        query += " ORDER BY date IS NULL, date DESC, url"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return self._db.execute(query, (url_prefix, upper)).fetchall()
+
+    def pages_with_tag(self, tag):
+        """
+        List the indexed pages carrying a tag.
+
+        Args:
+            tag (str): The tag
+
+        Returns:
+            list: sqlite3.Row objects with the page columns, ordered by URL
+        """
+        return self._db.execute("SELECT pages.* FROM pages JOIN tags ON tags.source = pages.source "
+                                "WHERE tags.tag = ? ORDER BY pages.url", (tag,)).fetchall()
+
+    def pages_linking_to(self, url):
+        """
+        List the sources of the pages that link to a URL.
+
+        Args:
+            url (str): The link target, as recorded while rendering (without the basepath)
+
+        Returns:
+            list: Relative source paths, sorted
+        """
+        return [row["source"] for row in
+                self._db.execute("SELECT DISTINCT source FROM links WHERE url = ? ORDER BY source", (url,))]
+
+    def search_postings(self, include_drafts=False):
+        """
+        Stream the search postings of all indexed pages.
+
+        Args:
+            include_drafts (bool, optional): Whether to include drafts. Defaults to False
+
+        Returns:
+            sqlite3.Cursor: (term, page id, count) rows, ordered by term and page id
+        """
+        query = ("SELECT terms.term, search_ids.id, terms.count FROM terms "
+                 "JOIN search_ids ON search_ids.source = terms.source "
+                 "JOIN pages ON pages.source = terms.source")
+        if not include_drafts:
+            query += " WHERE pages.draft = 0"
+        return self._db.execute(query + " ORDER BY terms.term, search_ids.id")
+
+    def search_pages(self, include_drafts=False):
+        """
+        List the search ids of the indexed pages.
+
+        Args:
+            include_drafts (bool, optional): Whether to include drafts. Defaults to False
+
+        Returns:
+            list: sqlite3.Row objects with id, url and title, ordered by id
+        """
+        query = "SELECT search_ids.id, pages.url, pages.title FROM pages JOIN search_ids USING (source)"
+        if not include_drafts:
+            query += " WHERE pages.draft = 0"
+        return self._db.execute(query + " ORDER BY search_ids.id").fetchall()
+
+    def page_terms(self, url_prefix="/", include_drafts=False):
+        """
+        Load the search terms of the indexed pages below a URL.
+
+        Args:
+            url_prefix (str, optional): Only pages whose URL starts with this. Defaults to all pages
+            include_drafts (bool, optional): Whether to include drafts. Defaults to False
+
+        Returns:
+            dict: Relative source path -> {term: count}, for every page with at least one term
+        """
+        upper = url_prefix[:-1] + chr(ord(url_prefix[-1]) + 1)
+        query = ("SELECT terms.source, terms.term, terms.count FROM terms JOIN pages USING (source) "
+                 "WHERE pages.url >= ? AND pages.url < ?")
+        if not include_drafts:
+            query += " AND pages.draft = 0"
+        page_terms = {}
+        for source, term, count in self._db.execute(query, (url_prefix, upper)):
+            page_terms.setdefault(source, {})[term] = count
+        return page_terms
+
+    def get_related(self):
+        """
+        Load the related pages computed by earlier builds.
+
+        Returns:
+            dict: Relative source path -> (page fingerprint they were computed for, list of related sources)
+        """
+        return {row["source"]: (row["fingerprint"], json.loads(row["related"]))
+                for row in self._db.execute("SELECT * FROM related")}
+
+    def set_related(self, entries):
+        """
+        Store the related pages of some pages.
+
+        Args:
+            entries (list): (source, page fingerprint, list of related sources) tuples
+        """
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO related (source, fingerprint, related) VALUES (?, ?, ?)",
+                                 [(source, fingerprint, json.dumps(related))
+                                  for source, fingerprint, related in entries])
+
+def _sort_key(value):
+    """
+    Internal helper that stores dates as ISO strings, which sort chronologically.
+
+    Args:
+        value: The front-matter date, if any
+
+    Returns:
+        str: The date as a string, or None
+    """
+    return str(value) if value is not None else None
+
+def _tags(value):
+    """
+    Internal helper that normalizes the front-matter tags to a list of strings.
+
+    Args:
+        value: A list of tags, a comma-separated string, or None
+
+    Returns:
+        list: The tags
+    """
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(tag) for tag in value]
+    return [tag.strip() for tag in str(value).split(",") if tag.strip()]
@@ -0,0 +1,429 @@
+import base64
+import hashlib
+import json
+import mimetypes
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+# Handle imports differently based on how the script is being run
+try:
+    from .assets import rewrite_asset_urls
+    from .linkcheck import is_internal_url
+    from .search import tokenize
+    from .toc import slugify
+except ImportError:
+    from assets import rewrite_asset_urls
+    from linkcheck import is_internal_url
+    from search import tokenize
+    from toc import slugify
+
+# The SiteContext of the build, installed in each block-rendering worker process when it starts
+_worker_site = None
+
+def install_worker_site(site):
+    """
+    Process pool initializer that keeps the build's SiteContext in the worker process,
+    so it is sent once per worker rather than with every task.
+
+    Args:
+        site (SiteContext): The build-wide context
+    """
+    global _worker_site
+    _worker_site = site
+
+def worker_site():
+    """
+    Return the SiteContext installed in this worker process by install_worker_site.
+
+    Returns:
+        SiteContext: The build-wide context, or None if none was installed
+    """
+    return _worker_site
+
+class SiteContext:
+    def __init__(self, asset_map=None, asset_index=None, image_attributes=False, inline_threshold=0,
+                 parallel_threshold=None, workers=None, routes=None, related_directories=None):
+        """
+        Initialize a SiteContext, which holds the data precomputed once per build and shared by every page.
+
+        Args:
+            asset_map (dict, optional): Maps original asset URLs to fingerprinted URLs
+            asset_index (dict, optional): Static asset entries keyed by URL, as built by build_asset_index
+            image_attributes (bool, optional): Whether to add dimensions and lazy-loading hints to images
+            inline_threshold (int, optional): Static images smaller than this many bytes are inlined
+                as data URIs. Defaults to 0 (never inline)
+            parallel_threshold (int, optional): Documents of at least this many characters are
+                rendered in parallel block chunks. Defaults to None (never)
+            workers (int, optional): Number of processes used for parallel block rendering
+            routes (RouteTable, optional): The site's pages, built by generate_pages_recursive if None
+            related_directories (list, optional): Content directories whose pages get a related
+                posts element (e.g., ['blog']). Defaults to none
+        """
+        self.asset_map = asset_map if asset_map is not None else {}
+        self.asset_index = asset_index if asset_index is not None else {}
+        self.image_attributes = image_attributes
+        self.inline_threshold = inline_threshold
+        self.parallel_threshold = parallel_threshold
+        self.workers = workers
+        self.routes = routes
+        self.related_directories = sorted(related_directories or [])
+        self._templates = {}
+        self._data_uris = {}
+        self._executor = None
+
+    def __getstate__(self):
+        # Sent to worker processes: leave out the pool itself and the per-build caches
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        state["_templates"] = {}
+        return state
+
+    def block_executor(self):
+        """
+        Return the process pool used for parallel block rendering, creating it on first use.
+
+        Every worker gets this context once, when it starts.
+
+        Returns:
+            ProcessPoolExecutor: The shared pool
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=install_worker_site,
+                                                 initargs=(self,))
+        return self._executor
+
+    def installed_in(self, executor):
+        """
+        Check whether the workers of a process pool already hold this context.
+
+        Args:
+            executor (Executor): A process pool
+
+        Returns:
+            bool: True if the pool was created by block_executor
+        """
+        return executor is not None and executor is self._executor
+
+    def close(self):
+        """
+        Shut down the worker processes started for this build, if any.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def load_template(self, template_path):
+        """
+        Read and prepare a template, caching the result so it is done once per build.
+
+        Args:
+            template_path (str): Path to the HTML template file
+
+        Returns:
+            str: The template with asset URLs rewritten
+        """
+        if template_path not in self._templates:
+            with open(template_path, "r") as f:
+                self.add_template(template_path, f.read())
+        return self._templates[template_path]
+
+    def add_template(self, template_path, template_content):
+        """
+        Register already-loaded template content, e.g. after a build stage rewrote it.
+
+        Args:
+            template_path (str): Path the template is looked up by
+            template_content (str): The template HTML
+        """
+        self._templates[template_path] = rewrite_asset_urls(template_content, self.asset_map)
+
+    def data_uri(self, url):
+        """
+        Return the base64 data URI for a small static asset, if it should be inlined.
+
+        The encoded form is cached by content hash, so each file is read and encoded
+        at most once per build no matter how many pages reference it.
+
+        Args:
+            url (str): The asset URL as written in the markdown
+
+        Returns:
+            str: The data URI, or None if the asset is unknown or not below the threshold
+        """
+        if self.inline_threshold <= 0:
+            return None
+        entry = self.asset_index.get(url)
+        if entry is None or entry["size"] >= self.inline_threshold:
+            return None
+
+        if entry["hash"] not in self._data_uris:
+            mime_type = mimetypes.guess_type(entry["path"])[0] or "application/octet-stream"
+            with open(entry["path"], "rb") as f:
+                encoded = base64.b64encode(f.read()).decode("ascii")
+            self._data_uris[entry["hash"]] = f"data:{mime_type};base64,{encoded}"
+        return self._data_uris[entry["hash"]]
+
+    def render_signature(self):
+        """
+        Summarize every site setting that changes how markdown renders to HTML.
+
+        Two builds with the same signature produce the same HTML for the same page,
+        which is what lets rendered pages be reused from a shared cache.
+
+        Returns:
+            str: A hex digest of the settings and the asset data pages can embed
+        """
+        assets = {url: [entry.get("hash"), entry.get("size"), entry.get("width"), entry.get("height")]
+                  for url, entry in self.asset_index.items()}
+        # Links to markdown sources resolve through the routes, so moving a page changes other pages
+        routes = self.routes.rel_paths() if self.routes is not None else None
+        settings = [self.asset_map, assets, self.image_attributes, self.inline_threshold, routes,
+                    self.related_directories]
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def page(self, source_path=None):
+        """
+        Create the per-page context used while rendering a single page.
+
+        Args:
+            source_path (str, optional): Path to the page's source markdown file
+
+        Returns:
+            PageContext: A fresh context bound to this site
+        """
+        return PageContext(self, source_path)
+
+class PageContext:
+    def __init__(self, site, source_path=None):
+        """
+        Initialize a PageContext, which carries site data and per-page state through rendering.
+
+        Args:
+            site (SiteContext): The build-wide context
+            source_path (str, optional): Path to the page's source markdown file
+        """
+        self.site = site
+        self.source_path = source_path
+        self.image_count = 0
+        # The block being rendered and its first line, and the internal links found so far
+        self.block = None
+        self.line = None
+        self.links = []
+        self._link_positions = {}
+        # Search terms of the page text, counted as the text nodes are rendered
+        self.terms = Counter()
+        # Words of prose (normal, bold and italic text), for the reading time, and whether
+        # the last text ended inside a word that the next one may continue (e.g. 'foo**bar**')
+        self.word_count = 0
+        self._mid_word = False
+        # (level, id, text) of every heading, and the ids given out so far
+        self.headings = []
+        self._anchors = set()
+        # Parallel workers can't see the other chunks' ids, so they leave markers instead
+        self.defer_heading_ids = False
+        # Warnings printed while rendering, replayed when the page is reused from the cache
+        self.warnings = []
+
+    def warn(self, message):
+        """
+        Print a warning about this page and remember it.
+
+        Args:
+            message (str): The warning, without the 'Warning: ' prefix
+        """
+        print(f"Warning: {message}")
+        self.warnings.append(message)
+
+    def asset_url(self, url):
+        """
+        Map an asset URL to its published (fingerprinted) URL.
+
+        Args:
+            url (str): The URL as written in the markdown
+
+        Returns:
+            str: The published URL, or the original URL if it is not a known asset
+        """
+        return self.site.asset_map.get(url, url)
+
+    def start_block(self, block, line):
+        """
+        Set the block being rendered, so that links can be located within it.
+
+        Args:
+            block (str): The markdown block
+            line (int): The 1-based line the block starts on
+        """
+        self.block = block
+        self.line = line
+        self._link_positions = {}
+
+    def source_line(self, markdown):
+        """
+        Find the line a link or image appears on in the block being rendered.
+
+        Repeated occurrences of the same markdown are found in turn, since the
+        renderer meets them in document order.
+
+        Args:
+            markdown (str): The link or image markdown (e.g. '[Tom](tom.md)'), where any
+                line breaks inside it have become spaces
+
+        Returns:
+            int: The 1-based line, or the block's first line if the markdown isn't found
+        """
+        if self.block is None or self.line is None:
+            return self.line
+
+        # Paragraphs are parsed with their line breaks as spaces, which keeps every offset
+        text = self.block.replace("\n", " ")
+        position = text.find(markdown, self._link_positions.get(markdown, 0))
+        # A link's markdown also appears inside an image's, which is not the link
+        while position > 0 and markdown[0] == "[" and text[position - 1] == "!":
+            position = text.find(markdown, position + 1)
+        if position == -1:
+            return self.line
+        self._link_positions[markdown] = position + len(markdown)
+        return self.line + self.block.count("\n", 0, position)
+
+    def shows_related_posts(self):
+        """
+        Check whether this page is below one of the site's related posts directories.
+
+        Returns:
+            bool: True if the page gets a related posts element
+        """
+        routes = self.site.routes
+        if not self.site.related_directories or routes is None or self.source_path is None:
+            return False
+        route = routes.for_source(self.source_path)
+        return route is not None and any(route.url.startswith("/" + directory.strip("/") + "/")
+                                         for directory in self.site.related_directories)
+
+    def record_link(self, url, line=None):
+        """
+        Remember an internal href or src of this page, with the line it appears on, for the link checker.
+
+        Args:
+            url (str): The URL as emitted in the page, before the basepath is applied
+            line (int, optional): The line the link appears on. Defaults to the block's first line
+        """
+        if is_internal_url(url):
+            self.links.append((url, self.line if line is None else line))
+
+    def start_text(self):
+        """
+        Mark the start of a run of inline text (a paragraph, heading, list item, ...),
+        so that no word is continued from the previous run.
+        """
+        self._mid_word = False
+
+    def record_text(self, text, prose=False):
+        """
+        Count the search terms, and for prose the words, in a piece of rendered text.
+
+        Text nodes of one run are counted as they follow each other, so a word split
+        across them by inline markup (e.g. 'foo**bar**baz') is counted once.
+
+        Args:
+            text (str): The text of a text node
+            prose (bool, optional): Whether the text counts towards the word count. Defaults to False
+        """
+        self.terms.update(tokenize(text))
+        if not prose:
+            self._mid_word = False
+            return
+
+        words = len(text.split())
+        if words and self._mid_word and not text[0].isspace():
+            words -= 1
+        self.word_count += words
+        if text:
+            self._mid_word = not text[-1].isspace()
+
+    def heading_id(self, level, text):
+        """
+        Give a heading a unique anchor id and record it for the table of contents.
+
+        The id is the slug of the text; repeated slugs get a '-1', '-2', ... suffix in
+        document order, so ids stay stable as long as the headings before them do.
+
+        Args:
+            level (int): The heading level (1-6)
+            text (str): The heading's text, without markup
+
+        Returns:
+            str: The id, or a marker to be replaced by the caller if ids are deferred
+        """
+        if self.defer_heading_ids:
+            self.headings.append((level, None, text))
+            return f"\0{len(self.headings) - 1}\0"
+
+        slug = slugify(text)
+        anchor, suffix = slug, 0
+        while anchor in self._anchors:
+            suffix += 1
+            anchor = f"{slug}-{suffix}"
+        self._anchors.add(anchor)
+        self.headings.append((level, anchor, text))
+        return anchor
+
+    def resolve_link(self, url):
+        """
+        Rewrite a link to a markdown source into the URL of the page generated from it.
+
+        Relative targets (e.g. '../tom/index.md') are resolved against this page's source
+        directory and root-relative ones against the content root. Targets that don't
+        match any page are reported as a warning and left unchanged.
+
+        Args:
+            url (str): The link target as written in the markdown
+
+        Returns:
+            str: The routed URL with any fragment kept, or the original URL
+        """
+        path, hash_sign, fragment = url.partition("#")
+        routes = self.site.routes
+        if routes is None or self.source_path is None or not path.endswith(".md") or ":" in path:
+            return url
+
+        if path.startswith("/"):
+            target = os.path.join(routes.content_root, *path[1:].split("/"))
+        else:
+            target = os.path.join(os.path.dirname(self.source_path), *path.split("/"))
+        route = routes.for_source(target)
+        if route is None:
+            self.warn(f"{self.source_path}: link target {url} does not match any page")
+            return url
+        return route.url + hash_sign + fragment
+
+    def image_props(self, url, alt):
+        """
+        Build the attributes of an img tag for an image on this page.
+
+        Small static images are inlined as data URIs when below the site's inline threshold.
+        Known static images get their intrinsic width and height. Every image except
+        the first one on the page is lazy-loaded, since the first is usually above the fold.
+
+        Args:
+            url (str): The image URL as written in the markdown
+            alt (str): The alt text
+
+        Returns:
+            dict: The img tag attributes
+        """
+        props = {"src": self.site.data_uri(url) or self.asset_url(url), "alt": alt}
+        if not self.site.image_attributes:
+            return props
+
+        entry = self.site.asset_index.get(url)
+        if entry and entry.get("width"):
+            props["width"] = entry["width"]
+            props["height"] = entry["height"]
+        if self.image_count > 0:
+            props["loading"] = "lazy"
+        props["decoding"] = "async"
+
+        self.image_count += 1
+        return props
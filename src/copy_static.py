@@ -1,7 +1,13 @@
 import os
 import shutil
 
-def copy_static_to_public(source_dir, dest_dir):
+# Handle imports differently based on how the script is being run
+try:
+    from .walker import walk_manifest
+except ImportError:
+    from walker import walk_manifest
+
+def copy_static_to_public(source_dir, dest_dir, manifest=None):
     """
     Copy all contents from source directory to destination directory recursively.
     First deletes all contents of the destination directory to ensure a clean copy.
@@ -9,56 +15,63 @@ def copy_static_to_public(source_dir, dest_dir):
     Args:
         source_dir (str): Path to source directory (e.g., 'static')
         dest_dir (str): Path to destination directory (e.g., 'public')
+        manifest (list, optional): The source directory's walk_manifest, if already built
     """
     print(f"Starting copy from {source_dir} to {dest_dir}")
     
+    # Start from an empty destination directory
+    clean_directory(dest_dir)
+    
+    # Copy every entry of the source manifest
+    if manifest is None:
+        manifest = walk_manifest(source_dir)
+    _copy_manifest(manifest, dest_dir)
+    
+    print("Copy completed successfully!")
+
+def clean_directory(dest_dir):
+    """
+    Create the destination directory if needed and delete everything inside it.
+    
+    Args:
+        dest_dir (str): Path to the directory to clean (e.g., 'public')
+    """
     # Check if destination directory exists, create it if not
     if not os.path.exists(dest_dir):
-        os.mkdir(dest_dir)
+        os.makedirs(dest_dir)
         print(f"Created destination directory: {dest_dir}")
     
     # Delete all contents from destination directory
     print(f"Cleaning destination directory: {dest_dir}")
-    for item in os.listdir(dest_dir):
-        item_path = os.path.join(dest_dir, item)
-        if os.path.isfile(item_path):
-            os.remove(item_path)
-            print(f"Deleted file: {item_path}")
-        elif os.path.isdir(item_path):
-            shutil.rmtree(item_path)
-            print(f"Deleted directory: {item_path}")
-    
-    # Start the recursive copy
-    _recursive_copy(source_dir, dest_dir)
-    
-    print("Copy completed successfully!")
+    with os.scandir(dest_dir) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+                print(f"Deleted directory: {entry.path}")
+            else:
+                os.remove(entry.path)
+                print(f"Deleted file: {entry.path}")
 
-def _recursive_copy(source, dest):
+def _copy_manifest(manifest, dest):
     """
-    Internal helper function to recursively copy files and directories.
+    Internal helper function to copy the files and directories of a manifest.
     
     Args:
-        source (str): Source path
+        manifest (list): ManifestEntry objects, directories before their contents
         dest (str): Destination path
     """
-    # List all items in the source directory
-    for item in os.listdir(source):
-        source_path = os.path.join(source, item)
-        dest_path = os.path.join(dest, item)
+    for entry in manifest:
+        dest_path = os.path.join(dest, *entry.rel_path.split("/"))
         
-        # If it's a file, copy it
-        if os.path.isfile(source_path):
-            shutil.copy(source_path, dest_path)
-            print(f"Copied file: {source_path} -> {dest_path}")
+        # Directories come before their contents, so each is created exactly once
+        if entry.is_dir:
+            os.mkdir(dest_path)
+            print(f"Created directory: {dest_path}")
         
-        # If it's a directory, create it and copy contents recursively
-        elif os.path.isdir(source_path):
-            if not os.path.exists(dest_path):
-                os.mkdir(dest_path)
-                print(f"Created directory: {dest_path}")
-            
-            # Recursively copy contents of this subdirectory
-            _recursive_copy(source_path, dest_path)
+        # If it's a file, copy it
+        else:
+            shutil.copy(entry.path, dest_path)
+            print(f"Copied file: {entry.path} -> {dest_path}")
 
 if __name__ == "__main__":
     # Example usage
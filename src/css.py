@@ -0,0 +1,117 @@
+import hashlib
+import os
+import re
+
+# Handle imports differently based on how the script is being run
+try:
+    from .assets import fingerprint_url
+except ImportError:
+    from assets import fingerprint_url
+
+# Inline stylesheets only when they fit in the first TCP round trip along with the page
+DEFAULT_CSS_BUDGET = 14 * 1024
+
+_CSS_TOKEN_RE = re.compile(
+    r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')"""  # strings are copied verbatim
+    r"|(/\*.*?\*/)"                                # comments are dropped
+    r"|(\s+)"                                      # whitespace is collapsed
+    r"""|([^\s"'/]+|/)""",                         # everything else
+    re.DOTALL,
+)
+# Characters around which whitespace is never significant
+_CSS_PUNCTUATION = "{};,>"
+_STYLESHEET_LINK_RE = re.compile(r"<link\b[^>]*>")
+_RELATIVE_URL_RE = re.compile(r"""url\(\s*['"]?(?![a-z]+:|/)""", re.IGNORECASE)
+
+def minify_css(css):
+    """
+    Minify a stylesheet by removing comments and insignificant whitespace.
+
+    Args:
+        css (str): The stylesheet source
+
+    Returns:
+        str: The minified stylesheet
+    """
+    output = []
+    pending_space = False
+    for match in _CSS_TOKEN_RE.finditer(css):
+        string, comment, whitespace, other = match.groups()
+        if comment is not None:
+            continue
+        if whitespace is not None:
+            pending_space = True
+            continue
+
+        token = string if string is not None else other
+        # Keep a single space only where both sides need separating (e.g., "1px solid")
+        if pending_space and output and output[-1][-1] not in _CSS_PUNCTUATION + ":" and token[0] not in _CSS_PUNCTUATION:
+            output.append(" ")
+        pending_space = False
+
+        # The last declaration in a block doesn't need its semicolon; strings are never touched
+        if string is None:
+            token = token.replace(";}", "}")
+            if token[0] == "}" and output and output[-1][-1] == ";" and output[-1][0] not in "\"'":
+                output[-1] = output[-1][:-1]
+        output.append(token)
+
+    return "".join(output)
+
+def optimize_template_css(template_content, static_dir, output_dir, budget=DEFAULT_CSS_BUDGET, asset_map=None,
+                          publish=True):
+    """
+    Minify the stylesheets linked from a template and inline the ones that fit the budget.
+
+    A stylesheet that is too large (or uses relative url() references, which would
+    break once inlined) stays external: its minified version is written to the output
+    directory under a URL fingerprinted with the hash of the minified content, and the
+    link gets a preload hint and that URL.
+    This runs once per build on the template rather than once per page.
+
+    Args:
+        template_content (str): The HTML template
+        static_dir (str): Path to the static directory holding the stylesheets
+        output_dir (str): Directory the static files were copied to
+        budget (int, optional): Maximum size in bytes of a stylesheet to inline
+        asset_map (dict, optional): Maps original asset URLs to fingerprinted URLs; the
+            stylesheet's entry, if any, is overwritten with the minified version too
+        publish (bool, optional): Whether to write external stylesheets to the output directory.
+            Only the build that publishes static files (e.g., shard 1) should. Defaults to True
+
+    Returns:
+        str: The template with its stylesheet links rewritten
+    """
+    asset_map = asset_map or {}
+
+    def replace_link(match):
+        tag = match.group(0)
+        href = re.search(r'\bhref="(/[^"]*)"', tag)
+        if not re.search(r'\brel="?stylesheet\b', tag) or not href:
+            return tag
+        url = href.group(1)
+        source_path = os.path.join(static_dir, url.lstrip("/"))
+        if not os.path.isfile(source_path):
+            return tag
+
+        with open(source_path, "r") as f:
+            minified = minify_css(f.read())
+
+        if len(minified.encode("utf-8")) <= budget and not _RELATIVE_URL_RE.search(minified):
+            print(f"Inlining {url} into the template ({len(minified)} bytes)")
+            return f"<style>{minified}</style>"
+
+        # Too big to inline: publish the minified file under every name it is served as
+        digest = hashlib.sha256(minified.encode("utf-8")).hexdigest()
+        published_url = fingerprint_url(url, digest)
+        for public_url in ({url, asset_map.get(url, url), published_url} if publish else ()):
+            target_path = os.path.join(output_dir, public_url.lstrip("/"))
+            if os.path.exists(target_path):
+                os.remove(target_path)
+            with open(target_path, "w") as f:
+                f.write(minified)
+        print(f"Keeping {url} external as {published_url} ({len(minified)} bytes)")
+        return (f'<link rel="preload" href="{published_url}" as="style" />\n'
+                f'    <link href="{published_url}" rel="stylesheet" />')
+
+    return _STYLESHEET_LINK_RE.sub(replace_link, template_content)
@@ -0,0 +1,306 @@
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from urllib.parse import urlsplit
+from xml.sax.saxutils import escape, quoteattr
+
+# Handle imports differently based on how the script is being run
+try:
+    from .listing import listing_entry, listing_title
+except ImportError:
+    from listing import listing_entry, listing_title
+
+# The sitemap protocol allows at most this many URLs per file
+SITEMAP_MAX_URLS = 50000
+
+# Number of newest posts in each Atom feed
+DEFAULT_FEED_ENTRIES = 20
+
+# Name of the feed written into each listed directory
+FEED_NAME = "feed.xml"
+
+_SITEMAP_PART = re.compile(r"^sitemap-\d+\.xml$")
+
+def parse_site_url(value):
+    """
+    Parse the absolute URL the site is published at.
+
+    Args:
+        value (str): The URL, e.g. 'https://example.com'
+
+    Returns:
+        str: The URL without a trailing slash
+
+    Raises:
+        ValueError: If the URL is not an absolute http(s) URL
+    """
+    if not re.match(r"^https?://[^/]+", value):
+        raise ValueError(f"Invalid site URL '{value}': expected e.g. https://example.com")
+    return value.rstrip("/")
+
+def absolute_url(base_url, url):
+    """
+    Turn a page URL into the absolute URL crawlers and feed readers need.
+
+    Directories get their trailing slash, the form servers answer without a redirect.
+
+    Args:
+        base_url (str): The site URL plus basepath, ending in '/' (e.g., 'https://example.com/')
+        url (str): A route or listing URL without the basepath (e.g., '/blog/tom')
+
+    Returns:
+        str: The absolute URL (e.g., 'https://example.com/blog/tom/')
+    """
+    path = url.strip("/")
+    if not path:
+        return base_url
+    if path.endswith(".xml") or path.endswith(".html"):
+        return base_url + path
+    return base_url + path + "/"
+
+def atom_date(value):
+    """
+    Convert a front-matter date to the RFC 3339 timestamp Atom requires.
+
+    Args:
+        value (str): A date ('2024-01-02') or an ISO 8601 timestamp ('2024-01-02 10:30',
+            '2024-01-02T10:30:00+02:00')
+
+    Returns:
+        str: The timestamp; plain dates are midnight and timestamps without an offset are UTC
+
+    Raises:
+        ValueError: If the value is neither a date nor a timestamp
+    """
+    # Older Pythons don't read the 'Z' suffix, so spell it as an offset
+    text = re.sub(r"[zZ]$", "+00:00", str(value).strip())
+    try:
+        timestamp = datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}': expected YYYY-MM-DD or an ISO 8601 timestamp")
+    if not timestamp.utcoffset():
+        return timestamp.strftime("%Y-%m-%dT%H:%M:%S") + "Z"
+    return timestamp.isoformat(timespec="seconds")
+
+def write_sitemap(entries, dest_dir, base_url, max_urls=SITEMAP_MAX_URLS):
+    """
+    Write sitemap.xml, streaming the URLs to disk as they arrive.
+
+    Up to max_urls URLs go into sitemap.xml itself. Larger sites are split into
+    sitemap-1.xml, sitemap-2.xml, ... and sitemap.xml becomes an index of them.
+    Parts left over from a larger previous sitemap are removed.
+
+    Args:
+        entries (iterable): (absolute URL, lastmod or None) for every page, in output order
+        dest_dir (str): The destination directory
+        base_url (str): The site URL plus basepath, used to link the parts from the index
+        max_urls (int, optional): Maximum number of URLs per file
+
+    Returns:
+        list: Names of the files written, relative to dest_dir
+    """
+    parts = []
+    f = None
+    count = 0
+    try:
+        for loc, lastmod in entries:
+            # Start a new part whenever the current one is full
+            if f is None or count == max_urls:
+                if f is not None:
+                    f.write("</urlset>\n")
+                    f.close()
+                parts.append(f"sitemap-{len(parts) + 1}.xml")
+                f = open(os.path.join(dest_dir, parts[-1]), "w", encoding="utf-8")
+                f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+                count = 0
+            f.write(f"<url><loc>{escape(loc)}</loc>")
+            if lastmod:
+                f.write(f"<lastmod>{escape(lastmod)}</lastmod>")
+            f.write("</url>\n")
+            count += 1
+    finally:
+        if f is not None:
+            f.write("</urlset>\n")
+            f.close()
+
+    sitemap_path = os.path.join(dest_dir, "sitemap.xml")
+    if len(parts) <= 1:
+        # A single part is the sitemap itself
+        if parts:
+            os.replace(os.path.join(dest_dir, parts[0]), sitemap_path)
+        else:
+            with open(sitemap_path, "w", encoding="utf-8") as f:
+                f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n</urlset>\n')
+        parts = []
+    else:
+        with open(sitemap_path, "w", encoding="utf-8") as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                    '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+            for part in parts:
+                f.write(f"<sitemap><loc>{escape(base_url + part)}</loc></sitemap>\n")
+            f.write("</sitemapindex>\n")
+
+    # Remove parts of a previous, larger sitemap
+    for name in os.listdir(dest_dir):
+        if _SITEMAP_PART.match(name) and name not in parts:
+            os.remove(os.path.join(dest_dir, name))
+
+    return ["sitemap.xml"] + parts
+
+def write_atom_feed(path, title, entries, base_url, directory_url, author=None):
+    """
+    Write an Atom feed of a directory's newest posts.
+
+    The feed's updated time is that of its newest post, so an unchanged blog
+    produces a byte-identical feed. Atom requires an author: the feed names the
+    site author, and posts whose front matter sets 'author' name their own.
+
+    Args:
+        path (str): Path of the feed file
+        title (str): Title of the feed
+        entries (list): Listing entries (url, title, date, summary, author), newest first, all dated
+        base_url (str): The site URL plus basepath, ending in '/'
+        directory_url (str): URL of the listed directory (e.g., '/blog')
+        author (str, optional): The site author. Defaults to the site's host name
+
+    Raises:
+        ValueError: If a post's date is not a valid date or timestamp
+    """
+    feed_url = absolute_url(base_url, f"{directory_url}/{FEED_NAME}")
+    if not author:
+        author = urlsplit(base_url).hostname
+
+    # Convert every date before the file is opened, so a bad date leaves no partial feed
+    dates = []
+    for entry in entries:
+        try:
+            dates.append(atom_date(entry["date"]))
+        except ValueError as e:
+            raise ValueError(f"Post {entry['url']}: {e}")
+    updated = dates[0] if dates else "1970-01-01T00:00:00Z"
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<feed xmlns="http://www.w3.org/2005/Atom">\n')
+        f.write(f"<title>{escape(title)}</title>\n")
+        f.write(f"<id>{escape(feed_url)}</id>\n")
+        f.write(f"<link rel=\"self\" href={quoteattr(feed_url)}/>\n")
+        f.write(f"<link href={quoteattr(absolute_url(base_url, directory_url))}/>\n")
+        f.write(f"<updated>{escape(updated)}</updated>\n")
+        f.write(f"<author><name>{escape(author)}</name></author>\n")
+        for entry, date in zip(entries, dates):
+            url = absolute_url(base_url, entry["url"])
+            f.write("<entry>")
+            f.write(f"<title>{escape(entry['title'] or '')}</title>")
+            f.write(f"<id>{escape(url)}</id>")
+            f.write(f"<link href={quoteattr(url)}/>")
+            f.write(f"<updated>{escape(date)}</updated>")
+            if entry.get("author"):
+                f.write(f"<author><name>{escape(str(entry['author']))}</name></author>")
+            if entry["summary"]:
+                f.write(f"<summary>{escape(entry['summary'])}</summary>")
+            f.write("</entry>\n")
+        f.write("</feed>\n")
+
+def generate_sitemap(routes, listing_urls, content_index, dest_dir, base_url):
+    """
+    Write the sitemap of every page and listing, unless nothing in it changed.
+
+    URLs and dates come from the route table built for the pages, so no source is
+    read again. A fingerprint of the entries is kept in the content index, and the
+    sitemap is rewritten only when a route, a date or the site URL changed or the
+    file is missing.
+
+    Args:
+        routes (RouteTable): The site's pages
+        listing_urls (list): URLs of the generated listing pages
+        content_index (ContentIndex): Index holding the previous sitemap's fingerprint
+        dest_dir (str): The destination directory
+        base_url (str): The site URL plus basepath, ending in '/'
+
+    Returns:
+        bool: Whether the sitemap was written
+    """
+    def entries():
+        for route in routes:
+            date = route.metadata.get("date")
+            yield absolute_url(base_url, route.url), str(date) if date is not None else None
+        for url in listing_urls:
+            yield absolute_url(base_url, url), None
+
+    # Hash the entries in a first streaming pass, so unchanged sites skip the write
+    digest = hashlib.sha256(base_url.encode("utf-8"))
+    for loc, lastmod in entries():
+        digest.update(f"{loc}\0{lastmod}\n".encode("utf-8"))
+    fingerprint = digest.hexdigest()
+
+    if (content_index.get_state("sitemap") == fingerprint
+            and os.path.exists(os.path.join(dest_dir, "sitemap.xml"))):
+        return False
+
+    files = write_sitemap(entries(), dest_dir, base_url)
+    print(f"Wrote {', '.join(files)}")
+    content_index.set_state("sitemap", fingerprint)
+    return True
+
+def generate_feeds(directories, content_index, dest_dir, base_url, max_entries=DEFAULT_FEED_ENTRIES,
+                   include_drafts=False, author=None):
+    """
+    Write an Atom feed of the newest posts below each listed content directory.
+
+    Like the listings, feeds are built from the page metadata in the content index.
+    Only dated posts appear in a feed, and a feed is rewritten only when its entries
+    changed or its file is missing. Feeds of directories no longer listed are removed.
+
+    Args:
+        directories (list): Content directories, relative to the content root (e.g., ['blog'])
+        content_index (ContentIndex): Index already updated with this build's pages
+        dest_dir (str): The destination directory
+        base_url (str): The site URL plus basepath, ending in '/'
+        max_entries (int, optional): Number of newest posts in each feed
+        include_drafts (bool, optional): Whether drafts appear in the feeds. Defaults to False
+        author (str, optional): The site author. Defaults to the site's host name
+
+    Returns:
+        list: URLs of all feeds, without the basepath (e.g., ['/blog/feed.xml'])
+
+    Raises:
+        ValueError: If a post's date is not a valid date or timestamp
+    """
+    previous = content_index.get_state("feeds", {})
+    fingerprints = {}
+
+    for directory in directories:
+        directory_url = "/" + directory.strip("/")
+        feed_url = f"{directory_url}/{FEED_NAME}"
+        path = os.path.join(dest_dir, *feed_url.strip("/").split("/"))
+
+        rows = content_index.pages(directory_url + "/", include_drafts, limit=max_entries)
+        # Undated pages sort last, so the limit keeps the newest dated posts
+        entries = [listing_entry(row) for row in rows if row["date"] is not None]
+        title = listing_title(directory)
+
+        data = json.dumps([base_url, title, author, entries], sort_keys=True)
+        fingerprint = hashlib.sha256(data.encode("utf-8")).hexdigest()
+        fingerprints[feed_url] = fingerprint
+        if previous.get(feed_url) == fingerprint and os.path.exists(path):
+            continue
+
+        print(f"Writing feed {feed_url}")
+        write_atom_feed(path, title, entries, base_url, directory_url, author)
+
+    # Remove feeds of directories that are no longer listed
+    for feed_url in previous:
+        if feed_url not in fingerprints:
+            path = os.path.join(dest_dir, *feed_url.strip("/").split("/"))
+            if os.path.exists(path):
+                os.remove(path)
+                print(f"Deleted feed {feed_url}")
+
+    content_index.set_state("feeds", fingerprints)
+    return list(fingerprints)
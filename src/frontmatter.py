@@ -0,0 +1,112 @@
+# Line that opens and closes a front-matter block
+FRONT_MATTER_DELIMITER = "---"
+
+def parse_front_matter(lines, path=None):
+    """
+    Parse the key/value lines of a front-matter block.
+
+    Each line has the form 'key: value'. Values wrapped in quotes are unquoted,
+    '[a, b]' becomes a list, and 'true'/'false' become booleans; everything else,
+    including dates, is kept as a string. Blank lines and lines starting with '#'
+    are ignored.
+
+    Args:
+        lines (list): The lines between the delimiters
+        path (str, optional): Path of the source file, named in errors
+
+    Returns:
+        dict: The metadata
+
+    Raises:
+        ValueError: If a line is not a key/value pair
+    """
+    metadata = {}
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        key, separator, value = line.partition(":")
+        if not separator or not key.strip():
+            location = f" in {path}" if path else ""
+            raise ValueError(f"Invalid front matter line{location}: {line}")
+        metadata[key.strip()] = _parse_value(value.strip())
+    return metadata
+
+def _parse_value(value):
+    """
+    Internal helper that converts a front-matter value to a string, list or boolean.
+
+    Args:
+        value (str): The raw value
+
+    Returns:
+        str, list or bool: The parsed value
+    """
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value.startswith("[") and value.endswith("]"):
+        return [_parse_value(item.strip()) for item in value[1:-1].split(",") if item.strip()]
+    if value in ("true", "false"):
+        return value == "true"
+    return value
+
+def split_front_matter(markdown, path=None):
+    """
+    Separate the front-matter block at the top of a markdown document from its body.
+
+    The header lines are replaced with empty lines rather than removed, so line
+    numbers in the body still match the source file.
+
+    Args:
+        markdown (str): The markdown document
+        path (str, optional): Path of the source file, named in errors
+
+    Returns:
+        tuple: (metadata dict, body) where metadata is empty if there is no front matter
+
+    Raises:
+        ValueError: If the block is not closed or contains an invalid line
+    """
+    if not markdown.startswith(FRONT_MATTER_DELIMITER):
+        return {}, markdown
+
+    lines = markdown.split("\n")
+    if lines[0].rstrip() != FRONT_MATTER_DELIMITER:
+        return {}, markdown
+    for index in range(1, len(lines)):
+        if lines[index].rstrip() == FRONT_MATTER_DELIMITER:
+            metadata = parse_front_matter(lines[1:index], path)
+            return metadata, "\n" * (index + 1) + "\n".join(lines[index + 1:])
+
+    location = f" in {path}" if path else ""
+    raise ValueError(f"Front matter{location} is not closed with ---")
+
+def read_front_matter(path):
+    """
+    Read the front matter of a markdown file without reading its body.
+
+    Only the lines up to the closing delimiter are read, so scanning the metadata
+    of thousands of posts costs little more than opening them.
+
+    Args:
+        path (str): Path to the markdown file
+
+    Returns:
+        dict: The metadata, empty if the file has no front matter
+
+    Raises:
+        ValueError: If the block is not closed or contains an invalid line
+    """
+    # Lines are decoded one at a time, so the body is never decoded or parsed
+    with open(path, "rb") as f:
+        if f.readline().decode("utf-8").rstrip() != FRONT_MATTER_DELIMITER:
+            return {}
+        lines = []
+        for line in f:
+            line = line.decode("utf-8")
+            if line.rstrip() == FRONT_MATTER_DELIMITER:
+                return parse_front_matter(lines, path)
+            lines.append(line)
+
+    raise ValueError(f"Front matter in {path} is not closed with ---")
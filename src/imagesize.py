@@ -0,0 +1,76 @@
+import struct
+
+# File extensions whose headers read_image_size understands
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif")
+
+# JPEG start-of-frame markers (SOF0-SOF15 except DHT, JPG and DAC)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+def read_image_size(path):
+    """
+    Read the intrinsic dimensions of a PNG, GIF or JPEG image from its header.
+
+    Only the header bytes are read; the image data is never decoded.
+
+    Args:
+        path (str): Path to the image file
+
+    Returns:
+        tuple: (width, height) in pixels, or None if the format is not recognized
+    """
+    with open(path, "rb") as f:
+        header = f.read(26)
+
+        # PNG: signature followed by the IHDR chunk holding width and height
+        if header.startswith(b"\x89PNG\r\n\x1a\n") and header[12:16] == b"IHDR":
+            return struct.unpack(">II", header[16:24])
+
+        # GIF: logical screen descriptor right after the signature
+        if header[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", header[6:10])
+
+        # JPEG: walk the marker segments until a start-of-frame marker
+        if header.startswith(b"\xff\xd8"):
+            f.seek(2)
+            return _read_jpeg_size(f)
+
+    return None
+
+def _read_jpeg_size(f):
+    """
+    Internal helper that scans JPEG marker segments for the frame dimensions.
+
+    Args:
+        f (file): Binary file positioned just after the SOI marker
+
+    Returns:
+        tuple: (width, height) in pixels, or None if no frame header is found
+    """
+    while True:
+        # Every marker starts with 0xFF, optionally repeated as fill bytes
+        if f.read(1) != b"\xff":
+            return None
+        byte = f.read(1)
+        while byte == b"\xff":
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+
+        # Standalone markers carry no length field
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            continue
+
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack(">H", length_bytes)[0]
+
+        if marker in _JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+
+        f.seek(length - 2, 1)
@@ -0,0 +1,67 @@
+import posixpath
+
+def is_internal_url(url):
+    """
+    Tell whether a URL points into the generated site.
+
+    Args:
+        url (str): An href or src value
+
+    Returns:
+        bool: False for absolute URLs with a scheme or host, data URIs and same-page anchors
+    """
+    if not url or url.startswith(("#", "//")):
+        return False
+    # A colon before the first slash marks a scheme, e.g. 'https:', 'mailto:' or 'data:'
+    return ":" not in url.split("/", 1)[0]
+
+def check_links(results, routes, known_urls):
+    """
+    Check the internal links of generated pages against everything the build publishes.
+
+    Every lookup is a set or dict membership test, so checking costs no filesystem
+    access and time proportional to the number of links.
+
+    Args:
+        results (list): PageResult objects carrying the links recorded while rendering
+        routes (RouteTable): The site's pages
+        known_urls (set): Other published URLs, e.g. static and fingerprinted assets
+
+    Returns:
+        list: (source_path, line, url) for every link whose target is not published
+    """
+    broken = []
+    for result in results:
+        # Pages are served as directory indexes, so relative links resolve below the page URL
+        route = routes.for_source(result.source_path)
+        base = route.url.rstrip("/") + "/" if route is not None else "/"
+
+        for url, line in result.links:
+            path = url.split("#", 1)[0].split("?", 1)[0]
+            if not path:
+                continue
+            if not path.startswith("/"):
+                path = posixpath.normpath(posixpath.join(base, path))
+
+            if path in known_urls or routes.for_url(path) is not None:
+                continue
+            if path.endswith("/index.html") and routes.for_output(path[1:]) is not None:
+                continue
+            broken.append((result.source_path, line, url))
+
+    return broken
+
+def print_broken_links(broken):
+    """
+    Print a report of broken links, one per line in file:line form.
+
+    Args:
+        broken (list): (source_path, line, url) tuples as returned by check_links
+    """
+    if not broken:
+        print("Link check: no broken internal links")
+        return
+
+    print(f"Link check: {len(broken)} broken internal links")
+    for source_path, line, url in broken:
+        print(f"- {source_path}:{line}: {url}")
@@ -0,0 +1,154 @@
+import hashlib
+import json
+
+# Handle imports differently based on how the script is being run
+try:
+    from .htmlnode import LeafNode, ParentNode
+    from .pageresult import reading_minutes
+except ImportError:
+    from htmlnode import LeafNode, ParentNode
+    from pageresult import reading_minutes
+
+# Number of posts on each listing page
+DEFAULT_PAGE_SIZE = 10
+
+def listing_url(directory_url, page_number):
+    """
+    Return the URL of one page of a directory's listing.
+
+    Args:
+        directory_url (str): URL of the listed directory (e.g., '/blog')
+        page_number (int): 1-based page number
+
+    Returns:
+        str: '/blog' for the first page, '/blog/page/2' for the second, and so on
+    """
+    if page_number == 1:
+        return directory_url
+    return f"{directory_url.rstrip('/')}/page/{page_number}"
+
+def listing_title(directory):
+    """
+    Derive the heading of a directory's listing from its name.
+
+    Args:
+        directory (str): Content directory relative to the content root (e.g., 'blog/book-reviews')
+
+    Returns:
+        str: The title, e.g. 'Book Reviews'
+    """
+    return directory.strip("/").split("/")[-1].replace("-", " ").title()
+
+def parse_page_size(value):
+    """
+    Parse the number of posts per listing page.
+
+    Args:
+        value (str): The number, e.g. '10'
+
+    Returns:
+        int: The page size, at least 1
+
+    Raises:
+        ValueError: If the value is not an integer or is below 1
+    """
+    try:
+        page_size = int(value)
+    except ValueError:
+        raise ValueError(f"Invalid listing page size '{value}': expected an integer")
+    if page_size < 1:
+        raise ValueError(f"Invalid listing page size '{value}': at least 1 post per page is needed")
+    return page_size
+
+def paginate(entries, page_size):
+    """
+    Split listing entries into pages.
+
+    Args:
+        entries (list): The entries, already sorted
+        page_size (int): Maximum number of entries per page
+
+    Returns:
+        list: Lists of entries, with at least one (possibly empty) page
+
+    Raises:
+        ValueError: If page_size is less than 1
+    """
+    if page_size < 1:
+        raise ValueError(f"Invalid listing page size: {page_size}")
+    pages = [entries[i:i + page_size] for i in range(0, len(entries), page_size)]
+    return pages or [[]]
+
+def listing_entry(row):
+    """
+    Build a listing entry from a content index row, without touching the post itself.
+
+    Args:
+        row (sqlite3.Row): A row returned by ContentIndex.pages
+
+    Returns:
+        dict: The entry's 'url', 'title', 'date', 'summary' and 'author' (from the front matter)
+            and 'reading_minutes' (None if the word count is unknown)
+    """
+    metadata = json.loads(row["metadata"])
+    minutes = reading_minutes(row["word_count"]) if row["word_count"] else None
+    return {"url": row["url"], "title": row["title"], "date": row["date"], "summary": metadata.get("summary"),
+            "author": metadata.get("author"), "reading_minutes": minutes}
+
+def listing_html_node(title, entries, directory_url, page_number, page_count):
+    """
+    Build the content of one listing page.
+
+    Args:
+        title (str): Heading of the listing
+        entries (list): The entries shown on this page
+        directory_url (str): URL of the listed directory
+        page_number (int): 1-based number of this page
+        page_count (int): Total number of pages
+
+    Returns:
+        ParentNode: A div with the heading, the list of posts and the pagination links
+    """
+    items = []
+    for entry in entries:
+        children = [LeafNode("a", entry["title"], {"href": entry["url"]})]
+        if entry["date"]:
+            children.append(LeafNode(None, " "))
+            children.append(LeafNode("time", entry["date"], {"datetime": entry["date"]}))
+        if entry.get("reading_minutes"):
+            children.append(LeafNode(None, " "))
+            children.append(LeafNode("span", f"{entry['reading_minutes']} min read", {"class": "reading-time"}))
+        if entry["summary"]:
+            children.append(LeafNode("p", entry["summary"]))
+        items.append(ParentNode("li", children))
+
+    children = [LeafNode("h1", title)]
+    if items:
+        children.append(ParentNode("ul", items, {"class": "listing"}))
+
+    # Newer posts are on lower page numbers
+    links = []
+    if page_number > 1:
+        links.append(LeafNode("a", "Newer posts", {"href": listing_url(directory_url, page_number - 1), "rel": "prev"}))
+    if page_number < page_count:
+        links.append(LeafNode("a", "Older posts", {"href": listing_url(directory_url, page_number + 1), "rel": "next"}))
+    if links:
+        children.append(ParentNode("nav", links, {"class": "pagination"}))
+
+    return ParentNode("div", children)
+
+def listing_fingerprint(entries, page_number, page_count, settings):
+    """
+    Summarize everything a listing page's HTML depends on.
+
+    Args:
+        entries (list): The entries shown on the page
+        page_number (int): 1-based number of the page
+        page_count (int): Total number of pages
+        settings (list): JSON-serializable build settings, e.g. the template hash and basepath
+
+    Returns:
+        str: A hex digest that changes whenever the page would render differently
+    """
+    data = json.dumps([entries, page_number, page_count, settings], sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
@@ -1,6 +1,8 @@
-import sys
 import os
+import hashlib
 import re
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
 
 # Handle imports differently based on how the script is being run
@@ -8,12 +10,56 @@ try:
     # Try relative imports first (when imported as a module)
     from .textnode import TextNode, TextType
     from .htmlnode import LeafNode, ParentNode
-    from .copy_static import copy_static_to_public
+    from .copy_static import copy_static_to_public, clean_directory
+    from .precompress import precompress_outputs
+    from .minify import minify_html
+    from .pageresult import PageResult, print_build_summary
+    from .assets import build_asset_index, build_fingerprint_map, publish_fingerprinted_assets
+    from .context import SiteContext, install_worker_site, worker_site
+    from .pngopt import optimize_pngs
+    from .css import DEFAULT_CSS_BUDGET, optimize_template_css
+    from .pipeline import parse_worker_count, run_pipeline
+    from .sharding import parse_shard, shard_for_path, write_shard_manifest, merge_shards
+    from .buildcache import DEFAULT_MAX_BYTES, BuildCache, renderer_version
+    from .contentindex import ContentIndex
+    from .changes import detect_changes
+    from .walker import walk_manifest
+    from .routes import build_route_table
+    from .linkcheck import check_links, print_broken_links
+    from .frontmatter import split_front_matter
+    from .feeds import parse_site_url, generate_sitemap, generate_feeds
+    from .search import SEARCH_DIR, write_search_index
+    from .toc import TOC_PLACEHOLDER, toc_html_node
+    from .related import DEFAULT_RELATED_COUNT, RELATED_ELEMENT, RELATED_PLACEHOLDER, update_related_posts
+    from .listing import (DEFAULT_PAGE_SIZE, listing_entry, listing_fingerprint, listing_html_node, listing_title,
+                          listing_url, paginate, parse_page_size)
 except ImportError:
     # Fall back to direct imports (when run directly)
     from textnode import TextNode, TextType
     from htmlnode import LeafNode, ParentNode
-    from copy_static import copy_static_to_public
+    from copy_static import copy_static_to_public, clean_directory
+    from precompress import precompress_outputs
+    from minify import minify_html
+    from pageresult import PageResult, print_build_summary
+    from assets import build_asset_index, build_fingerprint_map, publish_fingerprinted_assets
+    from context import SiteContext, install_worker_site, worker_site
+    from pngopt import optimize_pngs
+    from css import DEFAULT_CSS_BUDGET, optimize_template_css
+    from pipeline import parse_worker_count, run_pipeline
+    from sharding import parse_shard, shard_for_path, write_shard_manifest, merge_shards
+    from buildcache import DEFAULT_MAX_BYTES, BuildCache, renderer_version
+    from contentindex import ContentIndex
+    from changes import detect_changes
+    from walker import walk_manifest
+    from routes import build_route_table
+    from linkcheck import check_links, print_broken_links
+    from frontmatter import split_front_matter
+    from feeds import parse_site_url, generate_sitemap, generate_feeds
+    from search import SEARCH_DIR, write_search_index
+    from toc import TOC_PLACEHOLDER, toc_html_node
+    from related import DEFAULT_RELATED_COUNT, RELATED_ELEMENT, RELATED_PLACEHOLDER, update_related_posts
+    from listing import (DEFAULT_PAGE_SIZE, listing_entry, listing_fingerprint, listing_html_node, listing_title,
+                         listing_url, paginate, parse_page_size)
 
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
@@ -94,12 +140,19 @@ def extract_markdown_links(text):
     pattern = r"(?<!!)\[(.*?)\]\(([^\(\)]*)\)"
     return re.findall(pattern, text)
 
-def text_node_to_html_node(text_node):
+# Text types whose text is indexed for search (image alt text and URLs are not)
+_SEARCHABLE_TEXT_TYPES = (TextType.NORMAL, TextType.BOLD, TextType.ITALIC, TextType.CODE, TextType.LINK)
+
+# Text types counted as words for the reading time (code is skimmed, not read)
+_PROSE_TEXT_TYPES = (TextType.NORMAL, TextType.BOLD, TextType.ITALIC)
+
+def text_node_to_html_node(text_node, context=None):
     """
     Convert a TextNode to an HTMLNode based on its TextType.
     
     Args:
         text_node (TextNode): The TextNode to convert
+        context (PageContext, optional): Rendering context used to rewrite asset URLs and image attributes
         
     Returns:
         LeafNode: An HTML node representing the text node
@@ -107,6 +160,10 @@ def text_node_to_html_node(text_node):
     Raises:
         Exception: If the TextNode has an unrecognized TextType
     """
+    # Index the visible text for search and count its words while it is being rendered
+    if context and text_node.text_type in _SEARCHABLE_TEXT_TYPES:
+        context.record_text(text_node.text, text_node.text_type in _PROSE_TEXT_TYPES)
+    
     if text_node.text_type == TextType.NORMAL:
         # For normal text, return a LeafNode with no tag
         return LeafNode(None, text_node.text)
@@ -125,10 +182,17 @@ def text_node_to_html_node(text_node):
     
     elif text_node.text_type == TextType.LINK:
         # For links, use an "a" tag with href property
-        return LeafNode("a", text_node.text, {"href": text_node.url})
+        href = context.asset_url(text_node.url) if context else text_node.url
+        if context:
+            context.record_link(href, text_node.line)
+        return LeafNode("a", text_node.text, {"href": href})
     
     elif text_node.text_type == TextType.IMAGE:
         # For images, use an "img" tag with src and alt properties
+        if context:
+            props = context.image_props(text_node.url, text_node.text)
+            context.record_link(props["src"], text_node.line)
+            return LeafNode("img", "", props)
         return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
     
     else:
@@ -191,12 +255,13 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     
     return new_nodes
 
-def split_nodes_image(old_nodes):
+def split_nodes_image(old_nodes, context=None):
     """
     Split TextNodes by markdown image syntax and convert to image nodes.
     
     Args:
         old_nodes (list): List of TextNode objects
+        context (PageContext, optional): Per-page context used to locate images in the source
     
     Returns:
         list: New list of TextNode objects with images converted to image nodes
@@ -231,7 +296,8 @@ def split_nodes_image(old_nodes):
             
             # Add the image as an image node (if not empty)
             if image_alt or image_url:  # At least one of them should be non-empty
-                new_nodes.append(TextNode(image_alt, TextType.IMAGE, image_url))
+                line = context.source_line(image_markdown) if context else None
+                new_nodes.append(TextNode(image_alt, TextType.IMAGE, image_url, line))
             
             # Update remaining text
             if len(sections) > 1:
@@ -245,12 +311,16 @@ def split_nodes_image(old_nodes):
     
     return new_nodes
 
-def split_nodes_link(old_nodes):
+def split_nodes_link(old_nodes, context=None):
     """
     Split TextNodes by markdown link syntax and convert to link nodes.
     
+    With a page context, links to markdown sources (e.g. '../tom/index.md') are
+    rewritten to the URL of the generated page.
+    
     Args:
         old_nodes (list): List of TextNode objects
+        context (PageContext, optional): Per-page context used to resolve links to other pages and locate them
     
     Returns:
         list: New list of TextNode objects with links converted to link nodes
@@ -285,7 +355,9 @@ def split_nodes_link(old_nodes):
             
             # Add the link as a link node (if not empty)
             if anchor_text or url:  # At least one of them should be non-empty
-                new_nodes.append(TextNode(anchor_text, TextType.LINK, url))
+                target = context.resolve_link(url) if context else url
+                line = context.source_line(link_markdown) if context else None
+                new_nodes.append(TextNode(anchor_text, TextType.LINK, target, line))
             
             # Update remaining text
             if len(sections) > 1:
@@ -324,6 +396,28 @@ def markdown_to_blocks(markdown):
     
     return result
 
+def markdown_to_blocks_with_lines(markdown):
+    """
+    Split a markdown string into blocks like markdown_to_blocks, keeping their line numbers.
+    
+    Args:
+        markdown (str): The raw markdown string
+        
+    Returns:
+        list: (block, line) tuples, where line is the 1-based line the block starts on
+    """
+    result = []
+    line = 1
+    for part in markdown.split("\n\n"):
+        block = part.strip()
+        if block:
+            # Skip the newlines in the whitespace stripped from the front of the block
+            leading = part[:len(part) - len(part.lstrip())]
+            result.append((block, line + leading.count("\n")))
+        line += part.count("\n") + 2
+    
+    return result
+
 def extract_title(markdown):
     """
     Extract the h1 header from a markdown string.
@@ -348,126 +442,350 @@ def extract_title(markdown):
     # If no h1 header is found, raise an exception
     raise Exception("No h1 header found in the markdown")
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
+def compile_page(markdown, context=None):
     """
-    Generate an HTML page from a markdown file using a template.
+    Compile a page's markdown into its body HTML, title, headings and metadata in one pass.
+    
+    The front matter is split off, then every block is rendered once. Headings are
+    recorded by the page context while their blocks are rendered, so the title comes
+    from the first h1 block without scanning the markdown again.
     
     Args:
-        from_path (str): Path to the source markdown file
-        template_path (str): Path to the HTML template file
-        dest_path (str): Path where the output HTML file should be written
-        basepath (str, optional): The base path for all URLs. Defaults to "/"
+        markdown (str): The page's markdown source, including any front matter
+        context (PageContext, optional): Rendering context for this page. A standalone one is used if None
+        
+    Returns:
+        tuple: (html, title, headings, metadata) where headings are (level, id, text) in document order
+        
+    Raises:
+        Exception: If the page has neither a front-matter title nor an h1 header
     """
-    import os
+    if context is None:
+        context = SiteContext().page()
     
-    # Print informative message
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    # Set the front matter aside; its lines stay as blanks so line numbers still match
+    metadata, body = split_front_matter(markdown, context.source_path)
     
-    # Read the markdown file
-    with open(from_path, "r") as f:
-        markdown_content = f.read()
+    # Convert markdown to HTML, splitting very large documents across processes
+    if context.site.parallel_threshold:
+        html_node = markdown_to_html_node_parallel(body, context, context.site.block_executor(),
+                                                   threshold=context.site.parallel_threshold)
+    else:
+        html_node = markdown_to_html_node(body, context)
     
-    # Read the template file
-    with open(template_path, "r") as f:
-        template_content = f.read()
+    # Use the front-matter title, or the text of the first h1 found while rendering
+    title = metadata.get("title")
+    if title is None:
+        title = next((text for level, _, text in context.headings if level == 1), None)
+        if title is None:
+            raise Exception("No h1 header found in the markdown")
     
-    # Convert markdown to HTML
-    html_node = markdown_to_html_node(markdown_content)
-    html_content = html_node.to_html()
+    return html_node.to_html(), title, context.headings, metadata
+
+def render_page(markdown_content, template_content, basepath="/", minify=False, context=None):
+    """
+    Render markdown into a complete HTML page using an already-loaded template.
     
-    # Extract the title
-    title = extract_title(markdown_content)
+    This is the CPU-bound part of page generation; it does no file I/O.
     
-    # Replace placeholders in the template
+    Args:
+        markdown_content (str): The page's markdown source
+        template_content (str): The HTML template
+        basepath (str, optional): The base path for all URLs. Defaults to "/"
+        minify (bool, optional): Whether to minify the generated HTML. Defaults to False
+        context (PageContext, optional): Rendering context for this page
+        
+    Returns:
+        tuple: (final_html, title, bytes_saved)
+    """
+    html_content, title, headings, _ = compile_page(markdown_content, context)
+    
+    # The table of contents comes from the headings recorded while rendering
+    toc_node = toc_html_node(headings)
+    toc_html = toc_node.to_html() if toc_node is not None else ""
+    
+    # Only pages below a related posts directory get the element the related posts are written into
+    related = context is not None and context.shows_related_posts()
+    final_html, bytes_saved = fill_template(template_content, title, html_content, basepath, minify, toc_html,
+                                            related)
+    return final_html, title, bytes_saved
+
+def fill_template(template_content, title, html_content, basepath="/", minify=False, toc_html="", related=False):
+    """
+    Put a page's title and content into the template and apply the basepath.
+    
+    Args:
+        template_content (str): The HTML template
+        title (str): The page title
+        html_content (str): The page body HTML
+        basepath (str, optional): The base path for all URLs. Defaults to "/"
+        minify (bool, optional): Whether to minify the page. Defaults to False
+        toc_html (str, optional): The table of contents, for templates with a {{ TOC }} placeholder
+        related (bool, optional): Whether the page gets a related posts element. Defaults to False
+        
+    Returns:
+        tuple: (final_html, bytes_saved)
+    """
+    # Replace placeholders in the template; related posts are filled in after every page is indexed
     final_html = template_content.replace("{{ Title }}", title).replace("{{ Content }}", html_content)
+    final_html = final_html.replace(TOC_PLACEHOLDER, toc_html)
+    final_html = final_html.replace(RELATED_PLACEHOLDER, RELATED_ELEMENT if related else "")
     
     # Replace URLs to use the provided basepath
     final_html = final_html.replace('href="/', f'href="{basepath}')
     final_html = final_html.replace('src="/', f'src="{basepath}')
     
+    # Optionally strip insignificant whitespace, quotes and comments
+    bytes_saved = 0
+    if minify:
+        original_size = len(final_html.encode("utf-8"))
+        final_html = minify_html(final_html)
+        bytes_saved = original_size - len(final_html.encode("utf-8"))
+    
+    return final_html, bytes_saved
+
+def write_page(dest_path, final_html, create_dirs=True):
+    """
+    Write a generated page, creating its directory if needed.
+    
+    Args:
+        dest_path (str): Path where the output HTML file should be written
+        final_html (str): The page HTML
+        create_dirs (bool, optional): Whether to create the directory. Defaults to True
+    """
     # Ensure destination directory exists
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    if create_dirs:
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
     
     # Write the output file
     with open(dest_path, "w") as f:
         f.write(final_html)
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, content_root=None, basepath="/"):
+def generate_page(from_path, template_path, dest_path, basepath="/", minify=False, context=None):
+    """
+    Generate an HTML page from a markdown file using a template.
+    
+    Args:
+        from_path (str): Path to the source markdown file
+        template_path (str): Path to the HTML template file
+        dest_path (str): Path where the output HTML file should be written
+        basepath (str, optional): The base path for all URLs. Defaults to "/"
+        minify (bool, optional): Whether to minify the generated HTML. Defaults to False
+        context (SiteContext, optional): Build-wide context shared between pages
+        
+    Returns:
+        PageResult: Information about the generated page
+    """
+    # Print informative message
+    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    
+    # Read the markdown file
+    with open(from_path, "r") as f:
+        markdown_content = f.read()
+    
+    # Read the template file (prepared once per build by the site context)
+    if context is None:
+        context = SiteContext()
+    template_content = context.load_template(template_path)
+    
+    final_html, title, bytes_saved = render_page(markdown_content, template_content, basepath, minify,
+                                                 context.page(from_path))
+    write_page(dest_path, final_html)
+    
+    return PageResult(from_path, dest_path, title, len(final_html.encode("utf-8")), bytes_saved)
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, content_root=None, basepath="/", minify=False, context=None, io_workers=4, shard=None, page_cache=None, only=None):
     """
     Recursively crawl through content directory and generate HTML pages for all markdown files.
     
+    Pages are built in a pipeline: reader threads prefetch markdown sources, the calling
+    thread parses and renders them, and writer threads flush the results to disk.
+    Output paths come from the site's route table, built with one scandir walk of the
+    content directory, and every output directory is created before writing starts.
+    
     Args:
         dir_path_content (str): Path to the content directory to crawl
         template_path (str): Path to the HTML template file
         dest_dir_path (str): Path to the destination directory where HTML files will be written
         content_root (str, optional): The root content directory path for relative path calculation
         basepath (str, optional): The base path for all URLs. Defaults to "/"
+        minify (bool, optional): Whether to minify the generated HTML. Defaults to False
+        context (SiteContext, optional): Build-wide context shared between pages
+        io_workers (int, optional): Number of reader and writer threads. Defaults to 4
+        shard (tuple, optional): (index, count) to build only the pages owned by one shard
+        page_cache (BuildCache, optional): Cache of rendered pages; pages found in it are not re-rendered
+        only (set, optional): Real paths of the markdown files to regenerate; other pages are left as they are
+        
+    Returns:
+        list: PageResult objects for every generated page
     """
-    import os
+    # Share one site context between all pages so the template is read only once
+    if context is None:
+        context = SiteContext()
+    template_content = context.load_template(template_path)
     
-    # If this is the initial call, set content_root to the current directory
+    # Route every page once; the table is shared through the context for URL lookups
     if content_root is None:
         content_root = dir_path_content
-    
-    # Print informative message
     print(f"Crawling directory: {dir_path_content}")
+    if context.routes is None:
+        context.routes = build_route_table(content_root, dest_dir_path)
+    pages = list(context.routes)
+    
+    # Keep only the pages below the crawled directory
+    if os.path.normpath(dir_path_content) != os.path.normpath(content_root):
+        prefix = os.path.join(os.path.normpath(dir_path_content), "")
+        pages = [route for route in pages if route.source_path.startswith(prefix)]
+    
+    # Keep only this shard's pages, partitioned by a stable hash of the source path
+    if shard is not None:
+        pages = [route for route in pages
+                 if shard_for_path(os.path.relpath(route.source_path, content_root), shard[1]) == shard[0]]
+        print(f"Shard {shard[0]}/{shard[1]} owns {len(pages)} pages")
+    
+    # In an incremental build, skip the pages whose sources have not changed
+    if only is not None:
+        pages = [route for route in pages if os.path.realpath(route.source_path) in only]
+        print(f"Rebuilding {len(pages)} changed pages")
+    
+    # Create all output directories up front rather than once per page
+    for directory in context.routes.output_dirs(pages):
+        os.makedirs(directory, exist_ok=True)
+    
+    pages = [(route.source_path, route.output_path) for route in pages]
+    
+    def read_markdown(page):
+        with open(page[0], "r") as f:
+            return f.read(), os.fstat(f.fileno()).st_mtime_ns
+    
+    # Everything besides the page's own source that affects its HTML
+    cache_options = f"minify={minify}:{context.render_signature()}" if page_cache else ""
+    
+    def render(page, source):
+        from_path, dest_path = page
+        markdown_content, mtime_ns = source
+        source_hash = hashlib.sha256(markdown_content.encode("utf-8")).hexdigest()
+        
+        # A page rendered before from identical inputs is copied from the cache; its location
+        # is one of them, since relative links resolve against the source directory
+        if page_cache is not None:
+            rel_path = os.path.relpath(from_path, content_root).replace(os.sep, "/")
+            key = page_cache.key(markdown_content, template_content, basepath, f"{cache_options}:source={rel_path}")
+            cached = page_cache.get(key)
+            if cached is not None:
+                final_html, metadata = cached
+                print(f"Reusing cached page for {from_path}")
+                for warning in metadata.get("warnings", []):
+                    print(f"Warning: {warning}")
+                links = [tuple(link) for link in metadata["links"]]
+                return final_html, PageResult(from_path, dest_path, metadata["title"],
+                                              len(final_html.encode("utf-8")), metadata["bytes_saved"], links,
+                                              source_hash, mtime_ns, metadata["terms"], metadata["word_count"])
+        
+        print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+        page_context = context.page(from_path)
+        final_html, title, bytes_saved = render_page(markdown_content, template_content, basepath, minify,
+                                                     page_context)
+        if page_cache is not None:
+            page_cache.put(key, final_html, {"title": title, "bytes_saved": bytes_saved,
+                                             "links": page_context.links, "terms": page_context.terms,
+                                             "word_count": page_context.word_count,
+                                             "warnings": page_context.warnings})
+        return final_html, PageResult(from_path, dest_path, title, len(final_html.encode("utf-8")), bytes_saved,
+                                      page_context.links, source_hash, mtime_ns, dict(page_context.terms),
+                                      page_context.word_count)
+    
+    def write(page, final_html):
+        write_page(page[1], final_html, create_dirs=False)
+    
+    return run_pipeline(pages, read_markdown, render, write, io_workers=io_workers)
+
+def generate_listings(directories, content_index, template_content, dest_dir_path, routes, basepath="/",
+                      minify=False, page_size=DEFAULT_PAGE_SIZE, include_drafts=False):
+    """
+    Generate paginated listing pages of the posts below content directories, newest first.
+    
+    Listings are built from the page metadata in the content index (title, date and
+    front-matter summary), so no post is read or parsed again. Each listing page is
+    written only when its fingerprint changed or its output is missing, and pages
+    left over from a longer listing are removed.
     
-    # List all entries in the directory
-    for entry in os.listdir(dir_path_content):
-        entry_path = os.path.join(dir_path_content, entry)
+    Args:
+        directories (list): Content directories to list, relative to the content root (e.g., ['blog'])
+        content_index (ContentIndex): Index already updated with this build's pages
+        template_content (str): The prepared HTML template
+        dest_dir_path (str): The destination directory
+        routes (RouteTable): The site's pages, to detect a listing overwriting a page
+        basepath (str, optional): The base path for all URLs. Defaults to "/"
+        minify (bool, optional): Whether to minify the listing pages. Defaults to False
+        page_size (int, optional): Number of posts per page
+        include_drafts (bool, optional): Whether to list drafts. Defaults to False
         
-        # If the entry is a directory, recursively process it
-        if os.path.isdir(entry_path):
-            # Recursively process the subdirectory
-            generate_pages_recursive(entry_path, template_path, dest_dir_path, content_root, basepath)
-            
-        # If the entry is a markdown file, generate an HTML page
-        elif entry.endswith(".md"):
-            # Get the relative path from the content root directory
-            rel_path = os.path.relpath(os.path.dirname(entry_path), content_root)
-            
-            # Create output filename (replace .md with .html)
-            output_filename = entry.replace(".md", ".html")
-            
-            # Handle index.md files specially
-            if output_filename == "index.html":
-                # For index.md files, put in the corresponding directory
-                if rel_path == '.':  # If it's in the root content dir
-                    output_path = os.path.join(dest_dir_path, output_filename)
-                else:  # If it's in a subdirectory
-                    output_dir = os.path.join(dest_dir_path, rel_path)
-                    os.makedirs(output_dir, exist_ok=True)
-                    output_path = os.path.join(output_dir, output_filename)
-            else:
-                # For non-index files, create a directory with the same name and use index.html inside
-                base_name = output_filename.replace(".html", "")
-                if rel_path == '.':  # If it's in the root content dir
-                    output_dir = os.path.join(dest_dir_path, base_name)
-                else:  # If it's in a subdirectory
-                    output_dir = os.path.join(dest_dir_path, rel_path, base_name)
-                os.makedirs(output_dir, exist_ok=True)
-                output_path = os.path.join(output_dir, "index.html")
+    Returns:
+        list: URLs of all listing pages
+        
+    Raises:
+        ValueError: If a content page already exists at a listing URL
+    """
+    previous = content_index.get_state("listings", {})
+    settings = [hashlib.sha256(template_content.encode("utf-8")).hexdigest(), basepath, minify]
+    fingerprints = {}
+    
+    for directory in directories:
+        directory_url = "/" + directory.strip("/")
+        title = listing_title(directory)
+        rows = content_index.pages(directory_url + "/", include_drafts)
+        pages = paginate([listing_entry(row) for row in rows], page_size)
+        
+        # No listing page, including /<dir>/page/N, may replace a content page
+        for page_number in range(1, len(pages) + 1):
+            route = routes.for_url(listing_url(directory_url, page_number))
+            if route is not None:
+                raise ValueError(f"Listing for {directory} would overwrite {route.source_path}")
+        
+        for page_number, entries in enumerate(pages, start=1):
+            url = listing_url(directory_url, page_number)
+            output_path = os.path.join(dest_dir_path, *url.strip("/").split("/"), "index.html")
+            fingerprint = listing_fingerprint(entries, page_number, len(pages), settings)
+            fingerprints[url] = fingerprint
             
-            # Generate the HTML file with the basepath
-            generate_page(entry_path, template_path, output_path, basepath)
+            # Skip pages whose posts and settings are unchanged since they were written
+            if previous.get(url) == fingerprint and os.path.exists(output_path):
+                continue
             
-    print(f"Finished processing directory: {dir_path_content}")
+            page_title = title if page_number == 1 else f"{title} - Page {page_number}"
+            html_node = listing_html_node(page_title, entries, directory_url, page_number, len(pages))
+            final_html, _ = fill_template(template_content, page_title, html_node.to_html(), basepath, minify)
+            print(f"Generating listing page {url}")
+            write_page(output_path, final_html)
+    
+    # Remove listing pages that no longer exist, e.g. after posts were deleted
+    for url in previous:
+        if url not in fingerprints:
+            output_path = os.path.join(dest_dir_path, *url.strip("/").split("/"), "index.html")
+            if os.path.exists(output_path):
+                os.remove(output_path)
+                print(f"Deleted listing page {url}")
+    
+    content_index.set_state("listings", fingerprints)
+    return list(fingerprints)
 
-def text_to_children(text):
+def text_to_children(text, context=None):
     """
     Convert markdown text to a list of HTMLNode objects.
     
     Args:
         text (str): The markdown text to convert
+        context (PageContext, optional): Rendering context passed to text_node_to_html_node
         
     Returns:
         list: A list of HTMLNode objects
     """
     # First convert to TextNodes
-    nodes = text_to_textnodes(text)
+    nodes = text_to_textnodes(text, context)
     
     # Then convert each TextNode to an HTMLNode
-    return [text_node_to_html_node(node) for node in nodes]
+    return [text_node_to_html_node(node, context) for node in nodes]
 
 def extract_heading_level(block):
     """
@@ -485,13 +803,14 @@ def extract_heading_level(block):
         return len(match.group(1))
     return 1  # Default to h1 if pattern doesn't match
 
-def process_list_items(block, is_ordered=False):
+def process_list_items(block, is_ordered=False, context=None):
     """
     Process list items and return them as HTMLNode objects.
     
     Args:
         block (str): A markdown list block
         is_ordered (bool): Whether this is an ordered list
+        context (PageContext, optional): Rendering context passed to text_to_children
         
     Returns:
         list: A list of HTMLNode objects representing list items
@@ -509,7 +828,7 @@ def process_list_items(block, is_ordered=False):
             content = line[2:] if line.startswith("- ") else line
         
         # Convert the content to HTML nodes
-        item_children = text_to_children(content)
+        item_children = text_to_children(content, context)
         
         # Create a list item node
         item_node = ParentNode("li", item_children)
@@ -531,94 +850,238 @@ def process_quote_content(block):
     # Remove '>' from the start of each line and join with spaces (not newlines)
     return " ".join([line[1:].lstrip() if line.startswith(">") else line for line in lines])
 
-def markdown_to_html_node(markdown):
+def block_to_html_node(block, context=None):
+    """
+    Convert a single markdown block to an HTML node.
+    
+    Blocks are independent of each other, so this can run on any subset of a document.
+    
+    Args:
+        block (str): A markdown block as returned by markdown_to_blocks
+        context (PageContext, optional): Rendering context used for asset URLs and page state
+        
+    Returns:
+        HTMLNode: The HTML node for the block, or None if the block produces no output
+    """
+    block_type = block_to_block_type(block)
+    
+    if block_type == BlockType.PARAGRAPH:
+        # Create paragraph node with inline markdown parsed
+        # Replace newlines with spaces for proper paragraph rendering
+        block = block.replace("\n", " ")
+        children = text_to_children(block, context)
+        return ParentNode("p", children)
+        
+    elif block_type == BlockType.HEADING:
+        # Get heading level (h1-h6)
+        level = extract_heading_level(block)
+        
+        # Remove the heading markers and parse the content
+        # Also replace newlines with spaces
+        content = re.sub(r"^#{1,6}\s+", "", block).replace("\n", " ")
+        nodes = text_to_textnodes(content, context)
+        children = [text_node_to_html_node(node, context) for node in nodes]
+        
+        # Create heading node, with an anchor id recorded for the table of contents
+        if context is None:
+            return ParentNode(f"h{level}", children)
+        heading_id = context.heading_id(level, "".join(node.text for node in nodes))
+        return ParentNode(f"h{level}", children, {"id": heading_id})
+        
+    elif block_type == BlockType.CODE:
+        # For code blocks, don't parse inline markdown
+        # Remove the code block markers but preserve internal newlines
+        if block.startswith("```") and block.endswith("```"):
+            # Get the content between the opening ``` and closing ```
+            # First, remove the opening line (which may contain a language specifier)
+            start_idx = block.find("\n") + 1
+            # Then, remove the closing ```
+            end_idx = block.rfind("```")
+            
+            # Extract content, preserving newlines and ensuring it ends with a newline
+            # as expected by the tests
+            code_content = block[start_idx:end_idx]
+            
+            # Create a text node and convert it directly without parsing markdown
+            code_node = TextNode(code_content, TextType.NORMAL)
+            code_html = text_node_to_html_node(code_node)
+            
+            # Wrap in <pre><code>
+            return ParentNode("pre", [ParentNode("code", [code_html])])
+        
+    elif block_type == BlockType.QUOTE:
+        # Process quote content, joining lines with spaces instead of preserving newlines
+        quote_content = process_quote_content(block)
+        
+        # Parse inline markdown inside the quote
+        children = text_to_children(quote_content, context)
+        
+        # Create blockquote node
+        return ParentNode("blockquote", children)
+        
+    elif block_type == BlockType.UNORDERED_LIST:
+        # Process unordered list items
+        item_nodes = process_list_items(block, is_ordered=False, context=context)
+        
+        # Create unordered list node
+        return ParentNode("ul", item_nodes)
+        
+    elif block_type == BlockType.ORDERED_LIST:
+        # Process ordered list items
+        item_nodes = process_list_items(block, is_ordered=True, context=context)
+        
+        # Create ordered list node
+        return ParentNode("ol", item_nodes)
+    
+    return None
+
+def markdown_to_html_node(markdown, context=None):
     """
     Convert a markdown string to an HTML node.
     
     Args:
         markdown (str): The markdown string to convert
+        context (PageContext, optional): Rendering context used for asset URLs and page state
         
     Returns:
         ParentNode: The root HTML node containing the converted markdown
     """
-    # Split the markdown into blocks
-    blocks = markdown_to_blocks(markdown)
+    # Split the markdown into blocks, tracking line numbers for the link checker
+    if context is not None:
+        blocks = markdown_to_blocks_with_lines(markdown)
+    else:
+        blocks = [(block, None) for block in markdown_to_blocks(markdown)]
     
     # Store all the block nodes
     block_nodes = []
     
     # Process each block
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        
-        if block_type == BlockType.PARAGRAPH:
-            # Create paragraph node with inline markdown parsed
-            # Replace newlines with spaces for proper paragraph rendering
-            block = block.replace("\n", " ")
-            children = text_to_children(block)
-            block_nodes.append(ParentNode("p", children))
-            
-        elif block_type == BlockType.HEADING:
-            # Get heading level (h1-h6)
-            level = extract_heading_level(block)
-            
-            # Remove the heading markers and parse the content
-            # Also replace newlines with spaces
-            content = re.sub(r"^#{1,6}\s+", "", block).replace("\n", " ")
-            children = text_to_children(content)
-            
-            # Create heading node
-            block_nodes.append(ParentNode(f"h{level}", children))
-            
-        elif block_type == BlockType.CODE:
-            # For code blocks, don't parse inline markdown
-            # Remove the code block markers but preserve internal newlines
-            if block.startswith("```") and block.endswith("```"):
-                # Get the content between the opening ``` and closing ```
-                # First, remove the opening line (which may contain a language specifier)
-                start_idx = block.find("\n") + 1
-                # Then, remove the closing ```
-                end_idx = block.rfind("```")
-                
-                # Extract content, preserving newlines and ensuring it ends with a newline
-                # as expected by the tests
-                code_content = block[start_idx:end_idx]
-                
-                # Create a text node and convert it directly without parsing markdown
-                code_node = TextNode(code_content, TextType.NORMAL)
-                code_html = text_node_to_html_node(code_node)
-                
-                # Wrap in <pre><code>
-                block_nodes.append(ParentNode("pre", [ParentNode("code", [code_html])]))
-            
-        elif block_type == BlockType.QUOTE:
-            # Process quote content, joining lines with spaces instead of preserving newlines
-            quote_content = process_quote_content(block)
-            
-            # Parse inline markdown inside the quote
-            children = text_to_children(quote_content)
-            
-            # Create blockquote node
-            block_nodes.append(ParentNode("blockquote", children))
-            
-        elif block_type == BlockType.UNORDERED_LIST:
-            # Process unordered list items
-            item_nodes = process_list_items(block, is_ordered=False)
-            
-            # Create unordered list node
-            block_nodes.append(ParentNode("ul", item_nodes))
-            
-        elif block_type == BlockType.ORDERED_LIST:
-            # Process ordered list items
-            item_nodes = process_list_items(block, is_ordered=True)
-            
-            # Create ordered list node
-            block_nodes.append(ParentNode("ol", item_nodes))
+    for block, line in blocks:
+        if context is not None:
+            context.start_block(block, line)
+        block_node = block_to_html_node(block, context)
+        if block_node is not None:
+            block_nodes.append(block_node)
     
     # Create a parent div node containing all block nodes
     return ParentNode("div", block_nodes)
 
-def text_to_textnodes(text):
+# Documents shorter than this many characters are always rendered in one process
+PARALLEL_THRESHOLD = 500000
+
+# Number of blocks rendered by a worker per task
+PARALLEL_CHUNK_BLOCKS = 512
+
+def markdown_to_html_node_parallel(markdown, context=None, executor=None, threshold=PARALLEL_THRESHOLD,
+                                   chunk_blocks=PARALLEL_CHUNK_BLOCKS):
+    """
+    Convert a markdown string to an HTML node, rendering large documents in parallel.
+    
+    Blocks are independent, so a document above the size threshold is split into chunks
+    of consecutive blocks that are rendered in worker processes and concatenated in order.
+    Smaller documents are rendered by markdown_to_html_node, since process overhead would
+    outweigh the gain.
+    
+    Args:
+        markdown (str): The markdown string to convert
+        context (PageContext, optional): Rendering context used for asset URLs and page state
+        executor (Executor, optional): Process pool to use. A temporary pool is created if None
+        threshold (int, optional): Minimum document size in characters for parallel rendering
+        chunk_blocks (int, optional): Number of blocks per worker task
+        
+    Returns:
+        ParentNode: The root HTML node containing the converted markdown
+    """
+    if len(markdown) < threshold:
+        return markdown_to_html_node(markdown, context)
+    
+    blocks = markdown_to_blocks_with_lines(markdown)
+    chunks = [blocks[i:i + chunk_blocks] for i in range(0, len(blocks), chunk_blocks)]
+    if len(chunks) < 2:
+        return markdown_to_html_node(markdown, context)
+    
+    # Tell each worker whether an image appeared in an earlier chunk, so that
+    # only the page's first image is exempt from lazy loading
+    images_before = []
+    seen_image = context is not None and context.image_count > 0
+    for chunk in chunks:
+        images_before.append(seen_image)
+        seen_image = seen_image or any("![" in block and block_to_block_type(block) != BlockType.CODE
+                                       for block, _ in chunk)
+    
+    site = context.site if context is not None else None
+    source_path = context.source_path if context is not None else None
+    
+    # Workers of a pool started with the site already hold it; any other pool gets it with every chunk
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(initializer=install_worker_site, initargs=(site,))
+    chunk_site = None if own_executor or site is None or site.installed_in(executor) else site
+    try:
+        rendered = list(executor.map(_render_block_chunk, chunks, [source_path] * len(chunks),
+                                     images_before, [chunk_site] * len(chunks)))
+    finally:
+        if own_executor:
+            executor.shutdown()
+    
+    # Merge the per-chunk page state back into the caller's context
+    if context is not None:
+        chunk_html = []
+        for html, image_count, links, terms, word_count, headings, warnings in rendered:
+            context.image_count += image_count
+            context.links.extend(links)
+            context.warnings.extend(warnings)
+            context.terms.update(terms)
+            context.word_count += word_count
+            
+            # Give the chunk's headings their ids in document order and fill in the markers
+            if headings:
+                ids = [context.heading_id(level, text) for level, _, text in headings]
+                html = re.sub(r"\0(\d+)\0", lambda match: ids[int(match.group(1))], html)
+            chunk_html.append(html)
+    else:
+        chunk_html = [html for html, _, _, _, _, _, _ in rendered]
+    
+    # Each chunk is already HTML; wrap it in untagged leaf nodes to keep the node API
+    return ParentNode("div", [LeafNode(None, html) for html in chunk_html])
+
+def _render_block_chunk(blocks, source_path, images_before, site=None):
+    """
+    Internal worker that renders a chunk of consecutive blocks to HTML.
+    
+    Args:
+        blocks (list): (block, line) tuples of the markdown blocks to render
+        source_path (str): Path to the page's source markdown file
+        images_before (bool): Whether an earlier chunk of the page contains an image
+        site (SiteContext, optional): The build-wide context. Defaults to the one installed in
+            this worker process, if any; without either the chunk is rendered without a context
+        
+    Returns:
+        tuple: (html, number of images counted in this chunk, and the links, search terms, word count,
+            headings and warnings recorded in this chunk; heading ids in the html are markers indexing the headings)
+    """
+    if site is None:
+        site = worker_site()
+    context = site.page(source_path) if site is not None else None
+    offset = 1 if images_before else 0
+    if context is not None:
+        context.image_count = offset
+        context.defer_heading_ids = True
+    
+    html_parts = []
+    for block, line in blocks:
+        if context is not None:
+            context.start_block(block, line)
+        block_node = block_to_html_node(block, context)
+        if block_node is not None:
+            html_parts.append(block_node.to_html())
+    
+    if context is None:
+        return "".join(html_parts), 0, [], {}, 0, [], []
+    return ("".join(html_parts), context.image_count - offset, context.links, dict(context.terms),
+            context.word_count, context.headings, context.warnings)
+
+def text_to_textnodes(text, context=None):
     """
     Convert markdown text to a list of TextNode objects.
     
@@ -631,10 +1094,15 @@ def text_to_textnodes(text):
     
     Args:
         text (str): Markdown text to convert
+        context (PageContext, optional): Per-page context used to resolve links to other pages
         
     Returns:
         list: List of TextNode objects
     """
+    # Words are never continued from the previous run of text
+    if context is not None:
+        context.start_text()
+    
     # Start with a single TextNode containing the entire text
     nodes = [TextNode(text, TextType.NORMAL)]
     
@@ -644,41 +1112,307 @@ def text_to_textnodes(text):
     nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
     
     # Process images and links
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    nodes = split_nodes_image(nodes, context)
+    nodes = split_nodes_link(nodes, context)
     
     return nodes
 
+def parse_args(argv=None):
+    """
+    Parse the command line arguments for the site generator.
+    
+    Args:
+        argv (list, optional): Arguments to parse. Defaults to sys.argv[1:]
+        
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Generate the static site from content/ and static/.")
+    parser.add_argument("basepath", nargs="?", default="/",
+                        help="The base path for all URLs (default: /)")
+    parser.add_argument("--minify", action="store_true",
+                        help="Minify generated HTML pages")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="Publish static assets under content-hashed names and rewrite references to them")
+    parser.add_argument("--no-image-attributes", action="store_true",
+                        help="Don't add width/height and lazy-loading attributes to images")
+    parser.add_argument("--optimize-png", action="store_true",
+                        help="Losslessly recompress PNG images (results are cached by content hash)")
+    parser.add_argument("--inline-assets-below", type=int, default=0, metavar="BYTES",
+                        help="Inline static images smaller than BYTES as data URIs (default: 0, disabled)")
+    parser.add_argument("--optimize-css", action="store_true",
+                        help="Minify the template's stylesheets and inline those within --css-budget")
+    parser.add_argument("--css-budget", type=int, default=DEFAULT_CSS_BUDGET, metavar="BYTES",
+                        help=f"Largest minified stylesheet to inline (default: {DEFAULT_CSS_BUDGET})")
+    parser.add_argument("--parallel-blocks-above", type=int, default=PARALLEL_THRESHOLD, metavar="CHARS",
+                        help=f"Render documents larger than CHARS in parallel block chunks "
+                             f"(default: {PARALLEL_THRESHOLD}, 0 disables)")
+    parser.add_argument("--gzip", action="store_true",
+                        help="Write precompressed .gz siblings for generated pages and text assets")
+    parser.add_argument("--gzip-level", type=int, choices=range(1, 10), default=9, metavar="LEVEL",
+                        help="gzip compression level from 1 to 9 (default: 9)")
+    parser.add_argument("--output", default=None, metavar="DIR",
+                        help="Directory to write the site to (default: docs/)")
+    parser.add_argument("--shard", type=parse_shard, default=None, metavar="K/N",
+                        help="Build only the pages of shard K of N; shard 1 also publishes static files")
+    parser.add_argument("--merge-shards", nargs="+", default=None, metavar="DIR",
+                        help="Merge the outputs of a complete set of shard builds into --output and exit")
+    parser.add_argument("--listing", action="append", default=[], metavar="DIR",
+                        help="Generate paginated listing pages of the posts below a content directory "
+                             "(e.g. --listing blog); can be repeated")
+    parser.add_argument("--listing-page-size", type=parse_page_size, default=DEFAULT_PAGE_SIZE, metavar="N",
+                        help="Number of posts per listing page (default: %(default)s)")
+    parser.add_argument("--related", action="append", default=[], metavar="DIR",
+                        help=f"Fill the template's {RELATED_PLACEHOLDER} placeholder on the pages below a content "
+                             "directory with links to the most similar pages in it; can be repeated")
+    parser.add_argument("--related-count", type=int, default=DEFAULT_RELATED_COUNT, metavar="N",
+                        help="Number of related posts per page (default: %(default)s)")
+    parser.add_argument("--site-url", type=parse_site_url, default=None, metavar="URL",
+                        help="Absolute URL the site is published at (e.g. https://example.com); "
+                             "enables sitemap.xml and an Atom feed for every --listing directory")
+    parser.add_argument("--site-author", default=None, metavar="NAME",
+                        help="Author named in the Atom feeds; a post's front-matter 'author' overrides it "
+                             "(default: the --site-url host name)")
+    parser.add_argument("--search", action="store_true",
+                        help=f"Write a client-side search index, sharded by term prefix, to {SEARCH_DIR}/")
+    parser.add_argument("--drafts", action="store_true",
+                        help="Also publish pages whose front matter sets 'draft: true'")
+    parser.add_argument("--strict-links", action="store_true",
+                        help="Fail the build when a page links to something that is not published")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Keep the previous output and rebuild only pages whose sources changed")
+    parser.add_argument("--cache-dir", default=None, metavar="DIR",
+                        help="Build cache directory, e.g. a shared mount or a restored CI cache "
+                             "(default: .build-cache in the project root)")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), metavar="MB",
+                        help="Evict least recently used rendered pages above this size (default: %(default)s)")
+    parser.add_argument("--workers", type=parse_worker_count, default=None,
+                        help="Number of worker threads/processes for parallel build stages")
+    parser.add_argument("--io-workers", type=parse_worker_count, default=4,
+                        help="Number of threads reading sources and writing pages (default: 4)")
+    return parser.parse_args(argv)
+
+def plan_incremental_build(project_root, content_dir, static_dir, template_path, docs_dir, previous, args, routes):
+    """
+    Decide which pages an incremental build has to regenerate.
+    
+    Content changes rebuild just the changed pages. A changed template or static file,
+    added or removed pages (links to them resolve differently), different build options,
+    a change to the generator's own code, or a missing previous build mean every page
+    depends on the change, so the build is a full one.
+    
+    Args:
+        project_root (str): The project root, used to ask git for changes
+        content_dir (str): The content directory
+        static_dir (str): The static files directory
+        template_path (str): The HTML template
+        docs_dir (str): The output directory
+        previous (dict): The state saved by the last successful incremental build
+        args (argparse.Namespace): The parsed command-line options
+        routes (RouteTable): The site's current pages
+        
+    Returns:
+        tuple: (changed_pages, state) where changed_pages is a set of real markdown paths,
+            or None for a full build; state is to be saved once the build succeeds
+    """
+    changed, state = detect_changes(project_root, [content_dir, static_dir, template_path], previous)
+    
+    # Options that change the output invalidate every page
+    options = [args.basepath, docs_dir, args.minify, args.fingerprint, args.no_image_attributes,
+               args.inline_assets_below, args.optimize_png, args.optimize_css, args.css_budget,
+               args.gzip, args.gzip_level, list(args.shard) if args.shard else None, args.drafts,
+               sorted(args.related)]
+    state["options"] = options
+    state["pages"] = routes.rel_paths()
+    state["renderer"] = renderer_version()
+    if changed is None or previous.get("options") != options or not os.path.isdir(docs_dir):
+        print("No usable previous build, rebuilding everything")
+        return None, state
+    
+    # Pages rendered by a different version of the generator are stale, whatever changed in the content
+    if previous.get("renderer") != state["renderer"]:
+        print("The generator's code changed, rebuilding everything")
+        return None, state
+    
+    # The template and static files feed into every page
+    content_root = os.path.realpath(content_dir)
+    if any(not path.startswith(content_root + os.sep) for path in changed):
+        print("Template or static files changed, rebuilding everything")
+        return None, state
+    if previous.get("pages") != state["pages"]:
+        print("Pages were added or removed, rebuilding everything")
+        return None, state
+    
+    changed_pages = {path for path in changed if path.endswith(".md")}
+    print(f"{len(changed_pages)} content files changed since the last build")
+    return changed_pages, state
+
 def main():
     import os
     
+    args = parse_args()
+    
     # Get the paths relative to the current file location
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(script_dir)
     
     # Define paths for various files and directories
     static_dir = os.path.join(project_root, "static")
-    docs_dir = os.path.join(project_root, "docs")
+    docs_dir = os.path.abspath(args.output) if args.output else os.path.join(project_root, "docs")
     content_dir = os.path.join(project_root, "content")
     template_path = os.path.join(project_root, "template.html")
+    cache_dir = os.path.abspath(args.cache_dir) if args.cache_dir else os.path.join(project_root, ".build-cache")
     
     # Get basepath from command line arguments or use default
-    basepath = "/"
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
-        # Ensure basepath ends with a slash if it's not empty
-        if basepath and not basepath.endswith("/"):
-            basepath += "/"
+    basepath = args.basepath
+    # Ensure basepath ends with a slash if it's not empty
+    if basepath and not basepath.endswith("/"):
+        basepath += "/"
+    
+    # Combining shard outputs is a separate command
+    if args.merge_shards:
+        merge_shards(args.merge_shards, docs_dir)
+        return
     
     print(f"Using base path: {basepath}")
     
+    # Static files are published by a single shard so shard outputs never overlap
+    publishes_static = args.shard is None or args.shard[0] == 1
+    
+    # Route every page once for the whole build
+    routes = build_route_table(content_dir, docs_dir, include_drafts=args.drafts)
+    
+    # Page metadata and build state persist in the content index between builds
+    content_index = ContentIndex(os.path.join(cache_dir, "content.db"))
+    state_key = f"incremental:{args.shard[0]}/{args.shard[1]}" if args.shard else "incremental"
+    
+    # An incremental build reuses the previous output when only content pages changed
+    changed_pages = None
+    if args.incremental:
+        changed_pages, incremental_state = plan_incremental_build(project_root, content_dir, static_dir,
+                                                                  template_path, docs_dir,
+                                                                  content_index.get_state(state_key, {}),
+                                                                  args, routes)
+    full_build = changed_pages is None
+    
+    # List the static files once; the copy and the asset index share the stat results
+    static_manifest = walk_manifest(static_dir)
+    
     # Step 1: Delete anything in the docs directory and copy static files
-    print("Copying static files to docs directory...")
-    copy_static_to_public(static_dir, docs_dir)
+    if not full_build:
+        print("Keeping the previous output and static files")
+    elif publishes_static:
+        print("Copying static files to docs directory...")
+        copy_static_to_public(static_dir, docs_dir, static_manifest)
+    else:
+        clean_directory(docs_dir)
+    
+    # Optionally shrink the published PNGs (the static/ originals are untouched)
+    if args.optimize_png and publishes_static and full_build:
+        print("Optimizing PNG images...")
+        optimize_pngs(docs_dir, cache_dir, workers=args.workers)
+    
+    # Index static assets (hashes and image dimensions, cached by stat info)
+    asset_index = build_asset_index(static_dir, cache_dir, workers=args.workers, manifest=static_manifest)
+    
+    # Optionally publish content-hashed copies so assets can be cached forever
+    asset_map = {}
+    if args.fingerprint:
+        print("Fingerprinting static assets...")
+        asset_map = build_fingerprint_map(asset_index)
+        if publishes_static and full_build:
+            publish_fingerprinted_assets(asset_map, docs_dir)
+    site = SiteContext(asset_map=asset_map, asset_index=asset_index,
+                       image_attributes=not args.no_image_attributes,
+                       inline_threshold=args.inline_assets_below,
+                       parallel_threshold=args.parallel_blocks_above, workers=args.workers,
+                       routes=routes, related_directories=args.related if args.shard is None else None)
+    
+    # Optionally minify and inline the template's stylesheets, once for the whole build
+    if args.optimize_css:
+        print("Optimizing template stylesheets...")
+        with open(template_path, "r") as f:
+            template_content = f.read()
+        site.add_template(template_path, optimize_template_css(template_content, static_dir, docs_dir,
+                                                               args.css_budget, asset_map,
+                                                               publishes_static and full_build))
+    
+    # Related posts are written into the template's placeholder, so without it they have nowhere to go
+    if args.related and RELATED_PLACEHOLDER not in site.load_template(template_path):
+        print(f"Warning: {template_path} has no {RELATED_PLACEHOLDER} placeholder, so --related adds nothing")
     
     # Step 2: Generate HTML pages from markdown recursively
     print("Generating HTML pages from markdown...")
-    generate_pages_recursive(content_dir, template_path, docs_dir, basepath=basepath)
+    page_cache = BuildCache(os.path.join(cache_dir, "pages"), args.cache_max_mb * 1024 * 1024)
+    try:
+        results = generate_pages_recursive(content_dir, template_path, docs_dir, basepath=basepath,
+                                           minify=args.minify, context=site, io_workers=args.io_workers,
+                                           shard=args.shard, page_cache=page_cache, only=changed_pages)
+    finally:
+        site.close()
+    print_build_summary(results)
+    print(f"Page cache: {page_cache.hits} reused, {page_cache.misses} rendered, "
+          f"{page_cache.evict()} evicted")
+    
+    # Record the pages' metadata for listings and later builds
+    updated = content_index.update_pages(results, routes)
+    removed = content_index.prune(routes)
+    print(f"Content index: {updated} pages updated, {removed} removed")
+    
+    # Generate listing pages from the indexed metadata
+    listing_urls = []
+    if args.listing and args.shard is not None:
+        print("Skipping listing pages: they need every shard's pages in the content index")
+    elif args.listing:
+        print("Generating listing pages...")
+        listing_urls = generate_listings(args.listing, content_index, site.load_template(template_path), docs_dir,
+                                         routes, basepath, args.minify, args.listing_page_size, args.drafts)
+    
+    # Related posts compare each page with the others, so they are added once all are indexed
+    if args.related and args.shard is not None:
+        print("Skipping related posts: they need every shard's pages in the content index")
+    elif args.related:
+        recomputed = update_related_posts(args.related, content_index, results, content_dir, docs_dir, basepath,
+                                          args.minify, args.related_count, args.drafts)
+        print(f"Related posts: recomputed for {recomputed} pages")
+    
+    # Sitemap and feeds need absolute URLs, so they are only written for a known site URL
+    feed_urls = []
+    if args.site_url:
+        base_url = args.site_url + basepath
+        if publishes_static:
+            generate_sitemap(routes, listing_urls, content_index, docs_dir, base_url)
+        if args.listing and args.shard is None:
+            feed_urls = generate_feeds(args.listing, content_index, docs_dir, base_url,
+                                       include_drafts=args.drafts, author=args.site_author)
+    
+    # The search index is built from the terms recorded while rendering
+    if args.search and args.shard is not None:
+        print("Skipping the search index: it needs every shard's pages in the content index")
+    elif args.search:
+        written, shards = write_search_index(content_index, docs_dir, args.drafts)
+        print(f"Search index: {shards} shards, {written} files written")
+    
+    # Check every internal link and image against the pages and assets this build publishes
+    known_urls = set(asset_index) | set(asset_map.values()) | set(listing_urls) | set(feed_urls)
+    broken_links = check_links(results, routes, known_urls)
+    print_broken_links(broken_links)
+    if broken_links and args.strict_links:
+        raise Exception(f"Found {len(broken_links)} broken internal links")
+    
+    # Step 3: Optionally write precompressed siblings for the CDN
+    if args.gzip:
+        print("Writing precompressed .gz files...")
+        precompress_outputs(docs_dir, cache_dir, level=args.gzip_level, workers=args.workers)
+    
+    # Record what this shard wrote so the merge step can check for overlaps
+    if args.shard is not None:
+        write_shard_manifest(docs_dir, args.shard)
+    
+    # Only a successful build becomes the baseline for the next incremental build
+    if args.incremental:
+        content_index.set_state(state_key, incremental_state)
+    content_index.close()
     
     print("Static site generation completed successfully!")
 
@@ -0,0 +1,139 @@
+import re
+
+# Elements whose content must be copied byte-for-byte
+RAW_TEXT_ELEMENTS = ("pre", "code", "textarea", "script", "style")
+
+# Elements around which whitespace never affects rendering
+BLOCK_ELEMENTS = frozenset([
+    "!doctype", "html", "head", "body", "title", "meta", "link", "base", "script", "style",
+    "article", "aside", "div", "footer", "header", "main", "nav", "section",
+    "p", "pre", "blockquote", "ul", "ol", "li", "dl", "dt", "dd", "hr",
+    "h1", "h2", "h3", "h4", "h5", "h6", "table", "thead", "tbody", "tr", "td", "th",
+])
+
+# Elements that never have a closing tag, so a trailing "/" is redundant
+VOID_ELEMENTS = frozenset([
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr",
+])
+
+# One alternation per token kind: comment, raw-text element, tag, text
+_TOKEN_RE = re.compile(
+    r"<!--.*?-->"
+    r"|<(" + "|".join(RAW_TEXT_ELEMENTS) + r")\b[^>]*>.*?</\1\s*>"
+    r"|<[A-Za-z/!][^>]*>"
+    r"|[^<]+|<",
+    re.DOTALL | re.IGNORECASE,
+)
+_TAG_RE = re.compile(r"<([^\s/>]+)(.*?)(/?)>$", re.DOTALL)
+_ATTR_RE = re.compile(r"""([^\s=/>"']+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?""")
+_UNQUOTED_VALUE_RE = re.compile(r"""[^\s"'=<>`]+""")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def minify_html(html):
+    """
+    Minify an HTML document in a single linear pass.
+
+    Removes comments, collapses insignificant whitespace and drops optional
+    attribute quotes. The contents of <pre>, <code>, <textarea>, <script> and
+    <style> elements are preserved exactly.
+
+    Args:
+        html (str): The HTML document to minify
+
+    Returns:
+        str: The minified HTML
+    """
+    output = []
+    # Whitespace seen since the last emitted token, resolved once we know the next token
+    pending_space = False
+    # Whether the last emitted token was a block-level tag (or the start of the document)
+    after_block = True
+
+    for match in _TOKEN_RE.finditer(html):
+        token = match.group(0)
+
+        # Comments are dropped, except conditional comments which browsers still interpret
+        if token.startswith("<!--"):
+            if token.startswith("<!--[if"):
+                output.append(token)
+            continue
+
+        raw_name = match.group(1)
+        if raw_name or (len(token) > 1 and token.startswith("<")):
+            name = (raw_name or _tag_name(token)).lower()
+            is_block = name in BLOCK_ELEMENTS
+            if pending_space and not after_block and not is_block:
+                output.append(" ")
+            pending_space = False
+
+            # Raw-text elements are copied as-is; other tags are rewritten
+            output.append(token if raw_name else _minify_tag(token))
+            after_block = is_block
+            continue
+
+        # Text: collapse whitespace runs, deferring leading/trailing whitespace
+        text = _WHITESPACE_RE.sub(" ", token)
+        stripped = text.strip(" ")
+        if not stripped:
+            pending_space = True
+            continue
+        if (pending_space or text.startswith(" ")) and not after_block:
+            output.append(" ")
+        output.append(stripped)
+        pending_space = text.endswith(" ")
+        after_block = False
+
+    return "".join(output)
+
+def _tag_name(tag):
+    """
+    Internal helper that returns the element name of a start or end tag.
+
+    Args:
+        tag (str): A tag such as '<p class="x">' or '</p>'
+
+    Returns:
+        str: The element name (e.g., 'p'), or '!doctype' for declarations
+    """
+    match = re.match(r"</?\s*([^\s/>]+)", tag)
+    return match.group(1) if match else ""
+
+def _minify_tag(tag):
+    """
+    Internal helper that removes redundant whitespace, quotes and slashes from a tag.
+
+    Args:
+        tag (str): A start tag, end tag or declaration
+
+    Returns:
+        str: The minified tag
+    """
+    # End tags and declarations only need their whitespace collapsed
+    if tag.startswith("</"):
+        return "</" + tag[2:-1].strip() + ">"
+    if tag.startswith("<!"):
+        return _WHITESPACE_RE.sub(" ", tag)
+
+    match = _TAG_RE.match(tag)
+    if not match:
+        return tag
+    name, attributes, slash = match.groups()
+
+    # A trailing slash is only meaningful outside void elements (e.g., inline SVG)
+    keep_slash = slash and name.lower() not in VOID_ELEMENTS
+
+    parts = [name]
+    for attr in _ATTR_RE.finditer(attributes):
+        attr_name = attr.group(1)
+        value = next((group for group in attr.group(2, 3, 4) if group is not None), None)
+        if value is None or value == "":
+            # An attribute without a value is equivalent to an empty string
+            parts.append(attr_name)
+        elif not keep_slash and _UNQUOTED_VALUE_RE.fullmatch(value) and not value.endswith("/"):
+            parts.append(f"{attr_name}={value}")
+        elif '"' in value:
+            parts.append(f"{attr_name}='{value}'")
+        else:
+            parts.append(f'{attr_name}="{value}"')
+
+    return "<" + " ".join(parts) + ("/>" if keep_slash else ">")
@@ -0,0 +1,76 @@
+import math
+
+# Reading speed used for the estimated reading time
+WORDS_PER_MINUTE = 200
+
+def reading_minutes(word_count):
+    """
+    Estimate how long a page takes to read.
+
+    Args:
+        word_count (int): Number of words of prose on the page
+
+    Returns:
+        int: Whole minutes, at least 1
+    """
+    return max(1, math.ceil(word_count / WORDS_PER_MINUTE))
+
+class PageResult:
+    def __init__(self, source_path, dest_path, title, output_bytes, bytes_saved=0, links=None,
+                 source_hash=None, mtime_ns=None, terms=None, word_count=0):
+        """
+        Initialize a PageResult, which records what happened when a single page was generated.
+        
+        Args:
+            source_path (str): Path to the source markdown file
+            dest_path (str): Path of the generated HTML file
+            title (str): The page title extracted from the markdown
+            output_bytes (int): Size of the written HTML in bytes
+            bytes_saved (int, optional): Bytes removed by minification. Defaults to 0
+            links (list, optional): (url, line) for every internal link and image on the page
+            source_hash (str, optional): SHA-256 of the markdown source
+            mtime_ns (int, optional): Modification time of the markdown source
+            terms (dict, optional): Number of occurrences of each search term in the page text
+            word_count (int, optional): Number of words of prose, excluding code
+        """
+        self.source_path = source_path
+        self.dest_path = dest_path
+        self.title = title
+        self.output_bytes = output_bytes
+        self.bytes_saved = bytes_saved
+        self.links = links if links is not None else []
+        self.source_hash = source_hash
+        self.mtime_ns = mtime_ns
+        self.terms = terms if terms is not None else {}
+        self.word_count = word_count
+
+    @property
+    def reading_minutes(self):
+        """
+        Estimated reading time of the page in minutes.
+        """
+        return reading_minutes(self.word_count)
+
+    def __repr__(self):
+        return f"PageResult({self.source_path!r}, {self.dest_path!r}, {self.title!r}, {self.output_bytes}, {self.bytes_saved})"
+
+def print_build_summary(results):
+    """
+    Print a per-page and total summary of a build.
+    
+    Args:
+        results (list): List of PageResult objects
+    """
+    total_bytes = sum(result.output_bytes for result in results)
+    total_saved = sum(result.bytes_saved for result in results)
+    
+    print(f"Build summary: {len(results)} pages, {total_bytes} bytes written")
+    for result in results:
+        line = f"- {result.dest_path}: {result.output_bytes} bytes"
+        if result.bytes_saved:
+            original = result.output_bytes + result.bytes_saved
+            line += f" (minified, saved {result.bytes_saved} bytes, {result.bytes_saved * 100 / original:.1f}%)"
+        print(line)
+    
+    if total_saved:
+        print(f"Minification saved {total_saved} bytes in total")
@@ -0,0 +1,129 @@
+import queue
+import threading
+
+# Marks the end of a stage's output
+_DONE = object()
+
+def parse_worker_count(value):
+    """
+    Parse a number of worker threads.
+
+    Args:
+        value (str): The number, e.g. '4'
+
+    Returns:
+        int: The number of workers, at least 1
+
+    Raises:
+        ValueError: If the value is not an integer or is below 1
+    """
+    try:
+        count = int(value)
+    except ValueError:
+        raise ValueError(f"Invalid worker count '{value}': expected an integer")
+    if count < 1:
+        raise ValueError(f"Invalid worker count '{value}': at least 1 worker is needed")
+    return count
+
+def run_pipeline(items, read, process, write, io_workers=4, queue_size=16):
+    """
+    Run items through a three-stage read -> process -> write pipeline.
+
+    Reads and writes happen in pools of I/O threads while the calling thread does the
+    CPU-bound processing, so disk or network latency overlaps with parsing and rendering.
+    The stages are connected by bounded queues: readers block when processing falls
+    behind, which keeps peak memory proportional to queue_size rather than to the
+    number of items.
+
+    Args:
+        items (list): The work items (e.g., (source_path, dest_path) tuples)
+        read (callable): read(item) -> data, called in a reader thread
+        process (callable): process(item, data) -> (output, result), called in the calling thread
+        write (callable): write(item, output), called in a writer thread
+        io_workers (int, optional): Number of reader threads and of writer threads, at least 1. Defaults to 4
+        queue_size (int, optional): Capacity of each queue between stages. Defaults to 16
+
+    Returns:
+        list: The results returned by process, in the same order as items
+
+    Raises:
+        ValueError: If io_workers is below 1
+        Exception: The first exception raised by any stage, after all threads have stopped
+    """
+    # Without readers nothing would be read, and every item silently dropped
+    if io_workers < 1:
+        raise ValueError(f"Invalid number of I/O workers: {io_workers}")
+
+    jobs = queue.SimpleQueue()
+    for index, item in enumerate(items):
+        jobs.put((index, item))
+
+    read_queue = queue.Queue(maxsize=queue_size)
+    write_queue = queue.Queue(maxsize=queue_size)
+    errors = []
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            try:
+                index, item = jobs.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                data = read(item)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+                break
+            read_queue.put((index, item, data))
+        read_queue.put(_DONE)
+
+    def writer():
+        while True:
+            entry = write_queue.get()
+            if entry is _DONE:
+                break
+            if stop.is_set():
+                continue
+            item, output = entry
+            try:
+                write(item, output)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+
+    readers = [threading.Thread(target=reader, daemon=True) for _ in range(io_workers)]
+    writers = [threading.Thread(target=writer, daemon=True) for _ in range(io_workers)]
+    for thread in readers + writers:
+        thread.start()
+
+    # CPU stage: keep draining the read queue until every reader has finished,
+    # even after a failure, so no reader stays blocked on a full queue
+    results = {}
+    finished_readers = 0
+    while finished_readers < len(readers):
+        entry = read_queue.get()
+        if entry is _DONE:
+            finished_readers += 1
+            continue
+        if stop.is_set():
+            continue
+
+        index, item, data = entry
+        try:
+            output, result = process(item, data)
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+            continue
+        write_queue.put((item, output))
+        results[index] = result
+
+    for _ in writers:
+        write_queue.put(_DONE)
+    for thread in readers + writers:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+    return [results[index] for index in sorted(results)]
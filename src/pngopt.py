@@ -0,0 +1,402 @@
+import hashlib
+import os
+import shutil
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Number of samples per pixel for each PNG color type
+_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# Candidate filter strategies: one of the five PNG filters for every row, or adaptive
+FILTER_STRATEGIES = ("none", "sub", "up", "average", "paeth", "adaptive")
+
+def optimize_pngs(output_dir, cache_dir, workers=None):
+    """
+    Losslessly recompress every PNG in the output directory.
+
+    Each image is optimized at most once: results are cached by the SHA-256 of the
+    input file, so later builds only copy the cached output into place. Uncached
+    images are optimized in a process pool because the filtering is CPU-bound.
+
+    Args:
+        output_dir (str): Directory containing the generated site (e.g., 'docs')
+        cache_dir (str): Directory where optimized images are cached
+        workers (int, optional): Number of worker processes. Defaults to the executor default
+
+    Returns:
+        int: Total number of bytes saved
+    """
+    print(f"Optimizing PNG images in {output_dir}")
+
+    png_cache_dir = os.path.join(cache_dir, "png")
+    os.makedirs(png_cache_dir, exist_ok=True)
+
+    # Hash every PNG and split into cached and uncached images
+    images = []
+    uncached = []
+    for dir_path, _, filenames in os.walk(output_dir):
+        for filename in filenames:
+            if filename.lower().endswith(".png"):
+                path = os.path.join(dir_path, filename)
+                with open(path, "rb") as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                cache_base = os.path.join(png_cache_dir, digest)
+                images.append((path, cache_base))
+                if not os.path.exists(cache_base + ".png") and not os.path.exists(cache_base + ".keep"):
+                    uncached.append((path, cache_base))
+
+    # Optimize the uncached images in parallel; workers write their results to the cache
+    errors = {}
+    if uncached:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for (path, _), error in zip(uncached, executor.map(_optimize_to_cache, *zip(*uncached))):
+                if error is not None:
+                    errors[path] = error
+
+    # Copy optimized versions into place and report the savings
+    total_saved = 0
+    for path, cache_base in images:
+        original_size = os.path.getsize(path)
+        if os.path.exists(cache_base + ".png"):
+            shutil.copyfile(cache_base + ".png", path)
+            saved = original_size - os.path.getsize(path)
+            total_saved += saved
+            print(f"Optimized {path}: saved {saved} bytes ({saved * 100 / original_size:.1f}%)")
+        elif path in errors:
+            print(f"Warning: kept {path} unchanged, it could not be optimized: {errors[path]}")
+        else:
+            print(f"Kept {path}: already optimal")
+
+    print(f"PNG optimization saved {total_saved} bytes in total ({len(uncached)} optimized, "
+          f"{len(images) - len(uncached)} from cache)")
+    return total_saved
+
+def _optimize_to_cache(path, cache_base):
+    """
+    Internal worker that optimizes one PNG file and stores the result in the cache.
+
+    A '.png' file is written when the image got smaller, otherwise an empty '.keep'
+    marker records that the original should be kept. Malformed or unsupported images
+    are kept as well, so they are not retried on every build.
+
+    Args:
+        path (str): Path of the PNG to optimize
+        cache_base (str): Cache path without extension
+
+    Returns:
+        str: Why the image could not be optimized, or None
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    error = None
+    try:
+        optimized = optimize_png_bytes(data)
+    except (ValueError, KeyError, IndexError, struct.error, zlib.error) as e:
+        optimized, error = data, str(e) or type(e).__name__
+
+    if len(optimized) < len(data):
+        target, content = cache_base + ".png", optimized
+    else:
+        target, content = cache_base + ".keep", b""
+
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, target)
+    return error
+
+def optimize_png_bytes(data):
+    """
+    Re-encode the image data of a PNG with the best filter strategy and maximum zlib compression.
+
+    All chunks other than IDAT are kept unchanged. The result is decoded again and
+    compared with the original pixels before it is returned.
+
+    Args:
+        data (bytes): The PNG file contents
+
+    Returns:
+        bytes: The optimized PNG, or the original data if it cannot be made smaller
+    """
+    chunks = _read_chunks(data)
+    header = _parse_header(chunks)
+
+    # Adam7 interlaced images are filtered per pass; leave them alone
+    if header["interlace"] != 0:
+        return data
+
+    row_size, bpp = header["row_size"], header["bpp"]
+    scanlines = _unfilter(_idat_stream(chunks), row_size, bpp, header["height"])
+
+    # Try every filter strategy with the default zlib strategy and keep the smallest
+    best = None
+    for filtered in _filter_candidates(scanlines, bpp).values():
+        compressed = _compress(filtered, zlib.Z_DEFAULT_STRATEGY)
+        if best is None or len(compressed) < len(best[1]):
+            best = (filtered, compressed)
+
+    # Then see whether a different zlib strategy does better on the winning filter
+    filtered, compressed = best
+    for zlib_strategy in (zlib.Z_FILTERED, zlib.Z_RLE):
+        candidate = _compress(filtered, zlib_strategy)
+        if len(candidate) < len(compressed):
+            compressed = candidate
+
+    optimized = _write_chunks(chunks, compressed)
+    if len(optimized) >= len(data):
+        return data
+
+    # Never publish an image that doesn't decode to exactly the same pixels
+    new_chunks = _read_chunks(optimized)
+    if _unfilter(_idat_stream(new_chunks), row_size, bpp, header["height"]) != scanlines:
+        raise ValueError("Optimized PNG does not decode to the original pixels")
+
+    return optimized
+
+def decode_png_scanlines(data):
+    """
+    Decode the unfiltered scanlines of a non-interlaced PNG.
+
+    Args:
+        data (bytes): The PNG file contents
+
+    Returns:
+        list: One bytes object per image row
+    """
+    chunks = _read_chunks(data)
+    header = _parse_header(chunks)
+    return _unfilter(_idat_stream(chunks), header["row_size"], header["bpp"], header["height"])
+
+def _read_chunks(data):
+    """
+    Internal helper that splits a PNG file into its chunks.
+
+    Args:
+        data (bytes): The PNG file contents
+
+    Returns:
+        list: (chunk_type, chunk_data) tuples in file order
+
+    Raises:
+        ValueError: If the data is not a valid PNG
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("Not a PNG file")
+
+    chunks = []
+    pos = len(PNG_SIGNATURE)
+    while pos < len(data):
+        length, chunk_type = struct.unpack(">I4s", data[pos:pos + 8])
+        chunk_data = data[pos + 8:pos + 8 + length]
+        crc = struct.unpack(">I", data[pos + 8 + length:pos + 12 + length])[0]
+        if zlib.crc32(chunk_type + chunk_data) != crc:
+            raise ValueError(f"Bad CRC in {chunk_type!r} chunk")
+        chunks.append((chunk_type, chunk_data))
+        pos += 12 + length
+        if chunk_type == b"IEND":
+            break
+    return chunks
+
+def _parse_header(chunks):
+    """
+    Internal helper that decodes the IHDR chunk.
+
+    Args:
+        chunks (list): Chunks returned by _read_chunks
+
+    Returns:
+        dict: Width, height, bit depth, color type, interlace method, bytes per
+            complete pixel ('bpp', at least 1) and bytes per row ('row_size')
+    """
+    chunk_type, chunk_data = chunks[0]
+    if chunk_type != b"IHDR":
+        raise ValueError("PNG does not start with an IHDR chunk")
+    width, height, bit_depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", chunk_data)
+    bits_per_pixel = _CHANNELS[color_type] * bit_depth
+    return {
+        "width": width,
+        "height": height,
+        "bit_depth": bit_depth,
+        "color_type": color_type,
+        "interlace": interlace,
+        "bpp": max(1, bits_per_pixel // 8),
+        "row_size": (width * bits_per_pixel + 7) // 8,
+    }
+
+def _idat_stream(chunks):
+    """
+    Internal helper that decompresses the concatenated IDAT chunks.
+
+    Args:
+        chunks (list): Chunks returned by _read_chunks
+
+    Returns:
+        bytes: The filtered image data
+    """
+    return zlib.decompress(b"".join(chunk_data for chunk_type, chunk_data in chunks if chunk_type == b"IDAT"))
+
+def _write_chunks(chunks, idat_data):
+    """
+    Internal helper that assembles a PNG, replacing all IDAT chunks with a single new one.
+
+    Args:
+        chunks (list): The original chunks
+        idat_data (bytes): The new compressed image data
+
+    Returns:
+        bytes: The PNG file contents
+    """
+    parts = [PNG_SIGNATURE]
+    idat_written = False
+    for chunk_type, chunk_data in chunks:
+        if chunk_type == b"IDAT":
+            if idat_written:
+                continue
+            chunk_data = idat_data
+            idat_written = True
+        parts.append(struct.pack(">I", len(chunk_data)) + chunk_type + chunk_data
+                     + struct.pack(">I", zlib.crc32(chunk_type + chunk_data)))
+    return b"".join(parts)
+
+def _compress(data, strategy):
+    """
+    Internal helper that deflates data at maximum compression with the given zlib strategy.
+
+    Args:
+        data (bytes): The data to compress
+        strategy (int): A zlib strategy constant
+
+    Returns:
+        bytes: The zlib stream
+    """
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+    return compressor.compress(data) + compressor.flush()
+
+def _paeth(a, b, c):
+    """
+    Internal helper implementing the PNG Paeth predictor.
+
+    Args:
+        a (int): The byte to the left
+        b (int): The byte above
+        c (int): The byte above and to the left
+
+    Returns:
+        int: The predicted byte
+    """
+    p = a + b - c
+    pa = abs(p - a)
+    pb = abs(p - b)
+    pc = abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    if pb <= pc:
+        return b
+    return c
+
+def _unfilter(stream, row_size, bpp, height):
+    """
+    Internal helper that reverses the PNG scanline filters.
+
+    Args:
+        stream (bytes): The decompressed, filtered image data
+        row_size (int): Bytes per row, excluding the filter type byte
+        bpp (int): Bytes per complete pixel
+        height (int): Number of rows
+
+    Returns:
+        list: One bytes object per unfiltered row
+    """
+    rows = []
+    prev = bytes(row_size)
+    stride = row_size + 1
+    for y in range(height):
+        filter_type = stream[y * stride]
+        row = stream[y * stride + 1:(y + 1) * stride]
+
+        if filter_type == 0:
+            out = row
+        elif filter_type == 2:
+            out = bytes([(x + b) & 0xFF for x, b in zip(row, prev)])
+        else:
+            # Sub, Average and Paeth depend on the already decoded bytes to the left
+            out = bytearray(row)
+            for i in range(row_size):
+                a = out[i - bpp] if i >= bpp else 0
+                if filter_type == 1:
+                    out[i] = (out[i] + a) & 0xFF
+                elif filter_type == 3:
+                    out[i] = (out[i] + ((a + prev[i]) >> 1)) & 0xFF
+                elif filter_type == 4:
+                    c = prev[i - bpp] if i >= bpp else 0
+                    out[i] = (out[i] + _paeth(a, prev[i], c)) & 0xFF
+                else:
+                    raise ValueError(f"Invalid PNG filter type: {filter_type}")
+            out = bytes(out)
+
+        rows.append(out)
+        prev = out
+    return rows
+
+def _filter_row(filter_type, row, prev, bpp):
+    """
+    Internal helper that applies one PNG filter to a row.
+
+    Args:
+        filter_type (int): The PNG filter type (0-4)
+        row (bytes): The unfiltered row
+        prev (bytes): The unfiltered previous row (zeros for the first row)
+        bpp (int): Bytes per complete pixel
+
+    Returns:
+        bytes: The filtered row, without the filter type byte
+    """
+    if filter_type == 0:
+        return row
+    if filter_type == 2:
+        return bytes([(x - b) & 0xFF for x, b in zip(row, prev)])
+
+    left = bytes(bpp) + row[:-bpp]
+    if filter_type == 1:
+        return bytes([(x - a) & 0xFF for x, a in zip(row, left)])
+    if filter_type == 3:
+        return bytes([(x - ((a + b) >> 1)) & 0xFF for x, a, b in zip(row, left, prev)])
+
+    upper_left = bytes(bpp) + prev[:-bpp]
+    return bytes([(x - _paeth(a, b, c)) & 0xFF for x, a, b, c in zip(row, left, prev, upper_left)])
+
+def _filter_candidates(scanlines, bpp):
+    """
+    Internal helper that filters all rows with every strategy in a single pass.
+
+    Each row is filtered once per PNG filter type; the uniform strategies use one
+    type for every row, while the adaptive strategy picks, per row, the filter with
+    the smallest sum of absolute values (treating bytes as signed), as recommended
+    by the PNG spec.
+
+    Args:
+        scanlines (list): The unfiltered rows
+        bpp (int): Bytes per complete pixel
+
+    Returns:
+        dict: Maps each name in FILTER_STRATEGIES to the filtered image data,
+            including the filter type bytes
+    """
+    parts = {strategy: [] for strategy in FILTER_STRATEGIES}
+    prev = bytes(len(scanlines[0])) if scanlines else b""
+    for row in scanlines:
+        best_score = None
+        for filter_type in range(5):
+            filtered = bytes([filter_type]) + _filter_row(filter_type, row, prev, bpp)
+            parts[FILTER_STRATEGIES[filter_type]].append(filtered)
+
+            score = sum(value if value < 128 else 256 - value for value in filtered[1:])
+            if best_score is None or score < best_score:
+                best_score, best_row = score, filtered
+
+        parts["adaptive"].append(best_row)
+        prev = row
+    return {strategy: b"".join(rows) for strategy, rows in parts.items()}
@@ -0,0 +1,120 @@
+import gzip
+import hashlib
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Handle imports differently based on how the script is being run
+try:
+    from .buildstate import load_state, save_state
+except ImportError:
+    from buildstate import load_state, save_state
+
+# Text-based formats that benefit from compression. Images such as PNG are
+# already compressed, so gzipping them only wastes build time.
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".svg", ".js", ".json", ".xml", ".txt")
+
+def precompress_outputs(output_dir, cache_dir, level=9, workers=None):
+    """
+    Write a precompressed .gz sibling next to every compressible file in the output directory.
+
+    Files are compressed in a thread pool (zlib releases the GIL while compressing).
+    A file is skipped when its content hash matches the one recorded by the previous
+    build and its .gz sibling still exists. Compressed blobs are also cached by content
+    hash, so a clean build only re-reads unchanged files instead of recompressing them.
+
+    Args:
+        output_dir (str): Directory containing the generated site (e.g., 'docs')
+        cache_dir (str): Directory for build state and cached compressed blobs
+        level (int, optional): gzip compression level (1-9). Defaults to 9
+        workers (int, optional): Number of worker threads. Defaults to the executor default
+
+    Returns:
+        dict: Counts of files per outcome ("compressed", "reused", "skipped", "incompressible")
+    """
+    if not 1 <= level <= 9:
+        raise ValueError(f"Invalid gzip compression level: {level}")
+
+    print(f"Precompressing files in {output_dir} (level {level})")
+
+    state_path = os.path.join(cache_dir, "precompress.json")
+    blob_dir = os.path.join(cache_dir, "gzip")
+    os.makedirs(blob_dir, exist_ok=True)
+    previous_state = load_state(state_path)
+
+    # Collect every compressible file in the output tree
+    jobs = []
+    for dir_path, _, filenames in os.walk(output_dir):
+        for filename in filenames:
+            if filename.endswith(COMPRESSIBLE_EXTENSIONS):
+                path = os.path.join(dir_path, filename)
+                rel_path = os.path.relpath(path, output_dir)
+                jobs.append((path, rel_path, previous_state.get(rel_path)))
+
+    # Compress in parallel and record the new hashes
+    counts = {"compressed": 0, "reused": 0, "skipped": 0, "incompressible": 0}
+    new_state = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_compress_file, path, level, previous, blob_dir)
+                   for path, _, previous in jobs]
+        for (_, rel_path, _), future in zip(jobs, futures):
+            state_key, outcome = future.result()
+            new_state[rel_path] = state_key
+            counts[outcome] += 1
+
+    save_state(state_path, new_state)
+
+    print(f"Precompression finished: {counts['compressed']} compressed, {counts['reused']} reused from cache, "
+          f"{counts['skipped']} unchanged, {counts['incompressible']} incompressible")
+    return counts
+
+def _compress_file(path, level, previous_key, blob_dir):
+    """
+    Internal helper that writes the .gz sibling for a single file.
+
+    Args:
+        path (str): Path of the file to compress
+        level (int): gzip compression level
+        previous_key (str): State key recorded for this file by the previous build, or None
+        blob_dir (str): Directory holding cached compressed blobs
+
+    Returns:
+        tuple: (state_key, outcome) where outcome is one of the count names
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    # The level is part of the key so changing it invalidates earlier output
+    state_key = f"{level}:{hashlib.sha256(data).hexdigest()}"
+    gz_path = path + ".gz"
+
+    # Unchanged since the last build and the sibling is still there
+    if state_key == previous_key and os.path.exists(gz_path):
+        return state_key, "skipped"
+    if previous_key == state_key + ":raw":
+        return previous_key, "skipped"
+
+    blob_path = os.path.join(blob_dir, state_key.replace(":", "-") + ".gz")
+    if os.path.exists(blob_path):
+        shutil.copyfile(blob_path, gz_path)
+        return state_key, "reused"
+
+    # mtime=0 keeps the output byte-for-byte reproducible between builds
+    compressed = gzip.compress(data, compresslevel=level, mtime=0)
+
+    # Don't publish a .gz that is larger than the original
+    if len(compressed) >= len(data):
+        if os.path.exists(gz_path):
+            os.remove(gz_path)
+        return state_key + ":raw", "incompressible"
+
+    with open(gz_path, "wb") as f:
+        f.write(compressed)
+
+    tmp_path = f"{blob_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(compressed)
+    os.replace(tmp_path, blob_path)
+
+    return state_key, "compressed"
@@ -0,0 +1,214 @@
+import heapq
+import math
+import os
+import re
+from collections import Counter
+
+# Handle imports differently based on how the script is being run
+try:
+    from .htmlnode import LeafNode, ParentNode
+    from .minify import minify_html
+except ImportError:
+    from htmlnode import LeafNode, ParentNode
+    from minify import minify_html
+
+# Template placeholder for the related posts section
+RELATED_PLACEHOLDER = "{{ Related }}"
+
+# Element the placeholder becomes; its content is filled in once every page is indexed
+RELATED_ELEMENT = '<aside id="related-posts"></aside>'
+
+# Default number of related posts per page
+DEFAULT_RELATED_COUNT = 5
+
+# Each term keeps only its highest-weighted postings (impact-ordered pruning)
+POSTINGS_LIMIT = 200
+
+# Only a page's highest-weighted terms are used to look up its related pages
+QUERY_TERMS = 50
+
+# The related posts element as written, with or without attribute quotes after minification
+_RELATED_RE = re.compile(r'<aside id="?related-posts"?>.*?</aside>', re.DOTALL)
+
+class RelatedIndex:
+    def __init__(self, page_terms, postings_limit=POSTINGS_LIMIT, query_terms=QUERY_TERMS):
+        """
+        Build a TF-IDF inverted index for finding pages with similar text.
+
+        Similarity is the cosine of TF-IDF vectors, but it is never computed for
+        every pair of pages: a page is only compared with the pages found in the
+        postings of its top query_terms terms, and each term keeps only its
+        postings_limit highest weights. Terms on a single page can't relate two
+        pages and terms on every page carry no weight, so both are dropped.
+
+        Args:
+            page_terms (dict): Page -> {term: count}
+            postings_limit (int, optional): Maximum postings kept per term
+            query_terms (int, optional): Number of terms of a page used to query the index
+        """
+        self.query_terms = query_terms
+        page_count = len(page_terms)
+        document_frequency = Counter(term for terms in page_terms.values() for term in terms)
+
+        # Log-scaled term frequency times inverse document frequency, normalized to unit length
+        self.vectors = {}
+        for page, terms in page_terms.items():
+            vector = {term: (1 + math.log(count)) * math.log(page_count / document_frequency[term])
+                      for term, count in terms.items() if 1 < document_frequency[term] < page_count}
+            norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+            self.vectors[page] = {term: weight / norm for term, weight in vector.items()} if norm else {}
+
+        postings = {}
+        for page, vector in self.vectors.items():
+            for term, weight in vector.items():
+                postings.setdefault(term, []).append((weight, page))
+        self.postings = {term: heapq.nlargest(postings_limit, entries) for term, entries in postings.items()}
+
+    def _query(self, page):
+        """
+        Internal helper that returns the highest-weighted terms of a page.
+
+        Args:
+            page: A page in the index
+
+        Returns:
+            list: (term, weight) pairs
+        """
+        vector = self.vectors.get(page, {})
+        return heapq.nlargest(self.query_terms, vector.items(), key=lambda item: (item[1], item[0]))
+
+    def related(self, page, count):
+        """
+        Find the pages most similar to a page.
+
+        Args:
+            page: A page in the index
+            count (int): Maximum number of pages to return
+
+        Returns:
+            list: The related pages, most similar first (ties broken by page)
+        """
+        scores = {}
+        for term, weight in self._query(page):
+            for other_weight, other in self.postings[term]:
+                if other != page:
+                    scores[other] = scores.get(other, 0.0) + weight * other_weight
+        best = heapq.nsmallest(count, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [other for other, _ in best]
+
+    def neighbours(self, page):
+        """
+        List the pages that share a query term with a page, i.e. the pages whose
+        related posts could change when this page changes.
+
+        Args:
+            page: A page in the index
+
+        Returns:
+            set: The pages, excluding the page itself
+        """
+        pages = set()
+        for term, _ in self._query(page):
+            pages.update(other for _, other in self.postings[term])
+        pages.discard(page)
+        return pages
+
+def related_html(entries, basepath="/"):
+    """
+    Build the related posts element of a page.
+
+    Args:
+        entries (list): (url, title) of the related pages, most similar first
+        basepath (str, optional): The base path for all URLs. Defaults to "/"
+
+    Returns:
+        str: The element, empty if there are no related pages
+    """
+    if not entries:
+        return RELATED_ELEMENT
+    items = [ParentNode("li", [LeafNode("a", title, {"href": basepath + url.lstrip("/")})])
+             for url, title in entries]
+    content = ParentNode("nav", [LeafNode("h2", "Related posts"), ParentNode("ul", items)]).to_html()
+    return RELATED_ELEMENT.replace("></", f">{content}</")
+
+def update_related_posts(directories, content_index, results, content_root, dest_dir, basepath="/", minify=False,
+                         count=DEFAULT_RELATED_COUNT, include_drafts=False):
+    """
+    Fill in the related posts of every page below the given content directories.
+
+    Related pages are cached in the content index with the fingerprint of the page
+    and the count they were computed for. Only pages whose terms changed, pages that
+    listed a changed or removed page, and pages sharing a query term with a changed
+    page are recomputed. The generated pages are then patched in place: recomputed
+    pages, and pages written by this build, whose element is still empty.
+
+    Args:
+        directories (list): Content directories, relative to the content root (e.g., ['blog'])
+        content_index (ContentIndex): Index already updated with this build's pages
+        results (list): PageResult objects of the pages generated by this build
+        content_root (str): The root content directory
+        dest_dir (str): The destination directory
+        basepath (str, optional): The base path for all URLs. Defaults to "/"
+        minify (bool, optional): Whether the pages are minified. Defaults to False
+        count (int, optional): Number of related posts per page
+        include_drafts (bool, optional): Whether drafts are published. Defaults to False
+
+    Returns:
+        int: Number of pages whose related posts were recomputed
+    """
+    cached = content_index.get_related()
+    written = {os.path.relpath(result.source_path, content_root).replace(os.sep, "/") for result in results}
+    recomputed = 0
+
+    for directory in directories:
+        directory_url = "/" + directory.strip("/")
+        rows = {row["source"]: row for row in content_index.pages(directory_url + "/", include_drafts)}
+        index = RelatedIndex(content_index.page_terms(directory_url + "/", include_drafts))
+
+        # Pages whose terms (or title) changed since their related pages were computed
+        fingerprints = {source: f"{count}:{row['fingerprint']}" for source, row in rows.items()}
+        changed = {source for source in rows
+                   if source not in cached or cached[source][0] != fingerprints[source]}
+        stale = set(changed)
+        for source in changed:
+            stale.update(index.neighbours(source))
+        for source in rows:
+            if source in cached and any(other in changed or other not in rows for other in cached[source][1]):
+                stale.add(source)
+
+        entries = []
+        related = {}
+        for source in rows:
+            if source in stale:
+                related[source] = index.related(source, count)
+                entries.append((source, fingerprints[source], related[source]))
+            else:
+                related[source] = cached[source][1]
+        content_index.set_related(entries)
+        recomputed += len(entries)
+
+        # Patch the pages whose element changed or was just written empty
+        for source in stale | (written & set(rows)):
+            html = related_html([(rows[other]["url"], rows[other]["title"]) for other in related[source]], basepath)
+            if minify:
+                html = minify_html(html)
+            _patch_page(os.path.join(dest_dir, *rows[source]["output"].split("/")), html)
+
+    return recomputed
+
+def _patch_page(path, html):
+    """
+    Internal helper that replaces the related posts element of a generated page.
+
+    Args:
+        path (str): Path of the generated HTML file
+        html (str): The new element
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "r") as f:
+        page = f.read()
+    patched = _RELATED_RE.sub(lambda match: html, page, count=1)
+    if patched != page:
+        with open(path, "w") as f:
+            f.write(patched)
@@ -0,0 +1,187 @@
+import os
+
+# Handle imports differently based on how the script is being run
+try:
+    from .walker import walk_manifest
+    from .frontmatter import read_front_matter
+except ImportError:
+    from walker import walk_manifest
+    from frontmatter import read_front_matter
+
+class Route:
+    def __init__(self, source_path, output_path, url, metadata=None):
+        """
+        Initialize a Route, which ties a markdown source to the page generated from it.
+
+        Args:
+            source_path (str): Path to the markdown file
+            output_path (str): Path of the generated HTML file
+            url (str): Public URL of the page, without the basepath (e.g., '/blog/tom')
+            metadata (dict, optional): The page's front matter
+        """
+        self.source_path = source_path
+        self.output_path = output_path
+        self.url = url
+        self.metadata = metadata if metadata is not None else {}
+
+    def __repr__(self):
+        return f"Route({self.source_path!r}, {self.output_path!r}, {self.url!r})"
+
+def route_paths(rel_path):
+    """
+    Apply the routing rules to a markdown file's path relative to the content root.
+
+    index.md becomes the index.html of its directory; any other name.md gets a
+    directory of its own, so every page has a clean URL.
+
+    Args:
+        rel_path (str): Relative source path with '/' separators (e.g., 'blog/tom/index.md')
+
+    Returns:
+        tuple: (relative output path with '/' separators, URL)
+    """
+    # Only the trailing extension is removed, so 'notes.md.md' keeps its inner '.md'
+    stem = rel_path[:-len(".md")] if rel_path.endswith(".md") else rel_path
+    directory, _, name = stem.rpartition("/")
+    if name != "index":
+        directory = stem
+    output = f"{directory}/index.html" if directory else "index.html"
+    return output, "/" + directory
+
+class RouteTable:
+    def __init__(self, content_root, dest_dir):
+        """
+        Initialize an empty RouteTable, the build-wide map between sources, outputs and URLs.
+
+        Args:
+            content_root (str): The root content directory
+            dest_dir (str): The destination directory
+        """
+        self.content_root = content_root
+        self.dest_dir = dest_dir
+        self._routes = []
+        self._rel_paths = []
+        self._by_source = {}
+        self._by_url = {}
+        self._by_output = {}
+
+    def add(self, rel_path, metadata=None):
+        """
+        Route a markdown file.
+
+        Args:
+            rel_path (str): Path relative to the content root, with '/' separators
+            metadata (dict, optional): The page's front matter
+
+        Returns:
+            Route: The new route
+
+        Raises:
+            ValueError: If another source is already routed to the same output
+        """
+        output, url = route_paths(rel_path)
+        if output in self._by_output:
+            raise ValueError(f"{rel_path} and {self._by_output[output].source_path} "
+                             f"would both be written to {output}")
+        route = Route(os.path.join(self.content_root, *rel_path.split("/")),
+                      os.path.join(self.dest_dir, *output.split("/")), url, metadata)
+        self._routes.append(route)
+        self._rel_paths.append(rel_path)
+        self._by_source[os.path.normpath(route.source_path)] = route
+        self._by_url[url] = route
+        self._by_output[output] = route
+        return route
+
+    def for_source(self, source_path):
+        """
+        Look up the route of a markdown file.
+
+        Args:
+            source_path (str): Path to the markdown file
+
+        Returns:
+            Route: The route, or None if the file is not a routed page
+        """
+        return self._by_source.get(os.path.normpath(source_path))
+
+    def for_url(self, url):
+        """
+        Look up the page served at a URL, with or without a trailing slash.
+
+        Args:
+            url (str): A root-relative URL without the basepath (e.g., '/blog/tom/')
+
+        Returns:
+            Route: The route, or None if no page has that URL
+        """
+        if url != "/" and url.endswith("/"):
+            url = url[:-1]
+        return self._by_url.get(url)
+
+    def for_output(self, rel_output):
+        """
+        Look up the page written to an output path.
+
+        Args:
+            rel_output (str): Path relative to the destination directory, with '/' separators
+
+        Returns:
+            Route: The route, or None if no page is written there
+        """
+        return self._by_output.get(rel_output)
+
+    def output_dirs(self, routes=None):
+        """
+        Return the output directories needed by a set of routes, parents first.
+
+        Args:
+            routes (list, optional): The routes to cover. Defaults to all routes
+
+        Returns:
+            list: Sorted directory paths
+        """
+        routes = self._routes if routes is None else routes
+        return sorted({os.path.dirname(route.output_path) for route in routes})
+
+    def rel_paths(self):
+        """
+        Return the routed sources relative to the content root, e.g. to detect added or removed pages.
+
+        Returns:
+            list: Relative source paths with '/' separators, in routing order
+        """
+        return list(self._rel_paths)
+
+    def __iter__(self):
+        return iter(self._routes)
+
+    def __len__(self):
+        return len(self._routes)
+
+def build_route_table(content_root, dest_dir, manifest=None, include_drafts=True):
+    """
+    Route every markdown file below the content root, in a single walk.
+
+    Each page's front matter is read from its header alone and kept on the route.
+
+    Args:
+        content_root (str): The root content directory
+        dest_dir (str): The destination directory
+        manifest (list, optional): The content directory's walk_manifest, if already built
+        include_drafts (bool, optional): Whether to route pages marked 'draft: true'. Defaults to True
+
+    Returns:
+        RouteTable: Routes sorted by source path
+    """
+    if manifest is None:
+        manifest = walk_manifest(content_root)
+
+    routes = RouteTable(content_root, dest_dir)
+    for entry in manifest:
+        if not entry.is_dir and entry.name.endswith(".md"):
+            metadata = read_front_matter(entry.path)
+            if metadata.get("draft") is True and not include_drafts:
+                print(f"Skipping draft: {entry.path}")
+                continue
+            routes.add(entry.rel_path, metadata)
+    return routes
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import re
+
+# Directory of the search index inside the output directory
+SEARCH_DIR = "search"
+
+# Terms shorter than this are not indexed
+MIN_TERM_LENGTH = 2
+
+# Number of leading characters of a term that choose its shard
+SHARD_PREFIX_LENGTH = 2
+
+_TERM = re.compile(r"[^\W_]+")
+
+def tokenize(text):
+    """
+    Split text into normalized search terms.
+
+    Terms are runs of letters and digits, case-folded so that 'Tolkien' and
+    'TOLKIEN' match. Single characters are dropped.
+
+    Args:
+        text (str): Text of a rendered text node
+
+    Returns:
+        list: The terms, in order of appearance
+    """
+    return [term for term in _TERM.findall(text.casefold()) if len(term) >= MIN_TERM_LENGTH]
+
+def shard_prefix(term):
+    """
+    Return the prefix that chooses the shard a term is stored in.
+
+    Args:
+        term (str): A normalized term
+
+    Returns:
+        str: The term's first SHARD_PREFIX_LENGTH characters
+    """
+    return term[:SHARD_PREFIX_LENGTH]
+
+def write_search_index(content_index, dest_dir, include_drafts=False):
+    """
+    Write the client-side search index from the terms recorded while rendering.
+
+    The index is a directory of JSON files: index.json maps page ids to URL and
+    title and lists the shards, and every shard <prefix>.json maps the terms
+    starting with that prefix to [page id, term frequency] pairs. A browser only
+    downloads the shards of the terms it searches for.
+
+    Postings are streamed from the content index in term order, one shard at a
+    time. Page ids are stable across builds, so a changed page only changes the
+    shards of its terms, and only shards whose fingerprint changed are rewritten.
+
+    Args:
+        content_index (ContentIndex): Index already updated with this build's pages
+        dest_dir (str): The destination directory
+        include_drafts (bool, optional): Whether to index drafts. Defaults to False
+
+    Returns:
+        tuple: (number of files written, total number of shards)
+    """
+    search_dir = os.path.join(dest_dir, SEARCH_DIR)
+    os.makedirs(search_dir, exist_ok=True)
+    previous = content_index.get_state("search", {})
+    fingerprints = {}
+    written = 0
+
+    def flush(name, data):
+        nonlocal written
+        content = json.dumps(data, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+        fingerprint = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        fingerprints[name] = fingerprint
+        path = os.path.join(search_dir, name)
+        if previous.get(name) == fingerprint and os.path.exists(path):
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        written += 1
+
+    # Terms arrive sorted, so each shard's terms are consecutive
+    prefix, shard = None, {}
+    for term, page_id, count in content_index.search_postings(include_drafts):
+        if shard_prefix(term) != prefix:
+            if shard:
+                flush(f"{prefix}.json", shard)
+            prefix, shard = shard_prefix(term), {}
+        shard.setdefault(term, []).append([page_id, count])
+    if shard:
+        flush(f"{prefix}.json", shard)
+
+    shards = sorted(name[:-len(".json")] for name in fingerprints)
+    pages = {str(row["id"]): [row["url"], row["title"]] for row in content_index.search_pages(include_drafts)}
+    flush("index.json", {"pages": pages, "shards": shards})
+
+    # Remove shards whose terms no longer appear on any page
+    for name in previous:
+        if name not in fingerprints:
+            path = os.path.join(search_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    content_index.set_state("search", fingerprints)
+    return written, len(shards)
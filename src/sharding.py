@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import shutil
+
+# Name of the manifest each shard writes into its output directory
+MANIFEST_NAME = ".shard-manifest.json"
+
+def parse_shard(value):
+    """
+    Parse a shard specification of the form 'K/N'.
+
+    Args:
+        value (str): The specification, e.g. '2/4' for the second of four shards
+
+    Returns:
+        tuple: (index, count) with 1 <= index <= count
+
+    Raises:
+        ValueError: If the specification is malformed or out of range
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}': expected K/N, e.g. 1/4")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{value}': K must be between 1 and N")
+    return index, count
+
+def shard_for_path(rel_path, count):
+    """
+    Assign a content file to a shard using a hash that is stable across machines and runs.
+
+    Args:
+        rel_path (str): Path of the source file relative to the content root
+        count (int): Total number of shards
+
+    Returns:
+        int: The 1-based shard index that owns the file
+    """
+    # Normalize separators so Windows and POSIX builders agree
+    key = rel_path.replace(os.sep, "/").encode("utf-8")
+    return int.from_bytes(hashlib.sha1(key).digest()[:8], "big") % count + 1
+
+def write_shard_manifest(output_dir, shard):
+    """
+    Record every file a shard wrote, so the merge step can verify the shards are disjoint.
+
+    Args:
+        output_dir (str): The shard's output directory
+        shard (tuple): (index, count) as returned by parse_shard
+
+    Returns:
+        list: The relative paths listed in the manifest
+    """
+    files = []
+    for dir_path, _, filenames in os.walk(output_dir):
+        for filename in filenames:
+            rel_path = os.path.relpath(os.path.join(dir_path, filename), output_dir).replace(os.sep, "/")
+            if rel_path != MANIFEST_NAME:
+                files.append(rel_path)
+    files.sort()
+
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w") as f:
+        json.dump({"shard": shard[0], "count": shard[1], "files": files}, f, indent=1)
+
+    print(f"Shard {shard[0]}/{shard[1]} wrote {len(files)} files")
+    return files
+
+def merge_shards(shard_dirs, output_dir):
+    """
+    Combine the outputs of a complete set of shards into one directory.
+
+    Args:
+        shard_dirs (list): Output directories of the shards, in any order
+        output_dir (str): Directory to write the merged site to; its contents are replaced
+
+    Returns:
+        int: Number of files merged
+
+    Raises:
+        ValueError: If a manifest is missing, the shards don't form a complete set,
+            or two shards wrote the same output path
+    """
+    manifests = []
+    for shard_dir in shard_dirs:
+        manifest_path = os.path.join(shard_dir, MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            raise ValueError(f"No shard manifest found in {shard_dir}")
+        with open(manifest_path, "r") as f:
+            manifests.append((shard_dir, json.load(f)))
+
+    # Every shard of the same N must be present exactly once
+    counts = {manifest["count"] for _, manifest in manifests}
+    indexes = sorted(manifest["shard"] for _, manifest in manifests)
+    if len(counts) != 1 or indexes != list(range(1, counts.pop() + 1)):
+        raise ValueError(f"Incomplete or inconsistent shard set: {indexes}")
+
+    # No output path may be claimed by two shards
+    owners = {}
+    for shard_dir, manifest in manifests:
+        for rel_path in manifest["files"]:
+            if rel_path in owners:
+                raise ValueError(f"Output path {rel_path} was written by shards {owners[rel_path][1]} "
+                                 f"and {manifest['shard']}")
+            owners[rel_path] = (shard_dir, manifest["shard"])
+
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    for rel_path, (shard_dir, _) in sorted(owners.items()):
+        target_path = os.path.join(output_dir, rel_path)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        shutil.copyfile(os.path.join(shard_dir, rel_path), target_path)
+
+    print(f"Merged {len(owners)} files from {len(manifests)} shards into {output_dir}")
+    return len(owners)
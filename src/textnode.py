@@ -10,10 +10,12 @@ class TextType(Enum):
 
 
 class TextNode:
-    def __init__(self, text, text_type, url=None):
+    def __init__(self, text, text_type, url=None, line=None):
         self.text = text
         self.text_type = text_type
         self.url = url
+        # Source line of a link or image, for the link checker; not part of equality
+        self.line = line
 
     def __eq__(self, other):
         if not isinstance(other, TextNode):
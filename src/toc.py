@@ -0,0 +1,75 @@
+import re
+
+# Handle imports differently based on how the script is being run
+try:
+    from .htmlnode import LeafNode, ParentNode
+except ImportError:
+    from htmlnode import LeafNode, ParentNode
+
+# Template placeholder for the table of contents
+TOC_PLACEHOLDER = "{{ TOC }}"
+
+# Headings from this level down are listed in the table of contents (h1 is the page title)
+TOC_MIN_LEVEL = 2
+
+def slugify(text):
+    """
+    Turn heading text into an anchor id.
+
+    Args:
+        text (str): The heading's text, without markup
+
+    Returns:
+        str: Lowercase words joined by hyphens (e.g., 'Why Tom's House?' -> 'why-toms-house'),
+            or 'section' if the text has no letters or digits
+    """
+    slug = re.sub(r"[^\w\s-]", "", text.lower())
+    slug = re.sub(r"[\s_-]+", "-", slug).strip("-")
+    return slug or "section"
+
+def toc_html_node(headings, min_level=TOC_MIN_LEVEL):
+    """
+    Build a nested table of contents from a page's headings.
+
+    Each heading is nested under the closest preceding heading of a higher level.
+
+    Args:
+        headings (list): (level, id, text) of the page's headings, in document order
+        min_level (int, optional): Shallowest heading level to list
+
+    Returns:
+        ParentNode: A nav element with nested lists of links, or None if there is nothing to list
+    """
+    # Build the tree as (id, text, children) tuples, keeping a stack of open levels
+    root = []
+    stack = [(0, root)]
+    for level, anchor, text in headings:
+        if level < min_level:
+            continue
+        while stack[-1][0] >= level:
+            stack.pop()
+        item = (anchor, text, [])
+        stack[-1][1].append(item)
+        stack.append((level, item[2]))
+
+    if not root:
+        return None
+    return ParentNode("nav", [_toc_list(root)], {"class": "toc"})
+
+def _toc_list(items):
+    """
+    Internal helper that converts one level of the table of contents to a list.
+
+    Args:
+        items (list): (id, text, children) tuples
+
+    Returns:
+        ParentNode: A ul element
+    """
+    list_items = []
+    for anchor, text, children in items:
+        item_children = [LeafNode("a", text, {"href": f"#{anchor}"})]
+        if children:
+            item_children.append(_toc_list(children))
+        list_items.append(ParentNode("li", item_children))
+    return ParentNode("ul", list_items)
@@ -0,0 +1,60 @@
+import os
+
+class ManifestEntry:
+    def __init__(self, rel_path, dir_entry):
+        """
+        Initialize a ManifestEntry, one file or directory found by walk_manifest.
+
+        Args:
+            rel_path (str): Path relative to the walked root, with '/' separators
+            dir_entry (os.DirEntry): The entry returned by os.scandir
+        """
+        self.rel_path = rel_path
+        self.path = dir_entry.path
+        self.name = dir_entry.name
+        # scandir reports the file type from the directory listing, without a stat call
+        self.is_dir = dir_entry.is_dir()
+        self._dir_entry = dir_entry
+
+    def stat(self):
+        """
+        Return the entry's stat result, fetched at most once per walk.
+
+        Returns:
+            os.stat_result: The stat result
+        """
+        return self._dir_entry.stat()
+
+    def __repr__(self):
+        return f"ManifestEntry({self.rel_path!r}, is_dir={self.is_dir})"
+
+def walk_manifest(root):
+    """
+    List every file and directory below root with a single os.scandir pass.
+
+    The walk is iterative, so deep trees don't grow the Python stack, and file types
+    come from the directory listing itself. The result is sorted by relative path,
+    which puts every directory before its contents and makes builds deterministic.
+
+    Args:
+        root (str): The directory to walk
+
+    Returns:
+        list: ManifestEntry objects for all files and directories below root
+
+    Raises:
+        FileNotFoundError: If root does not exist
+    """
+    entries = []
+    pending = [(root, "")]
+    while pending:
+        dir_path, rel_dir = pending.pop()
+        with os.scandir(dir_path) as iterator:
+            for dir_entry in iterator:
+                entry = ManifestEntry(rel_dir + dir_entry.name, dir_entry)
+                entries.append(entry)
+                if entry.is_dir:
+                    pending.append((entry.path, entry.rel_path + "/"))
+
+    entries.sort(key=lambda entry: entry.rel_path)
+    return entries
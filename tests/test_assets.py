@@ -0,0 +1,122 @@
+import unittest
+import hashlib
+import os
+import tempfile
+
+from src.assets import (
+    build_asset_index,
+    build_fingerprint_map,
+    fingerprint_url,
+    publish_fingerprinted_assets,
+    rewrite_asset_urls,
+)
+from src.context import SiteContext
+from src.main import markdown_to_html_node
+
+
+class TestFingerprintUrl(unittest.TestCase):
+    def test_hash_inserted_before_extension(self):
+        """Test that the hash goes between the name and the extension"""
+        self.assertEqual(fingerprint_url("/images/tom.png", "abcdef0123456789"), "/images/tom.abcdef0123.png")
+
+    def test_multiple_dots(self):
+        """Test that only the last extension is kept after the hash"""
+        self.assertEqual(fingerprint_url("/js/app.min.js", "0" * 64), "/js/app.min.0000000000.js")
+
+    def test_no_extension(self):
+        """Test that files without an extension get the hash appended"""
+        self.assertEqual(fingerprint_url("/LICENSE", "1" * 64), "/LICENSE.1111111111")
+
+
+class TestAssetIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static_dir = os.path.join(self.tmp.name, "static")
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+        os.makedirs(os.path.join(self.static_dir, "images"))
+        self._write("index.css", b"body { color: red; }")
+        self._write("images/tom.png", b"\x89PNG fake image")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, rel_path, data):
+        with open(os.path.join(self.static_dir, rel_path), "wb") as f:
+            f.write(data)
+
+    def test_index_hashes_every_file(self):
+        """Test that every static file is indexed by URL with its SHA-256"""
+        index = build_asset_index(self.static_dir, self.cache_dir)
+        self.assertEqual(set(index), {"/index.css", "/images/tom.png"})
+        self.assertEqual(index["/index.css"]["hash"], hashlib.sha256(b"body { color: red; }").hexdigest())
+
+    def test_unchanged_files_not_rehashed(self):
+        """Test that the stat cache is trusted for files whose size and mtime did not change"""
+        build_asset_index(self.static_dir, self.cache_dir)
+        # Poison the cache: if the stat info matches, the stored hash must be reused
+        path = os.path.join(self.cache_dir, "assets.json")
+        with open(path) as f:
+            content = f.read()
+        real = hashlib.sha256(b"body { color: red; }").hexdigest()
+        with open(path, "w") as f:
+            f.write(content.replace(real, "f" * 64))
+        index = build_asset_index(self.static_dir, self.cache_dir)
+        self.assertEqual(index["/index.css"]["hash"], "f" * 64)
+
+    def test_modified_file_rehashed(self):
+        """Test that a change in size invalidates the cached hash"""
+        build_asset_index(self.static_dir, self.cache_dir)
+        self._write("index.css", b"body { color: blue; margin: 0; }")
+        index = build_asset_index(self.static_dir, self.cache_dir)
+        self.assertEqual(index["/index.css"]["hash"],
+                         hashlib.sha256(b"body { color: blue; margin: 0; }").hexdigest())
+
+    def test_publish_keeps_original_and_adds_fingerprinted(self):
+        """Test that fingerprinted copies are published next to the originals"""
+        index = build_asset_index(self.static_dir)
+        asset_map = build_fingerprint_map(index)
+        publish_fingerprinted_assets(asset_map, self.static_dir)
+        fingerprinted = os.path.join(self.static_dir, asset_map["/index.css"].lstrip("/"))
+        with open(fingerprinted, "rb") as f:
+            self.assertEqual(f.read(), b"body { color: red; }")
+        self.assertTrue(os.path.exists(os.path.join(self.static_dir, "index.css")))
+
+
+class TestAssetRewriting(unittest.TestCase):
+    asset_map = {"/index.css": "/index.0123456789.css", "/images/tom.png": "/images/tom.abcdef0123.png"}
+
+    def test_rewrite_template(self):
+        """Test that known href/src values are rewritten and others left alone"""
+        html = '<link href="/index.css" rel="stylesheet" /><a href="/blog/tom">Tom</a>'
+        self.assertEqual(
+            rewrite_asset_urls(html, self.asset_map),
+            '<link href="/index.0123456789.css" rel="stylesheet" /><a href="/blog/tom">Tom</a>',
+        )
+
+    def test_rendered_nodes_use_map(self):
+        """Test that img and a nodes are rewritten while rendering"""
+        context = SiteContext(asset_map=self.asset_map).page()
+        html = markdown_to_html_node(
+            "![Tom](/images/tom.png) and [full size](/images/tom.png) and [home](/)", context
+        ).to_html()
+        self.assertIn('<img src="/images/tom.abcdef0123.png" alt="Tom"></img>', html)
+        self.assertIn('<a href="/images/tom.abcdef0123.png">full size</a>', html)
+        self.assertIn('<a href="/">home</a>', html)
+
+    def test_template_loaded_once(self):
+        """Test that the site context prepares each template only once"""
+        with tempfile.NamedTemporaryFile("w", suffix=".html", delete=False) as f:
+            f.write('<link href="/index.css" rel="stylesheet" />')
+        try:
+            site = SiteContext(asset_map=self.asset_map)
+            first = site.load_template(f.name)
+            os.remove(f.name)
+            self.assertIs(site.load_template(f.name), first)
+            self.assertIn("/index.0123456789.css", first)
+        finally:
+            if os.path.exists(f.name):
+                os.remove(f.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
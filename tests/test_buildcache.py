@@ -0,0 +1,113 @@
+import unittest
+import io
+import os
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from src.buildcache import BuildCache
+from src.context import SiteContext
+from src.main import generate_pages_recursive
+
+
+class TestBuildCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = BuildCache(os.path.join(self.tmp.name, "pages"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_covers_inputs(self):
+        """Test that changing any input changes the key"""
+        base = self.cache.key("# A", "{{ Content }}", "/", "minify=False")
+        self.assertEqual(base, self.cache.key("# A", "{{ Content }}", "/", "minify=False"))
+        self.assertNotEqual(base, self.cache.key("# B", "{{ Content }}", "/", "minify=False"))
+        self.assertNotEqual(base, self.cache.key("# A", "<b>{{ Content }}</b>", "/", "minify=False"))
+        self.assertNotEqual(base, self.cache.key("# A", "{{ Content }}", "/blog/", "minify=False"))
+        self.assertNotEqual(base, self.cache.key("# A", "{{ Content }}", "/", "minify=True"))
+
+    def test_round_trip(self):
+        """Test that a stored page comes back with its metadata"""
+        key = self.cache.key("# Héllo", "{{ Content }}", "/")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, "<h1>Héllo</h1>\n<p>x</p>", {"title": "Héllo", "bytes_saved": 3})
+        self.assertEqual(self.cache.get(key), ("<h1>Héllo</h1>\n<p>x</p>", {"title": "Héllo", "bytes_saved": 3}))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used pages are evicted first"""
+        keys = [self.cache.key(str(i), "", "/") for i in range(3)]
+        for i, key in enumerate(keys):
+            self.cache.put(key, "x" * 1000, {"title": str(i)})
+            os.utime(self.cache._path(key), (time.time() - 100 + i, time.time() - 100 + i))
+
+        # Reading the oldest entry makes it the most recently used
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.cache.max_bytes = 2100
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+
+
+class TestCachedGeneration(unittest.TestCase):
+    def test_second_build_reuses_pages(self):
+        """Test that a rebuild from an identical tree copies pages from the cache"""
+        with tempfile.TemporaryDirectory() as tmp:
+            content_dir = os.path.join(tmp, "content")
+            os.makedirs(content_dir)
+            template_path = os.path.join(tmp, "template.html")
+            with open(template_path, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+            with open(os.path.join(content_dir, "index.md"), "w") as f:
+                f.write("# Home\n\nWelcome")
+
+            cache = BuildCache(os.path.join(tmp, "cache"))
+            first = generate_pages_recursive(content_dir, template_path, os.path.join(tmp, "a"),
+                                             context=SiteContext(), page_cache=cache)
+            second = generate_pages_recursive(content_dir, template_path, os.path.join(tmp, "b"),
+                                              context=SiteContext(), page_cache=cache)
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+            self.assertEqual(second[0].title, first[0].title)
+            with open(os.path.join(tmp, "a", "index.html")) as a, open(os.path.join(tmp, "b", "index.html")) as b:
+                self.assertEqual(a.read(), b.read())
+
+            # A site setting that changes the HTML must not reuse the page
+            generate_pages_recursive(content_dir, template_path, os.path.join(tmp, "c"),
+                                     context=SiteContext(image_attributes=True), page_cache=cache)
+            self.assertEqual(cache.misses, 2)
+
+    def test_location_in_key(self):
+        """Test that identical sources at different depths are rendered separately, and warnings replayed"""
+        with tempfile.TemporaryDirectory() as tmp:
+            content_dir = os.path.join(tmp, "content")
+            os.makedirs(os.path.join(content_dir, "blog"))
+            template_path = os.path.join(tmp, "template.html")
+            with open(template_path, "w") as f:
+                f.write("{{ Content }}")
+            for name, text in [("a.md", "# A\n\n[Tom](tom.md)"), ("blog/a.md", "# A\n\n[Tom](tom.md)"),
+                               ("blog/tom.md", "# Tom")]:
+                with open(os.path.join(content_dir, name), "w") as f:
+                    f.write(text)
+
+            cache = BuildCache(os.path.join(tmp, "cache"))
+            outputs = []
+            for dest in ("a", "b"):
+                output = io.StringIO()
+                with redirect_stdout(output):
+                    generate_pages_recursive(content_dir, template_path, os.path.join(tmp, dest),
+                                             context=SiteContext(), page_cache=cache)
+                outputs.append(output.getvalue())
+            self.assertEqual((cache.hits, cache.misses), (3, 3))
+            with open(os.path.join(tmp, "b", "blog", "a", "index.html")) as f:
+                self.assertIn('href="/blog/tom"', f.read())
+            with open(os.path.join(tmp, "b", "a", "index.html")) as f:
+                self.assertIn('href="tom.md"', f.read())
+            for output in outputs:
+                self.assertEqual(output.count("link target tom.md does not match any page"), 1)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import os
+import shutil
+import subprocess
+import tempfile
+
+from src.changes import detect_changes, git_changed_files, git_head
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+@unittest.skipUnless(shutil.which("git"), "git is not installed")
+class TestGitChanges(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.realpath(self.tmp.name)
+        self.content = os.path.join(self.root, "content")
+        write(os.path.join(self.content, "index.md"), "# Home")
+        write(os.path.join(self.content, "blog", "post.md"), "# Post")
+        self.git("init", "-q")
+        self.commit()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def git(self, *args):
+        subprocess.run(["git", "-C", self.root, "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                       check=True, capture_output=True)
+
+    def commit(self):
+        self.git("add", "-A")
+        self.git("commit", "-q", "--allow-empty", "-m", "change")
+
+    def test_changed_since_commit(self):
+        """Test that committed, modified, deleted and untracked files are all reported"""
+        base = git_head(self.root)
+        write(os.path.join(self.content, "index.md"), "# Home 2")
+        self.commit()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        write(os.path.join(self.content, "new.md"), "# New")
+        write(os.path.join(self.root, "elsewhere.txt"), "x")
+
+        self.assertEqual(git_changed_files(self.root, base, [self.content]), {
+            os.path.join(self.content, "index.md"),
+            os.path.join(self.content, "blog", "post.md"),
+            os.path.join(self.content, "new.md"),
+        })
+
+    def test_ignored_files_fall_back(self):
+        """Test that git refuses to answer for sources it ignores"""
+        write(os.path.join(self.root, ".gitignore"), "*.tmp.md\n")
+        write(os.path.join(self.content, "draft.tmp.md"), "# Draft")
+        self.assertIsNone(git_changed_files(self.root, git_head(self.root), [self.content]))
+
+    def test_detect_changes_between_builds(self):
+        """Test the first build, a clean rebuild, and a file reverted after a dirty build"""
+        changed, state = detect_changes(self.root, [self.content], {})
+        self.assertIsNone(changed)
+
+        changed, state = detect_changes(self.root, [self.content], state)
+        self.assertEqual(changed, set())
+
+        # Build while index.md is dirty, then revert it: it still needs a rebuild
+        index = os.path.join(self.content, "index.md")
+        write(index, "# Dirty")
+        changed, state = detect_changes(self.root, [self.content], state)
+        self.assertEqual(changed, {index})
+        self.git("checkout", "-q", "--", index)
+        changed, state = detect_changes(self.root, [self.content], state)
+        self.assertEqual(changed, {index})
+
+        changed, state = detect_changes(self.root, [self.content], state)
+        self.assertEqual(changed, set())
+
+
+class TestScanFallback(unittest.TestCase):
+    def test_scan_outside_git(self):
+        """Test the stat/hash fallback when the sources are not in a git checkout"""
+        with tempfile.TemporaryDirectory() as tmp:
+            root = os.path.realpath(tmp)
+            page = os.path.join(root, "content", "index.md")
+            other = os.path.join(root, "content", "other.md")
+            write(page, "# Home")
+            write(other, "# Other")
+
+            changed, state = detect_changes(root, [os.path.join(root, "content")], {"commit": "abc"})
+            self.assertIsNone(changed)
+            self.assertIn(page, state["files"])
+
+            write(page, "# Home, edited")
+            os.remove(other)
+            changed, state = detect_changes(root, [os.path.join(root, "content")], state)
+            self.assertEqual(changed, {page, other})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from src.context import SiteContext
+from src.main import compile_page
+
+
+class TestCompilePage(unittest.TestCase):
+    def test_compiled(self):
+        """Test that the body, title, headings and metadata come from one compile"""
+        html, title, headings, metadata = compile_page("---\ndate: 2024-01-01\n---\n"
+                                                       "Intro\n\n# **Tom** Bombadil\n\n## Songs\n\nText")
+        self.assertEqual(html, '<div><p>Intro</p><h1 id="tom-bombadil"><b>Tom</b> Bombadil</h1>'
+                               '<h2 id="songs">Songs</h2><p>Text</p></div>')
+        self.assertEqual(title, "Tom Bombadil")
+        self.assertEqual(headings, [(1, "tom-bombadil", "Tom Bombadil"), (2, "songs", "Songs")])
+        self.assertEqual(metadata, {"date": "2024-01-01"})
+
+    def test_first_h1_is_title(self):
+        """Test that the first h1 block is the title, and code blocks are not headings"""
+        _, title, _, _ = compile_page("```\n# Not a title\n```\n\n## Part\n\n# Title\n\n# Second")
+        self.assertEqual(title, "Title")
+
+    def test_front_matter_title(self):
+        """Test that a front-matter title doesn't need an h1"""
+        _, title, _, _ = compile_page("---\ntitle: Custom\n---\n## Part")
+        self.assertEqual(title, "Custom")
+
+    def test_missing_title(self):
+        """Test that a page without a title is rejected"""
+        with self.assertRaisesRegex(Exception, "No h1 header found in the markdown"):
+            compile_page("## Only a subheading\n\nText")
+
+    def test_uses_context(self):
+        """Test that the page state is recorded on the given context"""
+        context = SiteContext().page("index.md")
+        compile_page("# Title\n\nSome words here", context)
+        self.assertEqual(context.word_count, 4)
+        self.assertEqual(context.headings, [(1, "title", "Title")])
+
+
+if __name__ == "__main__":
+    unittest.main()
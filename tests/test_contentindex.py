@@ -0,0 +1,71 @@
+import unittest
+import os
+import tempfile
+
+from src.contentindex import ContentIndex
+from src.pageresult import PageResult
+from src.routes import RouteTable
+
+
+class TestContentIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = ContentIndex(os.path.join(self.tmp.name, "cache", "content.db"))
+        self.routes = RouteTable("content", "docs")
+        self.routes.add("index.md")
+        self.routes.add("blog/old.md", {"date": "2023-01-05", "tags": ["tolkien"]})
+        self.routes.add("blog/new.md", {"date": "2024-02-01", "tags": ["tolkien", "essays"]})
+        self.routes.add("blog/undated.md")
+        self.routes.add("blog/draft.md", {"date": "2025-01-01", "draft": True})
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def results(self, **hashes):
+        results = []
+        for route in self.routes:
+            name = os.path.basename(route.source_path)[:-3]
+            results.append(PageResult(route.source_path, route.output_path, name.title(), 100,
+                                      links=[("/", 3)], source_hash=hashes.get(name, "h"), mtime_ns=1))
+        return results
+
+    def test_wal_mode(self):
+        """Test that the database runs in write-ahead-log mode"""
+        self.assertEqual(self.index._db.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_only_changed_rows_written(self):
+        """Test that unchanged pages are not rewritten"""
+        self.assertEqual(self.index.update_pages(self.results(), self.routes), 5)
+        self.assertEqual(self.index.update_pages(self.results(), self.routes), 0)
+        self.assertEqual(self.index.update_pages(self.results(old="h2"), self.routes), 1)
+
+    def test_queries(self):
+        """Test listing by URL prefix and date, by tag, and by link target"""
+        self.index.update_pages(self.results(), self.routes)
+        self.assertEqual([row["url"] for row in self.index.pages("/blog/")],
+                         ["/blog/new", "/blog/old", "/blog/undated"])
+        self.assertEqual(len(self.index.pages("/blog/", include_drafts=True)), 4)
+        self.assertEqual([row["title"] for row in self.index.pages_with_tag("tolkien")], ["New", "Old"])
+        self.assertEqual(len(self.index.pages_linking_to("/")), 5)
+
+    def test_prune(self):
+        """Test that rows of removed pages are deleted"""
+        self.index.update_pages(self.results(), self.routes)
+        routes = RouteTable("content", "docs")
+        routes.add("index.md")
+        self.assertEqual(self.index.prune(routes), 4)
+        self.assertEqual([row["source"] for row in self.index.pages()], ["index.md"])
+        self.assertEqual(self.index.pages_with_tag("tolkien"), [])
+
+    def test_state(self):
+        """Test that build state survives reopening the database"""
+        self.assertEqual(self.index.get_state("incremental", {}), {})
+        self.index.set_state("incremental", {"commit": "abc", "dirty": []})
+        self.index.close()
+        self.index = ContentIndex(self.index.db_path)
+        self.assertEqual(self.index.get_state("incremental"), {"commit": "abc", "dirty": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
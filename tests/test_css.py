@@ -0,0 +1,79 @@
+import unittest
+import hashlib
+import os
+import tempfile
+
+from src.assets import FINGERPRINT_LENGTH
+from src.css import minify_css, optimize_template_css
+
+TEMPLATE = """<head>
+    <link href="/index.css" rel="stylesheet" />
+  </head>"""
+
+
+class TestMinifyCss(unittest.TestCase):
+    def test_whitespace_and_comments(self):
+        """Test that comments and whitespace around punctuation are removed"""
+        css = "/* theme */\nh1,\nh2 {\n  color: #dda15e;\n  border: 1px solid red;\n}\n"
+        self.assertEqual(minify_css(css), "h1,h2{color:#dda15e;border:1px solid red}")
+
+    def test_strings_preserved(self):
+        """Test that whitespace and comment markers inside strings are kept"""
+        css = 'body { font-family: "Luminari  Pro", "a /* b */"; }'
+        self.assertEqual(minify_css(css), 'body{font-family:"Luminari  Pro","a /* b */"}')
+
+    def test_descendant_pseudo_class_space_kept(self):
+        """Test that the descendant combinator before a pseudo-class survives"""
+        self.assertEqual(minify_css("a :hover { color: red; }"), "a :hover{color:red}")
+
+    def test_semicolon_in_string_kept(self):
+        """Test that only the last declaration's semicolon is dropped, never one inside a string"""
+        self.assertEqual(minify_css('a { content: ";}"; }'), 'a{content:";}"}')
+        self.assertEqual(minify_css("a { color: red ; }"), "a{color:red}")
+
+    def test_media_query(self):
+        """Test that media queries stay valid"""
+        css = "@media (max-width: 600px) {\n  body { padding: 0; }\n}"
+        self.assertEqual(minify_css(css), "@media (max-width:600px){body{padding:0}}")
+
+
+class TestOptimizeTemplateCss(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static_dir = os.path.join(self.tmp.name, "static")
+        self.output_dir = os.path.join(self.tmp.name, "docs")
+        os.makedirs(self.static_dir)
+        os.makedirs(self.output_dir)
+        with open(os.path.join(self.static_dir, "index.css"), "w") as f:
+            f.write("body {\n  color: red;\n}\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_small_stylesheet_inlined(self):
+        """Test that a stylesheet under budget replaces the link tag"""
+        html = optimize_template_css(TEMPLATE, self.static_dir, self.output_dir, budget=1024)
+        self.assertIn("<style>body{color:red}</style>", html)
+        self.assertNotIn("<link", html)
+
+    def test_large_stylesheet_preloaded(self):
+        """Test that an oversized stylesheet stays external under a fingerprinted URL with a preload hint"""
+        digest = hashlib.sha256(b"body{color:red}").hexdigest()[:FINGERPRINT_LENGTH]
+        for asset_map in ({}, {"/index.css": "/index.0123456789.css"}):
+            html = optimize_template_css(TEMPLATE, self.static_dir, self.output_dir, budget=5, asset_map=asset_map)
+            self.assertIn(f'<link rel="preload" href="/index.{digest}.css" as="style" />', html)
+            self.assertIn(f'<link href="/index.{digest}.css" rel="stylesheet" />', html)
+            for name in ["index.css", f"index.{digest}.css"] + [url[1:] for url in asset_map.values()]:
+                with open(os.path.join(self.output_dir, name)) as f:
+                    self.assertEqual(f.read(), "body{color:red}")
+
+    def test_relative_urls_not_inlined(self):
+        """Test that stylesheets with relative url() references are kept external"""
+        with open(os.path.join(self.static_dir, "index.css"), "w") as f:
+            f.write("body { background: url(images/bg.png); }")
+        html = optimize_template_css(TEMPLATE, self.static_dir, self.output_dir, budget=1024)
+        self.assertNotIn("<style>", html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import unittest
+import io
+import os
+import tempfile
+from contextlib import redirect_stdout
+from xml.etree import ElementTree
+
+from src.contentindex import ContentIndex
+from src.feeds import absolute_url, atom_date, generate_feeds, generate_sitemap, parse_site_url, write_sitemap
+from src.pageresult import PageResult
+from src.routes import RouteTable
+
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
+
+class TestUrls(unittest.TestCase):
+    def test_parse_site_url(self):
+        """Test that the site URL must be absolute and loses its trailing slash"""
+        self.assertEqual(parse_site_url("https://example.com/"), "https://example.com")
+        with self.assertRaises(ValueError):
+            parse_site_url("example.com")
+
+    def test_absolute_url(self):
+        """Test that pages get their directory form and files keep their name"""
+        base = "https://example.com/site/"
+        self.assertEqual(absolute_url(base, "/"), base)
+        self.assertEqual(absolute_url(base, "/blog/tom"), base + "blog/tom/")
+        self.assertEqual(absolute_url(base, "/blog/feed.xml"), base + "blog/feed.xml")
+
+    def test_atom_date(self):
+        """Test that dates and timestamps become RFC 3339 and anything else is rejected"""
+        self.assertEqual(atom_date("2024-01-02"), "2024-01-02T00:00:00Z")
+        self.assertEqual(atom_date("2024-01-02 10:30"), "2024-01-02T10:30:00Z")
+        self.assertEqual(atom_date("2024-01-02T10:30:00Z"), "2024-01-02T10:30:00Z")
+        self.assertEqual(atom_date("2024-01-02T10:30:00+02:00"), "2024-01-02T10:30:00+02:00")
+        with self.assertRaises(ValueError):
+            atom_date("January 2nd")
+
+
+class TestSitemap(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def parse(self, name):
+        return ElementTree.parse(os.path.join(self.dest, name)).getroot()
+
+    def test_single_file(self):
+        """Test that a small site gets one sitemap with escaped URLs"""
+        files = write_sitemap([("https://example.com/a&b/", "2024-01-01"), ("https://example.com/", None)],
+                              self.dest, "https://example.com/")
+        self.assertEqual(files, ["sitemap.xml"])
+        urls = self.parse("sitemap.xml").findall(f"{SITEMAP_NS}url")
+        self.assertEqual(urls[0].find(f"{SITEMAP_NS}loc").text, "https://example.com/a&b/")
+        self.assertEqual(urls[0].find(f"{SITEMAP_NS}lastmod").text, "2024-01-01")
+        self.assertIsNone(urls[1].find(f"{SITEMAP_NS}lastmod"))
+
+    def test_split(self):
+        """Test that sitemaps over the limit are split behind an index, and old parts removed"""
+        entries = [(f"https://example.com/{i}/", None) for i in range(5)]
+        files = write_sitemap(iter(entries), self.dest, "https://example.com/", max_urls=2)
+        self.assertEqual(files, ["sitemap.xml", "sitemap-1.xml", "sitemap-2.xml", "sitemap-3.xml"])
+        index = self.parse("sitemap.xml")
+        self.assertEqual(index.tag, f"{SITEMAP_NS}sitemapindex")
+        self.assertEqual([loc.text for loc in index.iter(f"{SITEMAP_NS}loc")],
+                         [f"https://example.com/sitemap-{i}.xml" for i in (1, 2, 3)])
+        self.assertEqual(len(self.parse("sitemap-3.xml").findall(f"{SITEMAP_NS}url")), 1)
+
+        write_sitemap(entries[:2], self.dest, "https://example.com/", max_urls=2)
+        self.assertEqual(sorted(os.listdir(self.dest)), ["sitemap.xml"])
+
+    def test_skipped_when_unchanged(self):
+        """Test that the sitemap is only rewritten when a route changed"""
+        index = ContentIndex(os.path.join(self.dest, "cache", "content.db"))
+        routes = RouteTable("content", self.dest)
+        routes.add("index.md")
+        routes.add("blog/tom.md", {"date": "2024-01-01"})
+        with redirect_stdout(io.StringIO()):
+            self.assertTrue(generate_sitemap(routes, ["/blog"], index, self.dest, "https://example.com/"))
+            self.assertFalse(generate_sitemap(routes, ["/blog"], index, self.dest, "https://example.com/"))
+            routes.add("about.md")
+            self.assertTrue(generate_sitemap(routes, ["/blog"], index, self.dest, "https://example.com/"))
+        index.close()
+        self.assertEqual([loc.text for loc in self.parse("sitemap.xml").iter(f"{SITEMAP_NS}loc")],
+                         ["https://example.com/", "https://example.com/blog/tom/",
+                          "https://example.com/about/", "https://example.com/blog/"])
+
+
+class TestFeeds(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.index = ContentIndex(os.path.join(self.tmp.name, "content.db"))
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def build(self, directories, posts, max_entries=20, author=None):
+        routes = RouteTable("content", self.dest)
+        results = []
+        for name, metadata in posts:
+            route = routes.add(f"blog/{name}.md", metadata)
+            results.append(PageResult(route.source_path, route.output_path, name.title(), 0))
+        self.index.update_pages(results, routes)
+        self.index.prune(routes)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            urls = generate_feeds(directories, self.index, self.dest, "https://example.com/", max_entries,
+                                  author=author)
+        return urls, output.getvalue()
+
+    def test_feed(self):
+        """Test the newest dated posts and their metadata"""
+        posts = [("old", {"date": "2023-05-01"}), ("new", {"date": "2024-02-01", "summary": "A <new> post"}),
+                 ("undated", {}), ("middle", {"date": "2023-09-01"})]
+        urls, _ = self.build(["blog"], posts, max_entries=2)
+        self.assertEqual(urls, ["/blog/feed.xml"])
+
+        feed = ElementTree.parse(os.path.join(self.dest, "blog", "feed.xml")).getroot()
+        self.assertEqual(feed.find(f"{ATOM_NS}title").text, "Blog")
+        self.assertEqual(feed.find(f"{ATOM_NS}updated").text, "2024-02-01T00:00:00Z")
+        entries = feed.findall(f"{ATOM_NS}entry")
+        self.assertEqual([entry.find(f"{ATOM_NS}id").text for entry in entries],
+                         ["https://example.com/blog/new/", "https://example.com/blog/middle/"])
+        self.assertEqual(entries[0].find(f"{ATOM_NS}summary").text, "A <new> post")
+
+    def test_authors(self):
+        """Test that the feed names the site author and posts may name their own"""
+        posts = [("tom", {"date": "2024-01-01", "author": "Tom"}), ("goldberry", {"date": "2024-01-02"})]
+        self.build(["blog"], posts)
+        feed = ElementTree.parse(os.path.join(self.dest, "blog", "feed.xml")).getroot()
+        self.assertEqual(feed.find(f"{ATOM_NS}author/{ATOM_NS}name").text, "example.com")
+        entries = feed.findall(f"{ATOM_NS}entry")
+        self.assertIsNone(entries[0].find(f"{ATOM_NS}author"))
+        self.assertEqual(entries[1].find(f"{ATOM_NS}author/{ATOM_NS}name").text, "Tom")
+
+        self.build(["blog"], posts, author="Bombadil & Co")
+        feed = ElementTree.parse(os.path.join(self.dest, "blog", "feed.xml")).getroot()
+        self.assertEqual(feed.find(f"{ATOM_NS}author/{ATOM_NS}name").text, "Bombadil & Co")
+
+    def test_invalid_date(self):
+        """Test that a date a feed reader couldn't parse fails with the post's URL"""
+        with self.assertRaisesRegex(ValueError, "/blog/tom.*yesterday"):
+            self.build(["blog"], [("tom", {"date": "yesterday"})])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "feed.xml")))
+
+    def test_skipped_when_unchanged_and_removed(self):
+        """Test that unchanged feeds are not rewritten and unlisted feeds are deleted"""
+        posts = [("tom", {"date": "2024-01-01"})]
+        _, output = self.build(["blog"], posts)
+        self.assertIn("Writing feed /blog/feed.xml", output)
+        _, output = self.build(["blog"], posts)
+        self.assertEqual(output, "")
+
+        _, output = self.build([], posts)
+        self.assertIn("Deleted feed /blog/feed.xml", output)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "feed.xml")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import os
+import tempfile
+
+from src.frontmatter import read_front_matter, split_front_matter
+from src.main import markdown_to_blocks_with_lines, render_page
+from src.routes import build_route_table
+
+
+POST = """---
+title: "Tom Bombadil: a mistake?"
+date: 2024-03-01
+tags: [tolkien, essays]
+draft: false
+---
+# Why Tom Bombadil Was a Mistake
+
+Body text.
+"""
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_split(self):
+        """Test that values are parsed and the body keeps its line numbers"""
+        metadata, body = split_front_matter(POST)
+        self.assertEqual(metadata, {
+            "title": "Tom Bombadil: a mistake?", "date": "2024-03-01",
+            "tags": ["tolkien", "essays"], "draft": False,
+        })
+        self.assertEqual(markdown_to_blocks_with_lines(body),
+                         [("# Why Tom Bombadil Was a Mistake", 7), ("Body text.", 9)])
+
+    def test_no_front_matter(self):
+        """Test that documents without a header are unchanged"""
+        self.assertEqual(split_front_matter("# Title\n\n---"), ({}, "# Title\n\n---"))
+
+    def test_invalid(self):
+        """Test that unclosed blocks and malformed lines are errors"""
+        with self.assertRaises(ValueError):
+            split_front_matter("---\ntitle: x\n# Title")
+        with self.assertRaises(ValueError):
+            split_front_matter("---\nnot a pair\n---\n# Title")
+
+    def test_error_names_file(self):
+        """Test that errors name the source file when it is known"""
+        with self.assertRaisesRegex(ValueError, r"in content/post\.md is not closed"):
+            split_front_matter("---\ntitle: x\n# Title", "content/post.md")
+        with self.assertRaisesRegex(ValueError, r"line in content/post\.md: not a pair"):
+            split_front_matter("---\nnot a pair\n---\n# Title", "content/post.md")
+
+    def test_read_header_only(self):
+        """Test that reading stops at the closing delimiter"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "post.md")
+            with open(path, "wb") as f:
+                # The body is not valid UTF-8, so reading it would fail
+                f.write(POST.encode("utf-8") + b"\xff\xfe" * 1000)
+            self.assertEqual(read_front_matter(path)["date"], "2024-03-01")
+
+    def test_title_from_front_matter(self):
+        """Test that the front-matter title is used and the header is not rendered"""
+        html, title, _ = render_page("---\ntitle: Custom\n---\n# Heading", "<title>{{ Title }}</title>{{ Content }}")
+        self.assertEqual(title, "Custom")
+        self.assertEqual(html, '<title>Custom</title><div><h1 id="heading">Heading</h1></div>')
+
+    def test_drafts_skipped(self):
+        """Test that drafts are left out of the route table unless requested"""
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, header in (("index.md", ""), ("draft.md", "---\ndraft: true\n---\n")):
+                with open(os.path.join(tmp, name), "w") as f:
+                    f.write(header + "# Page")
+
+            self.assertEqual([route.url for route in build_route_table(tmp, "out", include_drafts=False)], ["/"])
+            routes = build_route_table(tmp, "out")
+            self.assertEqual([route.url for route in routes], ["/draft", "/"])
+            self.assertEqual(routes.for_url("/draft").metadata, {"draft": True})
+
+
+if __name__ == "__main__":
+    unittest.main()
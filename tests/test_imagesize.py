@@ -0,0 +1,89 @@
+import unittest
+import os
+import struct
+import tempfile
+
+from src.imagesize import read_image_size
+from src.context import SiteContext
+from src.main import markdown_to_html_node
+
+STATIC_IMAGES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "images")
+
+
+class TestReadImageSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_png(self):
+        """Test reading the size of a real PNG from static/"""
+        self.assertEqual(read_image_size(os.path.join(STATIC_IMAGES, "tolkien.png")), (1026, 388))
+
+    def test_gif(self):
+        """Test reading the logical screen size of a GIF"""
+        path = self._write("a.gif", b"GIF89a" + struct.pack("<HH", 320, 200) + b"\x00" * 10)
+        self.assertEqual(read_image_size(path), (320, 200))
+
+    def test_jpeg_skips_segments_before_frame(self):
+        """Test that APP segments are skipped until the SOF marker"""
+        app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+        sof2 = b"\xff\xc2" + struct.pack(">H", 17) + b"\x08" + struct.pack(">HH", 480, 640) + b"\x03" + b"\x00" * 9
+        path = self._write("a.jpg", b"\xff\xd8" + app0 + b"\xff" + sof2)
+        self.assertEqual(read_image_size(path), (640, 480))
+
+    def test_unknown_format(self):
+        """Test that unrecognized files return None"""
+        path = self._write("a.bin", b"not an image at all")
+        self.assertIsNone(read_image_size(path))
+
+    def test_truncated_jpeg(self):
+        """Test that a JPEG without a frame header returns None"""
+        path = self._write("b.jpg", b"\xff\xd8\xff\xe0\x00")
+        self.assertIsNone(read_image_size(path))
+
+
+class TestImageAttributes(unittest.TestCase):
+    asset_index = {
+        "/images/tolkien.png": {"width": 1026, "height": 388},
+        "/images/tom.png": {"width": 928, "height": 468},
+    }
+
+    def test_dimensions_and_lazy_loading(self):
+        """Test that only images after the first are lazy-loaded"""
+        site = SiteContext(asset_index=self.asset_index, image_attributes=True)
+        html = markdown_to_html_node(
+            "![Tolkien](/images/tolkien.png)\n\n![Tom](/images/tom.png)", site.page()
+        ).to_html()
+        self.assertIn('<img src="/images/tolkien.png" alt="Tolkien" width="1026" height="388" decoding="async">', html)
+        self.assertIn('<img src="/images/tom.png" alt="Tom" width="928" height="468" loading="lazy" decoding="async">', html)
+
+    def test_unknown_image_has_no_dimensions(self):
+        """Test that external images only get the loading hints"""
+        site = SiteContext(asset_index=self.asset_index, image_attributes=True)
+        html = markdown_to_html_node("![x](https://example.com/x.png)", site.page()).to_html()
+        self.assertIn('<img src="https://example.com/x.png" alt="x" decoding="async">', html)
+
+    def test_first_image_is_per_page(self):
+        """Test that every page gets its own eager first image"""
+        site = SiteContext(asset_index=self.asset_index, image_attributes=True)
+        markdown_to_html_node("![Tom](/images/tom.png)", site.page())
+        html = markdown_to_html_node("![Tom](/images/tom.png)", site.page()).to_html()
+        self.assertNotIn("lazy", html)
+
+    def test_disabled_by_default(self):
+        """Test that images are unchanged unless image attributes are enabled"""
+        site = SiteContext(asset_index=self.asset_index)
+        html = markdown_to_html_node("![Tom](/images/tom.png)", site.page()).to_html()
+        self.assertIn('<img src="/images/tom.png" alt="Tom"></img>', html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import base64
+import os
+import tempfile
+
+from src.assets import build_asset_index
+from src.context import SiteContext
+from src.main import markdown_to_html_node
+
+
+class TestInlineAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static_dir = os.path.join(self.tmp.name, "static")
+        os.makedirs(os.path.join(self.static_dir, "images"))
+        self.icon = b"GIF89a\x02\x00\x02\x00" + b"\x00" * 20
+        self._write("images/icon.gif", self.icon)
+        self._write("images/photo.gif", b"GIF89a\x10\x00\x10\x00" + b"\x00" * 5000)
+        self.index = build_asset_index(self.static_dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, rel_path, data):
+        with open(os.path.join(self.static_dir, rel_path), "wb") as f:
+            f.write(data)
+
+    def test_small_image_inlined(self):
+        """Test that images below the threshold become data URIs"""
+        site = SiteContext(asset_index=self.index, inline_threshold=1024)
+        html = markdown_to_html_node("![icon](/images/icon.gif)", site.page()).to_html()
+        expected = "data:image/gif;base64," + base64.b64encode(self.icon).decode("ascii")
+        self.assertIn(f'<img src="{expected}" alt="icon">', html)
+
+    def test_large_image_not_inlined(self):
+        """Test that images at or above the threshold keep their URL"""
+        site = SiteContext(asset_index=self.index, inline_threshold=1024)
+        html = markdown_to_html_node("![photo](/images/photo.gif)", site.page()).to_html()
+        self.assertIn('src="/images/photo.gif"', html)
+
+    def test_disabled_by_default(self):
+        """Test that nothing is inlined without a threshold"""
+        site = SiteContext(asset_index=self.index)
+        html = markdown_to_html_node("![icon](/images/icon.gif)", site.page()).to_html()
+        self.assertIn('src="/images/icon.gif"', html)
+
+    def test_encoded_once_per_build(self):
+        """Test that the file is read only once even when many pages use it"""
+        site = SiteContext(asset_index=self.index, inline_threshold=1024)
+        first = site.data_uri("/images/icon.gif")
+        # If the cache works, removing the file must not matter any more
+        os.remove(os.path.join(self.static_dir, "images", "icon.gif"))
+        for _ in range(100):
+            markdown_to_html_node("![icon](/images/icon.gif)", site.page())
+        self.assertEqual(site.data_uri("/images/icon.gif"), first)
+
+    def test_inlined_image_keeps_dimensions(self):
+        """Test that inlined images still get width and height"""
+        site = SiteContext(asset_index=self.index, inline_threshold=1024, image_attributes=True)
+        html = markdown_to_html_node("![icon](/images/icon.gif)", site.page()).to_html()
+        self.assertIn('width="2" height="2"', html)
+
+
+if __name__ == "__main__":
+    unittest.main()
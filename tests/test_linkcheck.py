@@ -0,0 +1,91 @@
+import unittest
+import os
+import tempfile
+
+from src.linkcheck import check_links, is_internal_url
+from src.context import SiteContext
+from src.main import generate_pages_recursive, markdown_to_blocks_with_lines, markdown_to_html_node
+from src.pageresult import PageResult
+from src.routes import RouteTable
+
+
+class TestIsInternalUrl(unittest.TestCase):
+    def test_internal(self):
+        """Test root-relative and relative URLs"""
+        for url in ("/", "/blog/tom", "images/x.png", "../tom", "/a:b"):
+            self.assertTrue(is_internal_url(url), url)
+
+    def test_external(self):
+        """Test URLs with a scheme or host, anchors and data URIs"""
+        for url in ("https://example.com", "mailto:me@example.com", "//cdn.example.com/x.js",
+                    "#top", "data:image/png;base64,AAAA", ""):
+            self.assertFalse(is_internal_url(url), url)
+
+
+class TestLineNumbers(unittest.TestCase):
+    def test_block_lines(self):
+        """Test that blocks keep the line they start on"""
+        markdown = "# Title\n\nFirst\nparagraph\n\n\n\n  Second\n\n- a\n- b\n"
+        self.assertEqual(markdown_to_blocks_with_lines(markdown),
+                         [("# Title", 1), ("First\nparagraph", 3), ("Second", 8), ("- a\n- b", 10)])
+
+    def test_links_recorded(self):
+        """Test that links and images are recorded with their line while rendering"""
+        page = SiteContext().page("index.md")
+        markdown_to_html_node("# T\n\n[a](/a) [b](https://b.example)\n\n- ![c](/c.png)", page)
+        self.assertEqual(page.links, [("/a", 3), ("/c.png", 5)])
+
+    def test_links_within_block(self):
+        """Test that links further down a block get their own line"""
+        page = SiteContext().page("index.md")
+        markdown = "Intro [a](/a)\nthen ![a](/a)\nand [a](/a)\n\n- one\n- [b](/b)\n\n> quote\n> [c](/c)"
+        markdown_to_html_node(markdown, page)
+        self.assertEqual(page.links, [("/a", 1), ("/a", 2), ("/a", 3), ("/b", 6), ("/c", 9)])
+
+
+class TestCheckLinks(unittest.TestCase):
+    def setUp(self):
+        self.routes = RouteTable("content", "docs")
+        for rel_path in ("index.md", "blog/tom/index.md", "blog/majesty/index.md"):
+            self.routes.add(rel_path)
+
+    def check(self, source, links):
+        result = PageResult(os.path.join("content", source), "out", "T", 0, links=links)
+        return check_links([result], self.routes, {"/images/tom.png", "/index.css"})
+
+    def test_valid_links(self):
+        """Test that pages, page variants, assets and relative links are accepted"""
+        links = [("/", 1), ("/blog/tom", 2), ("/blog/tom/", 3), ("/blog/tom/index.html#x", 4),
+                 ("/images/tom.png", 5), ("../majesty", 6), ("../../index.css?v=1", 7)]
+        self.assertEqual(self.check("blog/tom/index.md", links), [])
+
+    def test_broken_links(self):
+        """Test that missing targets are reported with source and line"""
+        broken = self.check("index.md", [("/blog/glorfindel", 13), ("images/tom.png", 3), ("/blog", 4)])
+        self.assertEqual(broken, [
+            (os.path.join("content", "index.md"), 13, "/blog/glorfindel"),
+            (os.path.join("content", "index.md"), 4, "/blog"),
+        ])
+
+    def test_generated_site(self):
+        """Test the checker on results from a real build"""
+        with tempfile.TemporaryDirectory() as tmp:
+            content_dir = os.path.join(tmp, "content")
+            os.makedirs(content_dir)
+            template_path = os.path.join(tmp, "template.html")
+            with open(template_path, "w") as f:
+                f.write("{{ Content }}")
+            with open(os.path.join(content_dir, "index.md"), "w") as f:
+                f.write("# Home\n\n[About](/about)\n\n[Gone](/gone)")
+            with open(os.path.join(content_dir, "about.md"), "w") as f:
+                f.write("# About\n\n[Home](/)")
+
+            context = SiteContext()
+            results = generate_pages_recursive(content_dir, template_path, os.path.join(tmp, "docs"),
+                                               context=context)
+            broken = check_links(results, context.routes, set())
+            self.assertEqual(broken, [(os.path.join(content_dir, "index.md"), 5, "/gone")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import io
+import os
+import tempfile
+from contextlib import redirect_stdout
+
+from src.contentindex import ContentIndex
+from src.listing import listing_html_node, listing_url, paginate, parse_page_size
+from src.main import generate_listings
+from src.pageresult import PageResult
+from src.routes import RouteTable
+
+
+class TestListingHelpers(unittest.TestCase):
+    def test_listing_url(self):
+        """Test the URLs of the first and later pages"""
+        self.assertEqual(listing_url("/blog", 1), "/blog")
+        self.assertEqual(listing_url("/blog", 3), "/blog/page/3")
+
+    def test_paginate(self):
+        """Test that entries are split into pages of the given size"""
+        self.assertEqual(paginate([1, 2, 3, 4, 5], 2), [[1, 2], [3, 4], [5]])
+        self.assertEqual(paginate([], 10), [[]])
+        with self.assertRaises(ValueError):
+            paginate([1], 0)
+
+    def test_parse_page_size(self):
+        """Test that the page size option must be a positive integer"""
+        self.assertEqual(parse_page_size("10"), 10)
+        for value in ["0", "-2", "ten"]:
+            with self.assertRaises(ValueError):
+                parse_page_size(value)
+
+    def test_html(self):
+        """Test the list entries and the pagination links"""
+        entries = [{"url": "/blog/a", "title": "A", "date": "2024-01-02", "summary": "About A"},
+                   {"url": "/blog/b", "title": "B", "date": None, "summary": None}]
+        html = listing_html_node("Blog - Page 2", entries, "/blog", 2, 3).to_html()
+        self.assertEqual(html, '<div><h1>Blog - Page 2</h1><ul class="listing">'
+                               '<li><a href="/blog/a">A</a> <time datetime="2024-01-02">2024-01-02</time>'
+                               '<p>About A</p></li><li><a href="/blog/b">B</a></li></ul>'
+                               '<nav class="pagination"><a href="/blog" rel="prev">Newer posts</a>'
+                               '<a href="/blog/page/3" rel="next">Older posts</a></nav></div>')
+
+
+class TestGenerateListings(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.index = ContentIndex(os.path.join(self.tmp.name, "content.db"))
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def build(self, posts):
+        routes = RouteTable("content", self.dest)
+        routes.add("index.md")
+        results = [PageResult(os.path.join("content", "index.md"), "", "Home", 0)]
+        for name, date in posts:
+            route = routes.add(f"blog/{name}.md", {"date": date})
+            results.append(PageResult(route.source_path, route.output_path, name.title(), 0))
+        self.index.update_pages(results, routes)
+        self.index.prune(routes)
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            urls = generate_listings(["blog"], self.index, "<title>{{ Title }}</title>{{ Content }}",
+                                     self.dest, routes, page_size=2)
+        return urls, [line for line in output.getvalue().splitlines() if line.startswith("Generating listing page")]
+
+    def read(self, *parts):
+        with open(os.path.join(self.dest, *parts, "index.html")) as f:
+            return f.read()
+
+    def test_sorted_and_paginated(self):
+        """Test that posts are listed newest first across pages"""
+        urls, _ = self.build([("a", "2024-01-01"), ("b", "2024-03-01"), ("c", "2024-02-01")])
+        self.assertEqual(urls, ["/blog", "/blog/page/2"])
+        first = self.read("blog")
+        self.assertIn("<title>Blog</title>", first)
+        self.assertLess(first.index(">B<"), first.index(">C<"))
+        self.assertIn(">A<", self.read("blog", "page", "2"))
+
+    def test_only_changed_pages_regenerated(self):
+        """Test that a metadata change rewrites only the listing pages it appears on"""
+        posts = [("a", "2024-01-01"), ("b", "2024-03-01"), ("c", "2024-02-01")]
+        self.build(posts)
+        _, generated = self.build(posts)
+        self.assertEqual(generated, [])
+
+        # Post a is alone on page 2; changing its date keeps it there
+        _, generated = self.build([("a", "2024-01-15")] + posts[1:])
+        self.assertEqual(generated, ["Generating listing page /blog/page/2"])
+
+    def test_removed_pages_deleted(self):
+        """Test that listing pages beyond the new page count are removed"""
+        self.build([("a", "2024-01-01"), ("b", "2024-03-01"), ("c", "2024-02-01")])
+        urls, _ = self.build([("a", "2024-01-01")])
+        self.assertEqual(urls, ["/blog"])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "page", "2", "index.html")))
+
+    def test_conflict_with_content_page(self):
+        """Test that a listing may not replace an existing page"""
+        routes = RouteTable("content", self.dest)
+        routes.add("blog/index.md")
+        with self.assertRaises(ValueError), redirect_stdout(io.StringIO()):
+            generate_listings(["blog"], self.index, "{{ Content }}", self.dest, routes)
+
+    def test_conflict_with_later_page(self):
+        """Test that pages after the first may not replace an existing page either"""
+        routes = RouteTable("content", self.dest)
+        results = []
+        for name in ("a", "b", "c"):
+            route = routes.add(f"blog/{name}.md", {"date": "2024-01-01"})
+            results.append(PageResult(route.source_path, route.output_path, name, 0))
+        routes.add("blog/page/2.md")
+        self.index.update_pages(results, routes)
+        with self.assertRaisesRegex(ValueError, "2.md"), redirect_stdout(io.StringIO()):
+            generate_listings(["blog"], self.index, "{{ Content }}", self.dest, routes, page_size=2)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
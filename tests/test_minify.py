@@ -0,0 +1,67 @@
+import unittest
+
+from src.minify import minify_html
+from src.main import markdown_to_html_node
+
+
+class TestMinifyHtml(unittest.TestCase):
+    def test_template_whitespace_removed(self):
+        """Test that indentation between block-level tags is dropped"""
+        html = """<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <title>Hi</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article><p>Text</p></article>
+  </body>
+</html>"""
+        self.assertEqual(
+            minify_html(html),
+            "<!doctype html><html><head><meta charset=utf-8><title>Hi</title>"
+            '<link href=/index.css rel=stylesheet></head><body><article><p>Text</p></article></body></html>',
+        )
+
+    def test_comments_removed(self):
+        """Test that comments are removed but conditional comments kept"""
+        html = "<p>a<!-- note -->b</p><!--[if IE]><p>old</p><![endif]-->"
+        self.assertEqual(minify_html(html), "<p>ab</p><!--[if IE]><p>old</p><![endif]-->")
+
+    def test_inline_whitespace_collapsed_not_removed(self):
+        """Test that whitespace between inline elements still separates words"""
+        html = "<p>This   is\n  <b>bold</b>   and <i>italic</i> </p>"
+        self.assertEqual(minify_html(html), "<p>This is <b>bold</b> and <i>italic</i></p>")
+
+    def test_pre_and_code_preserved(self):
+        """Test that <pre>/<code> content is copied exactly"""
+        html = "<div>\n  <pre><code>func main(){\n    fmt.Println(\"Hi\")\n}\n</code></pre>\n  <p>Use <code>a   b</code> here</p>\n</div>"
+        self.assertEqual(
+            minify_html(html),
+            "<div><pre><code>func main(){\n    fmt.Println(\"Hi\")\n}\n</code></pre>"
+            "<p>Use <code>a   b</code> here</p></div>",
+        )
+
+    def test_attribute_quotes(self):
+        """Test that quotes are only removed where it is safe"""
+        html = '<img src="/images/tom.png" alt="Tom Bombadil"><a href="/">x</a><img alt="">'
+        self.assertEqual(
+            minify_html(html),
+            '<img src=/images/tom.png alt="Tom Bombadil"><a href="/">x</a><img alt>',
+        )
+
+    def test_self_closing_svg_kept(self):
+        """Test that self-closing non-void elements keep their slash"""
+        html = '<svg><path d="M0 0" fill="red" /></svg>'
+        self.assertEqual(minify_html(html), '<svg><path d="M0 0" fill="red"/></svg>')
+
+    def test_rendered_markdown_unchanged_semantics(self):
+        """Test that renderer output, which has no insignificant whitespace, is left intact"""
+        markdown = "# Title\n\nSome **bold** text\n\n```\ncode  block\n```"
+        html = markdown_to_html_node(markdown).to_html()
+        self.assertEqual(minify_html(html), html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from src.context import SiteContext
+from src.main import markdown_to_html_node, markdown_to_html_node_parallel
+
+
+def build_document(sections):
+    parts = []
+    for i in range(sections):
+        parts.append(f"## Section {i}")
+        parts.append(f"Paragraph {i} with **bold**, _italic_ and a [link](/blog/{i}).")
+        parts.append(f"- item {i}\n- another item")
+        parts.append(f"```\ncode {i}\n```")
+    return "\n\n".join(parts)
+
+
+class TestParallelBlocks(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(max_workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def test_same_output_as_serial(self):
+        """Test that chunked parallel rendering matches serial rendering exactly"""
+        markdown = build_document(100)
+        expected = markdown_to_html_node(markdown).to_html()
+        actual = markdown_to_html_node_parallel(markdown, executor=self.executor, threshold=0, chunk_blocks=7)
+        self.assertEqual(actual.to_html(), expected)
+
+    def test_small_document_stays_serial(self):
+        """Test that documents below the threshold don't use the pool"""
+        class FailingExecutor:
+            def map(self, *args):
+                raise AssertionError("pool should not be used")
+
+        markdown = build_document(3)
+        html = markdown_to_html_node_parallel(markdown, executor=FailingExecutor(), threshold=10 ** 6).to_html()
+        self.assertEqual(html, markdown_to_html_node(markdown).to_html())
+
+    def test_only_first_image_is_eager(self):
+        """Test that lazy loading stays correct across chunk boundaries"""
+        markdown = "\n\n".join(["Intro"] * 5 + ["![a](/a.png)", "![b](/b.png)", "![c](/c.png)"])
+        site = SiteContext(image_attributes=True)
+        context = site.page()
+        html = markdown_to_html_node_parallel(markdown, context, executor=self.executor,
+                                              threshold=0, chunk_blocks=2).to_html()
+        self.assertEqual(html.count('loading="lazy"'), 2)
+        self.assertNotIn('src="/a.png" alt="a" loading', html)
+        self.assertEqual(context.image_count, 3)
+
+    def test_image_in_code_block_ignored(self):
+        """Test that image syntax inside a code block doesn't make a later chunk's first image lazy"""
+        markdown = "\n\n".join(["```\n![x](/x.png)\n```", "Intro", "![a](/a.png)", "![b](/b.png)"])
+        site = SiteContext(image_attributes=True)
+        html = markdown_to_html_node_parallel(markdown, site.page(), executor=self.executor,
+                                              threshold=0, chunk_blocks=2).to_html()
+        self.assertEqual(html.count('loading="lazy"'), 1)
+        self.assertNotIn('src="/a.png" alt="a" loading', html)
+
+    def test_site_pool(self):
+        """Test that the site's own pool renders with the site installed in its workers"""
+        markdown = "\n\n".join(["Intro"] * 3 + ["![a](/a.png)", "![b](/b.png)"])
+        site = SiteContext(image_attributes=True, workers=2)
+        try:
+            html = markdown_to_html_node_parallel(markdown, site.page(), executor=site.block_executor(),
+                                                  threshold=0, chunk_blocks=2).to_html()
+        finally:
+            site.close()
+        self.assertEqual(html.count('loading="lazy"'), 1)
+
+    def test_page_state_merged(self):
+        """Test that links and search terms recorded by workers are merged into the page"""
+        markdown = build_document(10)
+        serial = SiteContext().page("index.md")
+        markdown_to_html_node(markdown, serial)
+        parallel = SiteContext().page("index.md")
+        markdown_to_html_node_parallel(markdown, parallel, executor=self.executor, threshold=0, chunk_blocks=3)
+        self.assertEqual(parallel.links, serial.links)
+        self.assertEqual(parallel.links[1], ("/blog/1", 14))
+        self.assertEqual(parallel.terms, serial.terms)
+        self.assertEqual(parallel.terms["item"], 20)
+        self.assertEqual(parallel.word_count, serial.word_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,7 +6,9 @@ import time
 # Add the current directory to sys.path to make imports work
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
-from src.main import text_to_textnodes, text_node_to_html_node
+from concurrent.futures import ProcessPoolExecutor
+
+from src.main import text_to_textnodes, text_node_to_html_node, markdown_to_html_node, markdown_to_html_node_parallel
 from src.htmlnode import ParentNode
 
 
@@ -90,6 +92,31 @@ class TestPerformance(unittest.TestCase):
         
         # Verify links were processed correctly
         self.assertEqual(100, sum(1 for node in nodes if node.text_type == node.text_type.LINK))
+    
+    def test_parallel_block_rendering_speedup(self):
+        """Benchmark serial vs. chunked parallel rendering as the document grows"""
+        section = ("## Heading\n\nParagraph with **bold**, _italic_, `code` and a [link](https://example.com).\n\n"
+                   "- item one\n- item two\n\n")
+        
+        print(f"\nParallel Block Rendering Benchmark ({os.cpu_count()} CPUs):")
+        with ProcessPoolExecutor() as executor:
+            # Warm up the pool so process start-up isn't counted
+            markdown_to_html_node_parallel(section * 10, executor=executor, threshold=0, chunk_blocks=5)
+            
+            for sections in (250, 1000, 4000):
+                markdown = section * sections
+                
+                start_time = time.time()
+                serial_html = markdown_to_html_node(markdown).to_html()
+                serial_time = time.time() - start_time
+                
+                start_time = time.time()
+                parallel_html = markdown_to_html_node_parallel(markdown, executor=executor, threshold=0).to_html()
+                parallel_time = time.time() - start_time
+                
+                print(f"- {len(markdown)} characters: serial {serial_time:.4f}s, parallel {parallel_time:.4f}s, "
+                      f"speedup {serial_time / parallel_time:.2f}x")
+                self.assertEqual(serial_html, parallel_html)
 
 
 if __name__ == "__main__":
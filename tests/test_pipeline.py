@@ -0,0 +1,112 @@
+import unittest
+import os
+import tempfile
+import threading
+import time
+
+from src.pipeline import parse_worker_count, run_pipeline
+from src.main import generate_pages_recursive
+
+
+class TestRunPipeline(unittest.TestCase):
+    def test_results_in_input_order(self):
+        """Test that results come back in item order even with many I/O threads"""
+        written = {}
+
+        def read(item):
+            time.sleep(0.001 * (item % 3))
+            return item * 2
+
+        def write(item, output):
+            written[item] = output
+
+        results = run_pipeline(list(range(50)), read, lambda item, data: (data + 1, data), write, io_workers=4)
+        self.assertEqual(results, [item * 2 for item in range(50)])
+        self.assertEqual(written, {item: item * 2 + 1 for item in range(50)})
+
+    def test_memory_bounded_by_queue(self):
+        """Test that readers stop prefetching when processing falls behind"""
+        lock = threading.Lock()
+        state = {"in_flight": 0, "peak": 0}
+
+        def read(item):
+            with lock:
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+            return item
+
+        def process(item, data):
+            time.sleep(0.001)
+            with lock:
+                state["in_flight"] -= 1
+            return data, data
+
+        run_pipeline(list(range(100)), read, process, lambda item, output: None, io_workers=2, queue_size=3)
+        # At most queue_size items queued, plus one held by each blocked reader and one being processed
+        self.assertLessEqual(state["peak"], 3 + 2 + 1)
+
+    def test_read_error_propagates(self):
+        """Test that a reader failure stops the pipeline and is re-raised"""
+        def read(item):
+            if item == 5:
+                raise OSError("disk on fire")
+            return item
+
+        with self.assertRaises(OSError):
+            run_pipeline(list(range(200)), read, lambda item, data: (data, data),
+                         lambda item, output: None, queue_size=1)
+
+    def test_process_error_propagates(self):
+        """Test that a processing failure does not deadlock blocked readers"""
+        def process(item, data):
+            if item == 3:
+                raise Exception("No h1 header found in the markdown")
+            return data, data
+
+        with self.assertRaises(Exception) as context:
+            run_pipeline(list(range(200)), lambda item: item, process, lambda item, output: None, queue_size=1)
+        self.assertIn("No h1 header", str(context.exception))
+
+    def test_write_error_propagates(self):
+        """Test that a writer failure is re-raised"""
+        def write(item, output):
+            raise PermissionError("read-only filesystem")
+
+        with self.assertRaises(PermissionError):
+            run_pipeline([1, 2, 3], lambda item: item, lambda item, data: (data, data), write)
+
+    def test_worker_count(self):
+        """Test that fewer than one I/O worker is rejected instead of writing nothing"""
+        self.assertEqual(parse_worker_count("2"), 2)
+        for value in ["0", "-1", "two"]:
+            with self.assertRaises(ValueError):
+                parse_worker_count(value)
+        with self.assertRaises(ValueError):
+            run_pipeline([1], lambda item: item, lambda item, data: (data, data), lambda item, output: None,
+                         io_workers=0)
+
+
+class TestGeneratePagesPipelined(unittest.TestCase):
+    def test_site_built(self):
+        """Test that every markdown file is rendered to its output path"""
+        with tempfile.TemporaryDirectory() as tmp:
+            content_dir = os.path.join(tmp, "content")
+            dest_dir = os.path.join(tmp, "docs")
+            os.makedirs(os.path.join(content_dir, "blog", "post"))
+            template_path = os.path.join(tmp, "template.html")
+            with open(template_path, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+            with open(os.path.join(content_dir, "index.md"), "w") as f:
+                f.write("# Home\n\nWelcome")
+            with open(os.path.join(content_dir, "blog", "post", "index.md"), "w") as f:
+                f.write("# Post\n\nBody")
+
+            results = generate_pages_recursive(content_dir, template_path, dest_dir, io_workers=2)
+
+            self.assertEqual(sorted(result.title for result in results), ["Home", "Post"])
+            with open(os.path.join(dest_dir, "blog", "post", "index.html")) as f:
+                self.assertEqual(f.read(), '<title>Post</title><div><h1 id="post">Post</h1><p>Body</p></div>')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import io
+import os
+import struct
+import tempfile
+import zlib
+from contextlib import redirect_stdout
+
+from src.pngopt import decode_png_scanlines, optimize_png_bytes, optimize_pngs, PNG_SIGNATURE
+
+
+def make_png(width, height, color_type=2, level=1, extra_chunks=()):
+    """Build a small unoptimized PNG (filter type 0 on every row, fast compression)."""
+    channels = {0: 1, 2: 3, 6: 4}[color_type]
+    rows = []
+    for y in range(height):
+        row = bytes(((x * 7 + y * 3 + c * 40) & 0xFF) for x in range(width) for c in range(channels))
+        rows.append(b"\x00" + row)
+
+    def chunk(chunk_type, data):
+        return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+    idat = zlib.compress(b"".join(rows), level)
+    # Split the image data over two IDAT chunks like many encoders do
+    middle = len(idat) // 2
+    parts = [chunk(b"IHDR", ihdr)]
+    parts.extend(chunk(chunk_type, data) for chunk_type, data in extra_chunks)
+    parts += [chunk(b"IDAT", idat[:middle]), chunk(b"IDAT", idat[middle:]), chunk(b"IEND", b"")]
+    return PNG_SIGNATURE + b"".join(parts)
+
+
+class TestOptimizePngBytes(unittest.TestCase):
+    def test_smaller_with_identical_pixels(self):
+        """Test that the output is smaller and decodes to the same pixels"""
+        data = make_png(64, 32)
+        optimized = optimize_png_bytes(data)
+        self.assertLess(len(optimized), len(data))
+        self.assertEqual(decode_png_scanlines(optimized), decode_png_scanlines(data))
+
+    def test_rgba(self):
+        """Test that 4-channel images keep their pixels"""
+        data = make_png(20, 10, color_type=6)
+        self.assertEqual(decode_png_scanlines(optimize_png_bytes(data)), decode_png_scanlines(data))
+
+    def test_ancillary_chunks_kept(self):
+        """Test that metadata chunks survive re-encoding"""
+        data = make_png(32, 16, extra_chunks=[(b"tEXt", b"Title\x00Rivendell")])
+        self.assertIn(b"Title\x00Rivendell", optimize_png_bytes(data))
+
+    def test_bad_crc_rejected(self):
+        """Test that a corrupt PNG is rejected instead of rewritten"""
+        data = bytearray(make_png(8, 8))
+        data[20] ^= 0xFF
+        with self.assertRaises(ValueError):
+            optimize_png_bytes(bytes(data))
+
+    def test_not_a_png(self):
+        """Test that non-PNG data is rejected"""
+        with self.assertRaises(ValueError):
+            optimize_png_bytes(b"GIF89a")
+
+
+class TestOptimizePngs(unittest.TestCase):
+    def test_stage_uses_cache(self):
+        """Test that each image is optimized only once across builds"""
+        with tempfile.TemporaryDirectory() as tmp:
+            output_dir = os.path.join(tmp, "docs")
+            cache_dir = os.path.join(tmp, "cache")
+            os.makedirs(output_dir)
+            data = make_png(48, 24)
+            path = os.path.join(output_dir, "image.png")
+            with open(path, "wb") as f:
+                f.write(data)
+
+            saved = optimize_pngs(output_dir, cache_dir, workers=1)
+            self.assertEqual(saved, len(data) - os.path.getsize(path))
+            self.assertGreater(saved, 0)
+            cached = os.listdir(os.path.join(cache_dir, "png"))
+            self.assertEqual(len(cached), 1)
+
+            # A clean rebuild copies the original again; the result must come from the cache
+            with open(path, "wb") as f:
+                f.write(data)
+            os.utime(os.path.join(cache_dir, "png", cached[0]), (0, 0))
+            self.assertEqual(optimize_pngs(output_dir, cache_dir, workers=1), saved)
+            self.assertEqual(os.path.getmtime(os.path.join(cache_dir, "png", cached[0])), 0)
+
+    def test_malformed_image_kept(self):
+        """Test that a broken PNG is left as is, remembered, and doesn't fail the build"""
+        with tempfile.TemporaryDirectory() as tmp:
+            output_dir = os.path.join(tmp, "docs")
+            cache_dir = os.path.join(tmp, "cache")
+            os.makedirs(output_dir)
+            data = make_png(16, 8)[:-20]
+            path = os.path.join(output_dir, "broken.png")
+            with open(path, "wb") as f:
+                f.write(data)
+
+            with redirect_stdout(io.StringIO()) as output:
+                self.assertEqual(optimize_pngs(output_dir, cache_dir, workers=1), 0)
+            self.assertIn("could not be optimized", output.getvalue())
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), data)
+            self.assertEqual([os.path.splitext(name)[1] for name in os.listdir(os.path.join(cache_dir, "png"))],
+                             [".keep"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import gzip
+import os
+import tempfile
+
+from src.precompress import precompress_outputs
+
+
+class TestPrecompressOutputs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.tmp.name, "docs")
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+        os.makedirs(os.path.join(self.output_dir, "blog"))
+        self.html = b"<html><body>" + b"<p>Hello World</p>" * 200 + b"</body></html>"
+        self._write("index.html", self.html)
+        self._write("index.css", b"body { color: red; }\n" * 50)
+        self._write("blog/index.html", self.html.replace(b"Hello", b"Blog"))
+        self._write("logo.png", b"\x89PNG\r\n\x1a\n" + b"\x00" * 500)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, rel_path, data):
+        with open(os.path.join(self.output_dir, rel_path), "wb") as f:
+            f.write(data)
+
+    def _path(self, rel_path):
+        return os.path.join(self.output_dir, rel_path)
+
+    def test_writes_gz_siblings_for_text_files(self):
+        """Test that HTML and CSS get .gz siblings that decompress to the original"""
+        counts = precompress_outputs(self.output_dir, self.cache_dir, level=6, workers=2)
+        self.assertEqual(counts["compressed"], 3)
+        with gzip.open(self._path("index.html.gz"), "rb") as f:
+            self.assertEqual(f.read(), self.html)
+        self.assertTrue(os.path.exists(self._path("index.css.gz")))
+        self.assertTrue(os.path.exists(self._path("blog/index.html.gz")))
+
+    def test_png_is_not_compressed(self):
+        """Test that already-compressed images are left alone"""
+        precompress_outputs(self.output_dir, self.cache_dir)
+        self.assertFalse(os.path.exists(self._path("logo.png.gz")))
+
+    def test_unchanged_files_are_skipped(self):
+        """Test that a second build skips files whose hash did not change"""
+        precompress_outputs(self.output_dir, self.cache_dir)
+        self._write("index.html", self.html + b"<!-- changed -->")
+        counts = precompress_outputs(self.output_dir, self.cache_dir)
+        self.assertEqual(counts["compressed"], 1)
+        self.assertEqual(counts["skipped"], 2)
+
+    def test_clean_build_reuses_cached_blobs(self):
+        """Test that a wiped output directory is refilled from the blob cache"""
+        precompress_outputs(self.output_dir, self.cache_dir)
+        os.remove(self._path("index.html.gz"))
+        counts = precompress_outputs(self.output_dir, self.cache_dir)
+        self.assertEqual(counts["reused"], 1)
+        self.assertTrue(os.path.exists(self._path("index.html.gz")))
+
+    def test_level_change_recompresses(self):
+        """Test that changing the compression level invalidates earlier output"""
+        precompress_outputs(self.output_dir, self.cache_dir, level=9)
+        counts = precompress_outputs(self.output_dir, self.cache_dir, level=1)
+        self.assertEqual(counts["compressed"], 3)
+
+    def test_incompressible_file_gets_no_sibling(self):
+        """Test that a .gz larger than its source is not published"""
+        self._write("tiny.txt", b"a")
+        counts = precompress_outputs(self.output_dir, self.cache_dir)
+        self.assertEqual(counts["incompressible"], 1)
+        self.assertFalse(os.path.exists(self._path("tiny.txt.gz")))
+        counts = precompress_outputs(self.output_dir, self.cache_dir)
+        self.assertEqual(counts["skipped"], 4)
+
+    def test_invalid_level(self):
+        """Test that an out-of-range level is rejected"""
+        with self.assertRaises(ValueError):
+            precompress_outputs(self.output_dir, self.cache_dir, level=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
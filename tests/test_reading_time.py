@@ -0,0 +1,53 @@
+import unittest
+import os
+import tempfile
+
+from src.context import SiteContext
+from src.contentindex import ContentIndex
+from src.listing import listing_entry, listing_html_node
+from src.main import markdown_to_html_node
+from src.pageresult import PageResult, reading_minutes
+from src.routes import RouteTable
+
+
+class TestWordCount(unittest.TestCase):
+    def test_prose_counted(self):
+        """Test that normal, bold and italic text is counted, but not code, links or images"""
+        context = SiteContext().page("index.md")
+        markdown_to_html_node("# A Title\n\nOne **two three** _four_ `code` [link text](/x) ![alt](/a.png)\n\n"
+                              "- five six\n\n```\nnot counted at all\n```", context)
+        self.assertEqual(context.word_count, 8)
+
+    def test_words_split_by_markup(self):
+        """Test that a word split by inline markup is counted once, but list items don't run together"""
+        context = SiteContext().page("index.md")
+        markdown_to_html_node("foo**bar**baz and _un_**believable** end\n\n- one\n- two", context)
+        self.assertEqual(context.word_count, 6)
+
+    def test_reading_minutes(self):
+        """Test that reading time is rounded up to whole minutes"""
+        self.assertEqual(reading_minutes(0), 1)
+        self.assertEqual(reading_minutes(200), 1)
+        self.assertEqual(reading_minutes(201), 2)
+        self.assertEqual(PageResult("a.md", "a.html", "A", 0, word_count=1000).reading_minutes, 5)
+
+
+class TestIndexedWordCount(unittest.TestCase):
+    def test_listing_shows_reading_time(self):
+        """Test that the word count is indexed and shown in listings"""
+        with tempfile.TemporaryDirectory() as tmp:
+            index = ContentIndex(os.path.join(tmp, "content.db"))
+            routes = RouteTable("content", "docs")
+            route = routes.add("blog/tom.md", {"date": "2024-01-01"})
+            index.update_pages([PageResult(route.source_path, route.output_path, "Tom", 0, word_count=450)], routes)
+            entry = listing_entry(index.pages("/blog/")[0])
+            index.close()
+
+        self.assertEqual(entry["reading_minutes"], 3)
+        html = listing_html_node("Blog", [entry], "/blog", 1, 1).to_html()
+        self.assertIn('<time datetime="2024-01-01">2024-01-01</time> <span class="reading-time">3 min read</span>',
+                      html)
+
+
+if __name__ == "__main__":
+    unittest.main()
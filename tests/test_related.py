@@ -0,0 +1,126 @@
+import unittest
+import os
+import tempfile
+
+from src.contentindex import ContentIndex
+from src.context import SiteContext
+from src.main import fill_template
+from src.pageresult import PageResult
+from src.related import RELATED_ELEMENT, RelatedIndex, related_html, update_related_posts
+from src.routes import RouteTable
+
+PAGES = {
+    "tom": {"tom": 5, "bombadil": 3, "river": 1, "song": 2},
+    "goldberry": {"river": 4, "song": 2, "tom": 1, "lily": 1},
+    "barrow": {"bombadil": 1, "wight": 3, "tom": 1},
+    "moria": {"balrog": 3, "dwarves": 2},
+    "khazad": {"balrog": 1, "dwarves": 4},
+}
+
+
+class TestRelatedIndex(unittest.TestCase):
+    def test_most_similar_first(self):
+        """Test that pages are ranked by shared, weighted terms"""
+        index = RelatedIndex(PAGES)
+        self.assertEqual(index.related("tom", 5), ["barrow", "goldberry"])
+        self.assertEqual(index.related("moria", 5), ["khazad"])
+        self.assertEqual(index.related("tom", 1), ["barrow"])
+
+    def test_pruning(self):
+        """Test that the postings and query terms are limited"""
+        index = RelatedIndex(PAGES, postings_limit=1, query_terms=1)
+        self.assertTrue(all(len(postings) == 1 for postings in index.postings.values()))
+        self.assertEqual(len(index.related("tom", 5)), 1)
+
+    def test_neighbours(self):
+        """Test that only pages sharing a query term are neighbours"""
+        index = RelatedIndex(PAGES)
+        self.assertEqual(index.neighbours("moria"), {"khazad"})
+        self.assertEqual(index.neighbours("tom"), {"goldberry", "barrow"})
+
+
+class TestRelatedHtml(unittest.TestCase):
+    def test_html(self):
+        """Test the element with and without related pages"""
+        self.assertEqual(related_html([]), RELATED_ELEMENT)
+        self.assertEqual(related_html([("/blog/tom", "Tom")], "/repo/"),
+                         '<aside id="related-posts"><nav><h2>Related posts</h2>'
+                         '<ul><li><a href="/repo/blog/tom">Tom</a></li></ul></nav></aside>')
+
+    def test_placeholder(self):
+        """Test that the template placeholder becomes the empty element only on related pages"""
+        html, _ = fill_template("{{ Content }}{{ Related }}", "Title", "<p>x</p>", related=True)
+        self.assertEqual(html, "<p>x</p>" + RELATED_ELEMENT)
+        html, _ = fill_template("{{ Content }}{{ Related }}", "Title", "<p>x</p>")
+        self.assertEqual(html, "<p>x</p>")
+
+    def test_related_pages(self):
+        """Test that only pages below a related directory get the element"""
+        routes = RouteTable("content", "docs")
+        for rel_path in ("index.md", "blog/tom.md", "blogroll.md"):
+            routes.add(rel_path)
+        site = SiteContext(routes=routes, related_directories=["blog"])
+        self.assertTrue(site.page(os.path.join("content", "blog", "tom.md")).shows_related_posts())
+        self.assertFalse(site.page(os.path.join("content", "index.md")).shows_related_posts())
+        self.assertFalse(site.page(os.path.join("content", "blogroll.md")).shows_related_posts())
+        unrelated = SiteContext(routes=routes)
+        self.assertFalse(unrelated.page(os.path.join("content", "blog", "tom.md")).shows_related_posts())
+
+
+class TestUpdateRelatedPosts(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.index = ContentIndex(os.path.join(self.tmp.name, "content.db"))
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def build(self, pages, rendered):
+        routes = RouteTable("content", self.dest)
+        results = []
+        for name, terms in pages.items():
+            route = routes.add(f"blog/{name}.md")
+            results.append(PageResult(route.source_path, route.output_path, name.title(), 0, terms=terms))
+            if name in rendered:
+                os.makedirs(os.path.dirname(route.output_path), exist_ok=True)
+                with open(route.output_path, "w") as f:
+                    f.write(f"<main>{name}</main>{RELATED_ELEMENT}")
+        self.index.update_pages(results, routes)
+        self.index.prune(routes)
+        written = [result for result in results if os.path.basename(os.path.dirname(result.dest_path)) in rendered]
+        return update_related_posts(["blog"], self.index, written, "content", self.dest)
+
+    def read(self, name):
+        with open(os.path.join(self.dest, "blog", name, "index.html")) as f:
+            return f.read()
+
+    def test_pages_patched(self):
+        """Test that the related posts are written into the generated pages"""
+        self.assertEqual(self.build(PAGES, PAGES), 5)
+        self.assertIn('<a href="/blog/khazad">Khazad</a>', self.read("moria"))
+        self.assertEqual(self.read("tom").count("<li>"), 2)
+
+    def test_incremental(self):
+        """Test that only pages affected by a change are recomputed"""
+        self.build(PAGES, PAGES)
+        self.assertEqual(self.build(PAGES, set()), 0)
+
+        # Khazad still only shares terms with Moria; the Tom pages are unaffected
+        pages = dict(PAGES, khazad={"balrog": 1, "dwarves": 5})
+        self.assertEqual(self.build(pages, {"khazad"}), 2)
+        self.assertIn('<a href="/blog/khazad">Khazad</a>', self.read("moria"))
+
+        # Sharing a term makes Khazad a candidate for Goldberry too
+        pages = dict(PAGES, khazad={"balrog": 1, "dwarves": 5, "lily": 2})
+        self.assertEqual(self.build(pages, {"khazad"}), 3)
+        self.assertIn('<a href="/blog/khazad">Khazad</a>', self.read("goldberry"))
+
+        # A rendered page that was not recomputed still gets its element filled in
+        self.assertEqual(self.build(pages, {"tom"}), 0)
+        self.assertIn("Related posts", self.read("tom"))
+
+
+if __name__ == "__main__":
+    unittest.main()
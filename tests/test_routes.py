@@ -0,0 +1,125 @@
+import unittest
+import io
+import os
+import tempfile
+from contextlib import redirect_stdout
+
+from src.routes import RouteTable, build_route_table, route_paths
+from src.context import SiteContext
+from src.main import generate_pages_recursive, text_to_textnodes
+from src.textnode import TextNode, TextType
+
+
+class TestRoutePaths(unittest.TestCase):
+    def test_index_pages(self):
+        """Test that index.md is served from its directory"""
+        self.assertEqual(route_paths("index.md"), ("index.html", "/"))
+        self.assertEqual(route_paths("blog/tom/index.md"), ("blog/tom/index.html", "/blog/tom"))
+
+    def test_named_pages(self):
+        """Test that other pages get a directory of their own"""
+        self.assertEqual(route_paths("about.md"), ("about/index.html", "/about"))
+        self.assertEqual(route_paths("blog/first.md"), ("blog/first/index.html", "/blog/first"))
+
+    def test_md_inside_name(self):
+        """Test that only the trailing .md is stripped"""
+        self.assertEqual(route_paths("notes.md.md"), ("notes.md/index.html", "/notes.md"))
+        self.assertEqual(route_paths("my.mdx-guide.md"), ("my.mdx-guide/index.html", "/my.mdx-guide"))
+
+
+class TestRouteTable(unittest.TestCase):
+    def setUp(self):
+        self.routes = RouteTable("content", "docs")
+        for rel_path in ("index.md", "blog/tom/index.md", "about.md"):
+            self.routes.add(rel_path)
+
+    def test_lookups(self):
+        """Test lookups by source, URL and output path"""
+        route = self.routes.for_source(os.path.join("content", "blog", "tom", "index.md"))
+        self.assertEqual(route.output_path, os.path.join("docs", "blog", "tom", "index.html"))
+        self.assertIs(self.routes.for_url("/blog/tom"), route)
+        self.assertIs(self.routes.for_url("/blog/tom/"), route)
+        self.assertIs(self.routes.for_output("blog/tom/index.html"), route)
+        self.assertEqual(self.routes.for_url("/").url, "/")
+        self.assertIsNone(self.routes.for_url("/blog"))
+
+    def test_collision(self):
+        """Test that two sources routed to the same output are rejected"""
+        with self.assertRaises(ValueError):
+            self.routes.add("about/index.md")
+
+    def test_output_dirs(self):
+        """Test that the needed directories are listed once each"""
+        self.assertEqual(self.routes.output_dirs(), sorted([
+            "docs", os.path.join("docs", "about"), os.path.join("docs", "blog", "tom"),
+        ]))
+
+
+class TestBuildRouteTable(unittest.TestCase):
+    def test_walk(self):
+        """Test that only markdown files are routed, in sorted order"""
+        with tempfile.TemporaryDirectory() as tmp:
+            for rel_path in ("index.md", "blog/b.md", "blog/a/index.md", "images/x.png"):
+                path = os.path.join(tmp, *rel_path.split("/"))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w") as f:
+                    f.write("# Page")
+
+            routes = build_route_table(tmp, "out")
+            self.assertEqual([route.url for route in routes], ["/blog/a", "/blog/b", "/"])
+
+
+class TestLinkResolution(unittest.TestCase):
+    def setUp(self):
+        routes = RouteTable("content", "docs")
+        for rel_path in ("index.md", "blog/tom/index.md", "blog/majesty/index.md", "about.md"):
+            routes.add(rel_path)
+        self.site = SiteContext(routes=routes)
+        self.page = self.site.page(os.path.join("content", "blog", "tom", "index.md"))
+
+    def test_relative_links(self):
+        """Test that relative links to markdown sources become page URLs"""
+        self.assertEqual(self.page.resolve_link("../majesty/index.md"), "/blog/majesty")
+        self.assertEqual(self.page.resolve_link("../../about.md#team"), "/about#team")
+        self.assertEqual(self.page.resolve_link("../../index.md"), "/")
+        self.assertEqual(self.page.resolve_link("/blog/majesty/index.md"), "/blog/majesty")
+
+    def test_other_links_untouched(self):
+        """Test that URLs, anchors and non-markdown targets are left alone"""
+        for url in ("https://example.com/readme.md", "/blog/tom", "#top", "../tom.png"):
+            self.assertEqual(self.page.resolve_link(url), url)
+
+    def test_unresolved_link_warns(self):
+        """Test that a link to a missing source is kept and reported"""
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(self.page.resolve_link("../gone/index.md"), "../gone/index.md")
+        self.assertIn("../gone/index.md", output.getvalue())
+
+    def test_split_nodes_link(self):
+        """Test that link nodes carry the resolved URL"""
+        nodes = text_to_textnodes("See [Majesty](../majesty/index.md).", self.page)
+        self.assertEqual(nodes[1], TextNode("Majesty", TextType.LINK, "/blog/majesty"))
+
+    def test_generated_page(self):
+        """Test that resolved links get the basepath in the generated page"""
+        with tempfile.TemporaryDirectory() as tmp:
+            content_dir = os.path.join(tmp, "content")
+            os.makedirs(os.path.join(content_dir, "blog"))
+            template_path = os.path.join(tmp, "template.html")
+            with open(template_path, "w") as f:
+                f.write("{{ Content }}")
+            with open(os.path.join(content_dir, "index.md"), "w") as f:
+                f.write("# Home\n\n[Post](blog/post.md)")
+            with open(os.path.join(content_dir, "blog", "post.md"), "w") as f:
+                f.write("# Post\n\n[Home](../index.md)")
+
+            generate_pages_recursive(content_dir, template_path, os.path.join(tmp, "docs"), basepath="/site/")
+            with open(os.path.join(tmp, "docs", "index.html")) as f:
+                self.assertIn('<a href="/site/blog/post">Post</a>', f.read())
+            with open(os.path.join(tmp, "docs", "blog", "post", "index.html")) as f:
+                self.assertIn('<a href="/site/">Home</a>', f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import json
+import os
+import tempfile
+
+from src.context import SiteContext
+from src.contentindex import ContentIndex
+from src.main import markdown_to_html_node
+from src.pageresult import PageResult
+from src.routes import RouteTable
+from src.search import tokenize, write_search_index
+
+
+class TestTerms(unittest.TestCase):
+    def test_tokenize(self):
+        """Test that terms are case-folded words of two or more characters"""
+        self.assertEqual(tokenize("Tom Bombadil's HOUSE, a snake_case 42!"),
+                         ["tom", "bombadil", "house", "snake", "case", "42"])
+
+    def test_terms_collected_while_rendering(self):
+        """Test that the page's visible text is counted, but not URLs, alt text or code blocks"""
+        context = SiteContext().page("index.md")
+        markdown_to_html_node("# Tom Bombadil\n\nOld **Tom** sings, see [his house](/tom).\n\n"
+                              "![tom's picture](/tom.png)\n\n```\nhidden code\n```", context)
+        self.assertEqual(context.terms["tom"], 2)
+        self.assertEqual(context.terms["house"], 1)
+        for term in ("picture", "hidden", "png"):
+            self.assertNotIn(term, context.terms)
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.index = ContentIndex(os.path.join(self.tmp.name, "content.db"))
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def build(self, pages):
+        routes = RouteTable("content", self.dest)
+        results = []
+        for name, terms in pages.items():
+            route = routes.add(f"{name}.md")
+            results.append(PageResult(route.source_path, route.output_path, name.title(), 0, terms=terms))
+        self.index.update_pages(results, routes)
+        self.index.prune(routes)
+        return write_search_index(self.index, self.dest)
+
+    def read(self, name):
+        with open(os.path.join(self.dest, "search", name), encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_sharded_by_prefix(self):
+        """Test the page table and the postings of each shard"""
+        self.assertEqual(self.build({"tom": {"tom": 3, "tolkien": 1, "house": 1},
+                                     "goldberry": {"house": 2, "river": 1}}), (4, 3))
+        index = self.read("index.json")
+        self.assertEqual(index["shards"], ["ho", "ri", "to"])
+        ids = {title: int(page_id) for page_id, (url, title) in index["pages"].items()}
+        self.assertEqual(self.read("to.json"), {"tolkien": [[ids["Tom"], 1]], "tom": [[ids["Tom"], 3]]})
+        self.assertEqual(self.read("ho.json"), {"house": [[ids["Tom"], 1], [ids["Goldberry"], 2]]})
+
+    def test_incremental(self):
+        """Test that only shards of changed terms are rewritten and empty shards are removed"""
+        self.build({"tom": {"tom": 3, "house": 1}, "goldberry": {"river": 1}})
+        self.assertEqual(self.build({"tom": {"tom": 3, "house": 1}, "goldberry": {"river": 1}}), (0, 3))
+        # to.json, the new re.json and index.json, whose shard list changed
+        self.assertEqual(self.build({"tom": {"tom": 4, "house": 1}, "goldberry": {"reed": 1}}), (3, 3))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "search", "ri.json")))
+        self.assertEqual(self.read("index.json")["shards"], ["ho", "re", "to"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from src.sharding import MANIFEST_NAME, merge_shards, parse_shard, shard_for_path, write_shard_manifest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(PROJECT_ROOT, "src", "main.py")
+
+
+def read_tree(root):
+    files = {}
+    for dir_path, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dir_path, filename)
+            with open(path, "rb") as f:
+                files[os.path.relpath(path, root)] = f.read()
+    return files
+
+
+class TestShardAssignment(unittest.TestCase):
+    def test_parse_shard(self):
+        """Test parsing and validating K/N"""
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for value in ("0/4", "5/4", "1/0", "x/2", "3"):
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+    def test_assignment_is_stable(self):
+        """Test that the same path always lands in the same shard"""
+        self.assertEqual(shard_for_path("blog/tom/index.md", 4), shard_for_path("blog/tom/index.md", 4))
+        self.assertEqual(shard_for_path("index.md", 1), 1)
+
+    def test_assignment_covers_all_shards(self):
+        """Test that a realistic content set is spread over every shard"""
+        shards = {shard_for_path(f"blog/post-{i}/index.md", 4) for i in range(200)}
+        self.assertEqual(shards, {1, 2, 3, 4})
+
+
+class TestMergeShards(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _shard(self, index, count, files):
+        shard_dir = os.path.join(self.tmp.name, f"shard{index}")
+        for rel_path, content in files.items():
+            path = os.path.join(shard_dir, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(content)
+        os.makedirs(shard_dir, exist_ok=True)
+        write_shard_manifest(shard_dir, (index, count))
+        return shard_dir
+
+    def test_overlap_rejected(self):
+        """Test that two shards writing the same path is an error"""
+        first = self._shard(1, 2, {"index.html": "a"})
+        second = self._shard(2, 2, {"index.html": "b"})
+        with self.assertRaises(ValueError) as context:
+            merge_shards([first, second], os.path.join(self.tmp.name, "out"))
+        self.assertIn("index.html", str(context.exception))
+
+    def test_missing_shard_rejected(self):
+        """Test that an incomplete shard set is an error"""
+        first = self._shard(1, 3, {"index.html": "a"})
+        second = self._shard(2, 3, {"blog/index.html": "b"})
+        with self.assertRaises(ValueError):
+            merge_shards([first, second], os.path.join(self.tmp.name, "out"))
+
+    def test_merge(self):
+        """Test that disjoint shards are combined without their manifests"""
+        first = self._shard(1, 2, {"index.html": "a", "index.css": "c"})
+        second = self._shard(2, 2, {"blog/tom/index.html": "b"})
+        out = os.path.join(self.tmp.name, "out")
+        self.assertEqual(merge_shards([second, first], out), 3)
+        self.assertEqual(read_tree(out), {
+            "index.html": b"a", "index.css": b"c", os.path.join("blog", "tom", "index.html"): b"b",
+        })
+
+
+class TestShardedBuild(unittest.TestCase):
+    def test_sharded_build_matches_single_build(self):
+        """Test that N shard subprocesses plus a merge reproduce a single-machine build"""
+        with tempfile.TemporaryDirectory() as tmp:
+            def run(*args):
+                subprocess.run([sys.executable, MAIN, "/python-static/", *args], check=True,
+                               stdout=subprocess.DEVNULL, cwd=PROJECT_ROOT)
+
+            full_dir = os.path.join(tmp, "full")
+            run("--output", full_dir)
+
+            count = 3
+            shard_dirs = [os.path.join(tmp, f"shard{index}") for index in range(1, count + 1)]
+            processes = [
+                subprocess.Popen([sys.executable, MAIN, "/python-static/", "--shard", f"{index}/{count}",
+                                  "--output", shard_dir], stdout=subprocess.DEVNULL, cwd=PROJECT_ROOT)
+                for index, shard_dir in enumerate(shard_dirs, start=1)
+            ]
+            self.assertEqual([process.wait() for process in processes], [0] * count)
+
+            pages_per_shard = []
+            for shard_dir in shard_dirs:
+                with open(os.path.join(shard_dir, MANIFEST_NAME)) as f:
+                    pages_per_shard.append(sum(1 for path in json.load(f)["files"] if path.endswith(".html")))
+            self.assertEqual(sum(pages_per_shard), 5)
+
+            merged_dir = os.path.join(tmp, "merged")
+            run("--merge-shards", *shard_dirs, "--output", merged_dir)
+            self.assertEqual(read_tree(merged_dir), read_tree(full_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from src.context import SiteContext
+from src.main import markdown_to_html_node, markdown_to_html_node_parallel, render_page
+from src.toc import slugify, toc_html_node
+
+
+class TestSlugs(unittest.TestCase):
+    def test_slugify(self):
+        """Test that heading text becomes a lowercase, hyphenated id"""
+        self.assertEqual(slugify("Why Tom's House?"), "why-toms-house")
+        self.assertEqual(slugify("  The  Lord_of -- the Rings "), "the-lord-of-the-rings")
+        self.assertEqual(slugify("Éowyn"), "éowyn")
+        self.assertEqual(slugify("???"), "section")
+
+    def test_unique_ids(self):
+        """Test that repeated headings get numbered ids without colliding with real ones"""
+        context = SiteContext().page("index.md")
+        html = markdown_to_html_node("## Notes\n\n## Notes-1\n\n## Notes\n\n### **Bold** `code`", context).to_html()
+        self.assertEqual(html, '<div><h2 id="notes">Notes</h2><h2 id="notes-1">Notes-1</h2>'
+                               '<h2 id="notes-2">Notes</h2><h3 id="bold-code"><b>Bold</b> <code>code</code></h3></div>')
+        self.assertEqual([anchor for _, anchor, _ in context.headings], ["notes", "notes-1", "notes-2", "bold-code"])
+
+    def test_no_ids_without_context(self):
+        """Test that headings rendered without a page context are unchanged"""
+        self.assertEqual(markdown_to_html_node("## Notes").to_html(), "<div><h2>Notes</h2></div>")
+
+
+class TestTableOfContents(unittest.TestCase):
+    def test_nested(self):
+        """Test that headings nest under the closest higher-level heading"""
+        headings = [(1, "title", "Title"), (2, "a", "A"), (3, "a1", "A1"), (4, "a1x", "A1x"),
+                    (2, "b", "B"), (4, "b1", "B1")]
+        self.assertEqual(toc_html_node(headings).to_html(),
+                         '<nav class="toc"><ul><li><a href="#a">A</a><ul><li><a href="#a1">A1</a>'
+                         '<ul><li><a href="#a1x">A1x</a></li></ul></li></ul></li>'
+                         '<li><a href="#b">B</a><ul><li><a href="#b1">B1</a></li></ul></li></ul></nav>')
+
+    def test_empty(self):
+        """Test that a page with only a title has no table of contents"""
+        self.assertIsNone(toc_html_node([(1, "title", "Title")]))
+
+    def test_template_placeholder(self):
+        """Test that the table of contents replaces the template placeholder"""
+        context = SiteContext().page("index.md")
+        final_html, title, _ = render_page("# Title\n\n## Part", "{{ TOC }}{{ Content }}", context=context)
+        self.assertEqual(final_html, '<nav class="toc"><ul><li><a href="#part">Part</a></li></ul></nav>'
+                                     '<div><h1 id="title">Title</h1><h2 id="part">Part</h2></div>')
+        final_html, _, _ = render_page("# Title", "{{ TOC }}{{ Content }}", context=SiteContext().page("a.md"))
+        self.assertEqual(final_html, '<div><h1 id="title">Title</h1></div>')
+
+    def test_parallel_matches_serial(self):
+        """Test that ids assigned across parallel chunks match serial rendering"""
+        markdown = "\n\n".join(f"## Notes\n\nParagraph {i}" for i in range(12))
+        serial = SiteContext().page("index.md")
+        expected = markdown_to_html_node(markdown, serial).to_html()
+        parallel = SiteContext().page("index.md")
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            html = markdown_to_html_node_parallel(markdown, parallel, executor=executor, threshold=0,
+                                                  chunk_blocks=5).to_html()
+        self.assertEqual(html, expected)
+        self.assertEqual(parallel.headings, serial.headings)
+        self.assertIn('id="notes-11"', html)
+
+
+if __name__ == "__main__":
+    unittest.main()
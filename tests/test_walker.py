@@ -0,0 +1,44 @@
+import unittest
+import os
+import tempfile
+
+from src.walker import walk_manifest
+from src.copy_static import copy_static_to_public
+
+
+class TestWalkManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "root")
+        for rel_path in ("b.md", "a/z.md", "a/b/c.txt", "a-b/x.md"):
+            path = os.path.join(self.root, *rel_path.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(rel_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_sorted_manifest(self):
+        """Test that every entry is listed once, sorted, with directories before their contents"""
+        manifest = walk_manifest(self.root)
+        self.assertEqual([entry.rel_path for entry in manifest],
+                         ["a", "a-b", "a-b/x.md", "a/b", "a/b/c.txt", "a/z.md", "b.md"])
+        self.assertEqual([entry.rel_path for entry in manifest if entry.is_dir], ["a", "a-b", "a/b"])
+
+    def test_cached_stat(self):
+        """Test that stat results come from the walk and are reused"""
+        entry = [entry for entry in walk_manifest(self.root) if entry.rel_path == "b.md"][0]
+        self.assertEqual(entry.stat().st_size, 4)
+        self.assertIs(entry.stat(), entry.stat())
+
+    def test_copy_uses_manifest(self):
+        """Test that copying static files reproduces the tree"""
+        dest = os.path.join(self.tmp.name, "dest")
+        copy_static_to_public(self.root, dest)
+        self.assertEqual([entry.rel_path for entry in walk_manifest(dest)],
+                         [entry.rel_path for entry in walk_manifest(self.root)])
+
+
+if __name__ == "__main__":
+    unittest.main()